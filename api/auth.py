@@ -1,22 +1,123 @@
 import logging
 import secrets
+import threading
+from collections import OrderedDict, namedtuple
 from datetime import datetime, timedelta
+from sqlalchemy import or_, select
+from sqlalchemy.orm import joinedload
 from models import User, APIToken
 from app import db
+from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Detached copy of the user fields API views need, safe to share across requests
+UserSnapshot = namedtuple('UserSnapshot', ['id', 'username', 'email', 'is_admin'])
+
+class TokenCache:
+    """Bounded LRU cache of validated tokens to user snapshots."""
+    
+    def __init__(self, max_size, ttl):
+        """
+        Initialize the token cache.
+        
+        Args:
+            max_size (int): Maximum number of cached tokens
+            ttl (int): Seconds an entry is trusted before the database is checked again
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, token_str):
+        """
+        Get the user snapshot for a cached token.
+        
+        Args:
+            token_str: Token string
+            
+        Returns:
+            UserSnapshot: Cached user, or None if not cached or expired
+        """
+        with self._lock:
+            entry = self._entries.get(token_str)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            user, expires_at = entry
+            if datetime.utcnow() >= expires_at:
+                del self._entries[token_str]
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(token_str)
+            self.hits += 1
+            return user
+    
+    def put(self, token_str, user, token_expires_at):
+        """
+        Cache a validated token until its TTL or the token's own expiry, whichever is first.
+        
+        Args:
+            token_str: Token string
+            user (UserSnapshot): User the token belongs to
+            token_expires_at (datetime): Token expiration time
+        """
+        expires_at = min(token_expires_at, datetime.utcnow() + timedelta(seconds=self.ttl))
+        with self._lock:
+            self._entries[token_str] = (user, expires_at)
+            self._entries.move_to_end(token_str)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, token_str):
+        """Remove a token from the cache."""
+        with self._lock:
+            self._entries.pop(token_str, None)
+    
+    def invalidate_user(self, user_id):
+        """Remove all of a user's tokens from the cache."""
+        with self._lock:
+            for token_str in [t for t, (user, _) in self._entries.items() if user.id == user_id]:
+                del self._entries[token_str]
+    
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """
+        Get cache counters.
+        
+        Returns:
+            dict: Hits, misses and current size
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+# Process-wide cache shared by all TokenAuth instances, so revocations through
+# one instance invalidate entries seen by another. Other worker processes keep
+# their own cache, so a revoked token stays valid there for at most the TTL.
+token_cache = TokenCache(Config.API_TOKEN_CACHE_SIZE, Config.API_TOKEN_CACHE_TTL)
+
 class TokenAuth:
     """Token-based authentication for the API."""
     
-    def __init__(self, db_session=None):
+    def __init__(self, db_session=None, cache=None):
         """
         Initialize the token auth service.
         
         Args:
             db_session: Optional SQLAlchemy database session, used for testing
+            cache: Optional TokenCache, defaults to the process-wide token_cache
         """
         self.db_session = db_session or db.session
+        self.cache = cache or token_cache
     
     def generate_token(self, user, expiration=None):
         """
@@ -51,37 +152,46 @@ class TokenAuth:
         """
         Validate a token and return the associated user.
         
+        Valid tokens are cached, so repeat calls skip the token and user queries
+        until the cache TTL or the token's expiry.
+        
         Args:
             token_str: Token string to validate
             
         Returns:
-            User: User instance if token is valid, None otherwise
+            UserSnapshot: Snapshot of the token's user if the token is valid, None otherwise
         """
-        # Find token in database
-        token = self.db_session.query(APIToken).filter_by(token=token_str).first()
+        user = self.cache.get(token_str)
+        if user:
+            return user
+        
+        # Find token in database, loading its user in the same query
+        token = (
+            self.db_session.query(APIToken)
+            .options(joinedload(APIToken.user))
+            .filter_by(token=token_str)
+            .first()
+        )
         
         if not token:
             logger.debug(f"Token not found: {token_str[:10]}...")
             return None
         
-        # Check expiration
+        # Check expiration; expired rows are removed by purge_expired_tokens so
+        # validation never writes
         if token.is_expired():
             logger.debug(f"Token expired: {token_str[:10]}...")
-            # Clean up expired token
-            self.db_session.delete(token)
-            self.db_session.commit()
             return None
         
         # Return the associated user
         user = token.user
         if not user:
             logger.warning(f"Token refers to non-existent user: {token.user_id}")
-            # Clean up invalid token
-            self.db_session.delete(token)
-            self.db_session.commit()
             return None
         
-        return user
+        snapshot = UserSnapshot(user.id, user.username, user.email, user.is_admin)
+        self.cache.put(token_str, snapshot, token.expires_at)
+        return snapshot
     
     def revoke_token(self, token_str):
         """
@@ -93,6 +203,7 @@ class TokenAuth:
         Returns:
             bool: True if token was revoked, False if token wasn't found
         """
+        self.cache.invalidate(token_str)
         token = self.db_session.query(APIToken).filter_by(token=token_str).first()
         
         if token:
@@ -112,6 +223,7 @@ class TokenAuth:
         Returns:
             int: Number of tokens revoked
         """
+        self.cache.invalidate_user(user_id)
         tokens = self.db_session.query(APIToken).filter_by(user_id=user_id).all()
         count = len(tokens)
         
@@ -121,3 +233,38 @@ class TokenAuth:
         self.db_session.commit()
         logger.debug(f"Revoked {count} tokens for user {user_id}")
         return count
+    
+    def purge_expired_tokens(self, batch_size=None):
+        """
+        Delete expired tokens and tokens of deleted users in batches.
+        
+        Args:
+            batch_size (int, optional): Tokens deleted per transaction,
+                defaults to Config.API_TOKEN_PURGE_BATCH_SIZE
+            
+        Returns:
+            int: Number of tokens deleted
+        """
+        batch_size = batch_size or Config.API_TOKEN_PURGE_BATCH_SIZE
+        now = datetime.utcnow()
+        stale = or_(APIToken.expires_at < now, ~APIToken.user_id.in_(select(User.id)))
+        total = 0
+        
+        try:
+            while True:
+                ids = [
+                    token_id for (token_id,) in
+                    self.db_session.query(APIToken.id).filter(stale).limit(batch_size).all()
+                ]
+                if not ids:
+                    break
+                
+                self.db_session.query(APIToken).filter(APIToken.id.in_(ids)).delete(synchronize_session=False)
+                self.db_session.commit()
+                total += len(ids)
+        except Exception as e:
+            logger.error(f"Error purging expired tokens: {e}")
+            self.db_session.rollback()
+        
+        logger.debug(f"Purged {total} expired tokens")
+        return total
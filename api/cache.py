@@ -0,0 +1,104 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, current_app, request
+from app import db
+from config import Config
+from etl.data_version import get_data_version
+
+logger = logging.getLogger(__name__)
+
+class EndpointCache:
+    """Bounded LRU cache of serialized API responses tagged with the data version."""
+    
+    def __init__(self, max_entries):
+        """
+        Initialize the endpoint cache.
+        
+        Args:
+            max_entries (int): Maximum number of cached responses
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key, version):
+        """
+        Get a cached response body.
+        
+        Args:
+            key (tuple): Request key from request_key
+            version (int): Current data version
+        
+        Returns:
+            tuple: (body, mimetype), or None if missing or built from older data
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] != version:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1], entry[2]
+    
+    def put(self, key, version, body, mimetype):
+        """Cache a response body for a data version."""
+        with self._lock:
+            self._entries[key] = (version, body, mimetype)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+endpoint_cache = EndpointCache(Config.API_RESPONSE_CACHE_SIZE)
+
+def request_key():
+    """Build a cache key from the endpoint, its path arguments and the normalized query string."""
+    return (
+        request.endpoint,
+        tuple(sorted((request.view_args or {}).items())),
+        tuple(sorted(request.args.items(multi=True)))
+    )
+
+def make_etag(key, version):
+    """Build a strong ETag for a request key at a data version."""
+    return hashlib.sha256(repr((key, version)).encode('utf-8')).hexdigest()[:32]
+
+def cached_endpoint(f):
+    """
+    Decorator caching a view's response until the market data version changes.
+    
+    The ETag is derived from the request key and the data version alone, so a
+    matching If-None-Match is answered with 304 before the view or the cache
+    is consulted. Only 200 responses are cached.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        key = request_key()
+        version = get_data_version(db.session)
+        etag = make_etag(key, version)
+        
+        if etag in request.if_none_match:
+            response = Response(status=304)
+        else:
+            cached = endpoint_cache.get(key, version)
+            if cached:
+                response = Response(cached[0], mimetype=cached[1])
+            else:
+                response = current_app.make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                endpoint_cache.put(key, version, response.get_data(), response.mimetype)
+        
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = f'private, max-age={Config.API_RESPONSE_MAX_AGE}'
+        return response
+    return decorated
@@ -0,0 +1,119 @@
+import io
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Arrow and Parquet responses need the optional pyarrow package
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+JSON_MIMETYPE = 'application/json'
+ARROW_STREAM_MIMETYPE = 'application/vnd.apache.arrow.stream'
+PARQUET_MIMETYPE = 'application/vnd.apache.parquet'
+COLUMNAR_MIMETYPES = (ARROW_STREAM_MIMETYPE, PARQUET_MIMETYPE)
+
+# Column names and Arrow type names of the columnar history responses
+STOCK_PRICE_COLUMNS = (
+    ('id', 'int64'),
+    ('date', 'date32'),
+    ('close_price', 'float64'),
+    ('open_price', 'float64'),
+    ('high_price', 'float64'),
+    ('low_price', 'float64'),
+    ('volume', 'int64'),
+    ('change_percent', 'float64')
+)
+
+INDEX_VALUE_COLUMNS = (
+    ('id', 'int64'),
+    ('date', 'date32'),
+    ('value', 'float64'),
+    ('change_percent', 'float64')
+)
+
+def negotiate_format(accept_mimetypes):
+    """
+    Pick the response media type from a request's Accept header.
+    
+    Args:
+        accept_mimetypes: werkzeug MIMEAccept from request.accept_mimetypes
+    
+    Returns:
+        str: JSON_MIMETYPE unless the client prefers Arrow IPC stream or Parquet
+    """
+    return accept_mimetypes.best_match((JSON_MIMETYPE,) + COLUMNAR_MIMETYPES, default=JSON_MIMETYPE)
+
+def is_available():
+    """Check whether pyarrow is installed."""
+    return pa is not None
+
+def transpose_rows(rows, columns):
+    """
+    Transpose query rows into one sequence of values per column.
+    
+    Args:
+        rows (list): Result rows with values in the order of columns
+        columns (tuple): (name, Arrow type name) pairs
+    
+    Returns:
+        list: Column values
+    """
+    return list(zip(*rows)) if rows else [()] * len(columns)
+
+def encode_rows(rows, columns, mimetype, metadata=None):
+    """
+    Encode query rows as an Arrow IPC stream or Parquet file.
+    
+    Rows are transposed into one typed array per column, without building
+    per-row dictionaries.
+    
+    Args:
+        rows (list): Result rows with values in the order of columns
+        columns (tuple): (name, Arrow type name) pairs
+        mimetype (str): ARROW_STREAM_MIMETYPE or PARQUET_MIMETYPE
+        metadata (dict, optional): JSON-serializable values stored in the schema metadata
+    
+    Returns:
+        bytes: Encoded table
+    """
+    return encode_columns(transpose_rows(rows, columns), columns, mimetype, metadata)
+
+def encode_columns(values, columns, mimetype, metadata=None):
+    """
+    Encode column values as an Arrow IPC stream or Parquet file.
+    
+    Values may be Python sequences or NumPy arrays; NaN in a NumPy array is
+    encoded as null.
+    
+    Args:
+        values (list): One sequence of values per column
+        columns (tuple): (name, Arrow type name) pairs
+        mimetype (str): ARROW_STREAM_MIMETYPE or PARQUET_MIMETYPE
+        metadata (dict, optional): JSON-serializable values stored in the schema metadata
+    
+    Returns:
+        bytes: Encoded table
+    """
+    schema = pa.schema(
+        [(name, getattr(pa, type_name)()) for name, type_name in columns],
+        metadata={key: json.dumps(value) for key, value in (metadata or {}).items()}
+    )
+    table = pa.Table.from_arrays(
+        [pa.array(column_values, type=field.type, from_pandas=True) for column_values, field in zip(values, schema)],
+        schema=schema
+    )
+    
+    sink = io.BytesIO()
+    if mimetype == PARQUET_MIMETYPE:
+        pq.write_table(table, sink)
+    else:
+        with pa.ipc.new_stream(sink, schema) as writer:
+            writer.write_table(table)
+    
+    logger.debug(f"Encoded {table.num_rows} rows as {mimetype} ({sink.tell()} bytes)")
+    return sink.getvalue()
@@ -0,0 +1,147 @@
+import csv
+import io
+import json
+import logging
+import zlib
+from datetime import date, datetime
+from sqlalchemy import select
+from models import Exchange, Stock, StockPrice, Index, IndexValue, MacroIndicator, MacroIndicatorValue
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Media type of each export format
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+def build_export_query(dataset, exchange_code=None, country=None, start=None, end=None):
+    """
+    Build the column query for an export dataset.
+    
+    Rows are selected as plain columns rather than ORM objects, ordered by
+    series then date, so they can be streamed without an identity map.
+    
+    Args:
+        dataset (str): 'prices', 'indices' or 'macro'
+        exchange_code (str, optional): Exchange filter for prices and indices
+        country (str, optional): Country filter for macro indicators
+        start (date, optional): First date to include
+        end (date, optional): Last date to include
+    
+    Returns:
+        Select: Query for the dataset, or None if the dataset is unknown
+    """
+    if dataset == 'prices':
+        date_column = StockPrice.date
+        stmt = (
+            select(
+                Exchange.code.label('exchange'), Stock.ticker, StockPrice.date,
+                StockPrice.open_price, StockPrice.high_price, StockPrice.low_price,
+                StockPrice.close_price, StockPrice.volume, StockPrice.change_percent
+            )
+            .join(Stock, Stock.id == StockPrice.stock_id)
+            .join(Exchange, Exchange.id == Stock.exchange_id)
+            .order_by(StockPrice.stock_id, StockPrice.date)
+        )
+    elif dataset == 'indices':
+        date_column = IndexValue.date
+        stmt = (
+            select(
+                Exchange.code.label('exchange'), Index.code.label('index_code'), IndexValue.date,
+                IndexValue.value, IndexValue.change_percent
+            )
+            .join(Index, Index.id == IndexValue.index_id)
+            .join(Exchange, Exchange.id == Index.exchange_id)
+            .order_by(IndexValue.index_id, IndexValue.date)
+        )
+    elif dataset == 'macro':
+        date_column = MacroIndicatorValue.date
+        stmt = (
+            select(
+                MacroIndicator.country, MacroIndicator.code.label('indicator_code'), MacroIndicatorValue.date,
+                MacroIndicatorValue.value, MacroIndicator.unit
+            )
+            .join(MacroIndicator, MacroIndicator.id == MacroIndicatorValue.indicator_id)
+            .order_by(MacroIndicatorValue.indicator_id, MacroIndicatorValue.date)
+        )
+    else:
+        return None
+    
+    if exchange_code and dataset != 'macro':
+        stmt = stmt.where(Exchange.code == exchange_code)
+    if country and dataset == 'macro':
+        stmt = stmt.where(MacroIndicator.country == country)
+    if start:
+        stmt = stmt.where(date_column >= start)
+    if end:
+        stmt = stmt.where(date_column <= end)
+    
+    return stmt
+
+def iter_export_chunks(db_session, stmt, export_format):
+    """
+    Stream query results as NDJSON or CSV text chunks.
+    
+    Rows are fetched through a server-side cursor in partitions of
+    Config.API_EXPORT_CHUNK_SIZE, and each partition becomes one chunk, so
+    memory use does not grow with the size of the export.
+    
+    Args:
+        db_session: SQLAlchemy database session
+        stmt: Query from build_export_query
+        export_format (str): 'ndjson' or 'csv'
+    
+    Yields:
+        str: Encoded rows
+    """
+    result = db_session.execute(stmt.execution_options(yield_per=Config.API_EXPORT_CHUNK_SIZE))
+    columns = list(result.keys())
+    count = 0
+    
+    if export_format == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        
+        for partition in result.partitions():
+            writer.writerows(_format_row(row) for row in partition)
+            count += len(partition)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        
+        # Yield the header for empty exports
+        if buffer.tell():
+            yield buffer.getvalue()
+    else:
+        for partition in result.partitions():
+            count += len(partition)
+            yield ''.join(
+                json.dumps(dict(zip(columns, _format_row(row))), separators=(',', ':')) + '\n'
+                for row in partition
+            )
+    
+    logger.info(f"Exported {count} rows as {export_format}")
+
+def gzip_chunks(chunks):
+    """
+    Compress a stream of text chunks into a gzip stream.
+    
+    Args:
+        chunks: Iterable of str
+    
+    Yields:
+        bytes: Compressed data
+    """
+    compressor = zlib.compressobj(wbits=31)  # 31 selects the gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+def _format_row(row):
+    """Convert dates in a result row to ISO strings."""
+    return [value.isoformat() if isinstance(value, (date, datetime)) else value for value in row]
@@ -0,0 +1,161 @@
+import base64
+import json
+import logging
+from datetime import date
+from sqlalchemy import and_, or_
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class PaginationError(ValueError):
+    """Raised when a limit or cursor query parameter is invalid."""
+
+def parse_limit(value, default):
+    """
+    Parse a limit query parameter and cap it at Config.API_MAX_PAGE_SIZE.
+    
+    Args:
+        value (str): Raw query parameter, or None
+        default (int): Limit used when the parameter is missing
+    
+    Returns:
+        int: Validated limit
+    
+    Raises:
+        PaginationError: If the limit is not a positive integer
+    """
+    if value is None:
+        return min(default, Config.API_MAX_PAGE_SIZE)
+    
+    try:
+        limit = int(value)
+    except ValueError:
+        raise PaginationError('Invalid limit. Use a positive integer')
+    
+    if limit < 1:
+        raise PaginationError('Invalid limit. Use a positive integer')
+    
+    return min(limit, Config.API_MAX_PAGE_SIZE)
+
+def encode_cursor(**position):
+    """
+    Encode a keyset position as an opaque cursor token.
+    
+    Args:
+        **position: Key values of the last row on a page; dates are stored as ISO strings
+    
+    Returns:
+        str: URL-safe cursor token
+    """
+    data = {key: value.isoformat() if isinstance(value, date) else value for key, value in position.items()}
+    return base64.urlsafe_b64encode(json.dumps(data, separators=(',', ':')).encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, *keys):
+    """
+    Decode a cursor token created by encode_cursor.
+    
+    Args:
+        cursor (str): Cursor token
+        *keys: Keys the cursor must contain; 'date' is parsed back into a date
+    
+    Returns:
+        dict: Keyset position
+    
+    Raises:
+        PaginationError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        position = {key: data[key] for key in keys}
+        if 'date' in position:
+            position['date'] = date.fromisoformat(position['date'])
+        if 'id' in position and not isinstance(position['id'], int):
+            raise ValueError('id must be an integer')
+    except (ValueError, KeyError, TypeError) as e:
+        logger.debug(f"Invalid cursor {cursor[:20]}: {e}")
+        raise PaginationError('Invalid cursor')
+    
+    return position
+
+def apply_date_keyset(query, model, cursor, limit):
+    """
+    Page a query newest first on (date, id), continuing after a cursor.
+    
+    The 'date <=' bound lets the (parent_id, date) unique index serve every page
+    as a range scan; the id tie-break keeps ordering stable.
+    
+    Args:
+        query: Query already filtered to one series
+        model: Model with date and id columns, e.g. StockPrice or IndexValue
+        cursor (str): Cursor from a previous page, or None for the first page
+        limit (int): Page size
+    
+    Returns:
+        tuple: (rows, next_cursor) where next_cursor is None on the last page
+    
+    Raises:
+        PaginationError: If the cursor is malformed
+    """
+    if cursor:
+        position = decode_cursor(cursor, 'date', 'id')
+        query = query.filter(
+            model.date <= position['date'],
+            or_(model.date < position['date'], and_(model.date == position['date'], model.id < position['id']))
+        )
+    
+    rows = query.order_by(model.date.desc(), model.id.desc()).limit(limit + 1).all()
+    return _page(rows, limit, lambda row: encode_cursor(date=row.date, id=row.id))
+
+def apply_keyset(query, model, cursor, limit, sort='id', descending=False):
+    """
+    Page a query ordered by one column, continuing after a cursor.
+    
+    Rows are ordered on (sort column, id) so ties keep a stable order, and
+    the cursor carries both values of the previous page's last row. Ordering
+    by id alone keeps the original {'id'} cursor.
+    
+    Args:
+        query: Filtered query
+        model: Model with an id column
+        cursor (str): Cursor from a previous page, or None for the first page
+        limit (int): Page size
+        sort (str): Name of a non-nullable column to order by
+        descending (bool): Order from the highest value down
+    
+    Returns:
+        tuple: (rows, next_cursor) where next_cursor is None on the last page
+    
+    Raises:
+        PaginationError: If the cursor is malformed or was issued for another sort order
+    """
+    sort_key = f'-{sort}' if descending else sort
+    columns = [model.id] if sort == 'id' else [getattr(model, sort), model.id]
+    
+    def after(column, value):
+        return column < value if descending else column > value
+    
+    if cursor:
+        if sort == 'id':
+            position = decode_cursor(cursor, 'id')
+            query = query.filter(after(model.id, position['id']))
+        else:
+            position = decode_cursor(cursor, 'sort', 'value', 'id')
+            if position['sort'] != sort_key:
+                raise PaginationError('Invalid cursor')
+            query = query.filter(or_(
+                after(columns[0], position['value']),
+                and_(columns[0] == position['value'], after(model.id, position['id']))
+            ))
+    
+    rows = query.order_by(*[column.desc() if descending else column for column in columns]).limit(limit + 1).all()
+    if sort == 'id':
+        return _page(rows, limit, lambda row: encode_cursor(id=row.id))
+    return _page(rows, limit, lambda row: encode_cursor(sort=sort_key, value=getattr(row, sort), id=row.id))
+
+def _page(rows, limit, make_cursor):
+    """Trim the look-ahead row and build the next cursor from the last row kept."""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, make_cursor(rows[-1])
+    return rows, None
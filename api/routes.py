@@ -1,17 +1,29 @@
 import logging
 from datetime import datetime, timedelta
-from flask import Blueprint, jsonify, request, abort, current_app, g
+from flask import Blueprint, Response, jsonify, request, abort, current_app, g, stream_with_context
 from flask_login import login_required, current_user
 from functools import wraps
-from sqlalchemy import desc
-from models import (User, Exchange, Stock, StockPrice, 
+from sqlalchemy import and_, desc, func, tuple_
+from sqlalchemy.orm import contains_eager, joinedload
+from models import (User, Exchange, Stock, StockPrice, LatestQuote, DailyExchangeStats,
                    Index, IndexValue, MacroIndicator, 
                    MacroIndicatorValue, MarketSummary)
+from app import db
+from config import Config
 from api.serializers import (serialize_exchange, serialize_stock, 
                            serialize_stock_price, serialize_index, 
                            serialize_index_value, serialize_macro_indicator,
-                           serialize_macro_value, serialize_market_summary)
+                           serialize_macro_value, serialize_market_summary,
+                           serialize_latest_quote, serialize_mover,
+                           serialize_daily_exchange_stats)
 from api.auth import TokenAuth
+from api.cache import cached_endpoint
+from api import columnar
+from api.export import EXPORT_FORMATS, build_export_query, iter_export_chunks, gzip_chunks
+from api.pagination import (PaginationError, parse_limit, apply_date_keyset, apply_keyset,
+                            decode_cursor, encode_cursor)
+from etl.price_store import price_store
+from tasks.market_movers import expand_mover_entries
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +33,15 @@ api_bp = Blueprint('api', __name__, url_prefix='/api/v1')
 # Authentication helper
 token_auth = TokenAuth()
 
+# Sort orders accepted by get_stocks: (column, descending)
+STOCK_SORT_ORDERS = {
+    'id': ('id', False),
+    'ticker': ('ticker', False),
+    'ticker_desc': ('ticker', True),
+    'name': ('name', False),
+    'name_desc': ('name', True)
+}
+
 def token_required(f):
     """Decorator to require API token authentication."""
     @wraps(f)
@@ -40,6 +61,29 @@ def token_required(f):
         return f(*args, **kwargs)
     return decorated
 
+def columnar_response(values, columns, mimetype, metadata, next_cursor):
+    """
+    Build an Arrow IPC stream or Parquet response for history rows.
+    
+    Args:
+        values (list): One sequence of values per column
+        columns (tuple): (name, Arrow type name) pairs
+        mimetype (str): Negotiated columnar media type
+        metadata (dict): Series information stored in the schema metadata
+        next_cursor (str): Cursor for the next page, returned in X-Next-Cursor
+        
+    Returns:
+        Response: Encoded table, or a 406 error if pyarrow is not installed
+    """
+    if not columnar.is_available():
+        return jsonify({'error': f'{mimetype} responses are not available on this server'}), 406
+    
+    response = Response(columnar.encode_columns(values, columns, mimetype, metadata), mimetype=mimetype)
+    response.headers['Vary'] = 'Accept'
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
 def register_api_routes(app):
     """Register API routes with the Flask app."""
     app.register_blueprint(api_bp)
@@ -48,6 +92,7 @@ def register_api_routes(app):
 # API endpoints
 @api_bp.route('/exchanges', methods=['GET'])
 @token_required
+@cached_endpoint
 def get_exchanges():
     """Get all exchanges."""
     exchanges = Exchange.query.all()
@@ -55,6 +100,7 @@ def get_exchanges():
 
 @api_bp.route('/exchanges/<string:code>', methods=['GET'])
 @token_required
+@cached_endpoint
 def get_exchange(code):
     """Get a specific exchange by code."""
     exchange = Exchange.query.filter_by(code=code).first_or_404()
@@ -65,21 +111,27 @@ def get_exchange(code):
 def get_exchange_stocks(code):
     """Get all stocks for a specific exchange."""
     exchange = Exchange.query.filter_by(code=code).first_or_404()
-    stocks = Stock.query.filter_by(exchange_id=exchange.id).all()
+    stocks = Stock.query.options(joinedload(Stock.exchange)).filter_by(exchange_id=exchange.id).all()
     return jsonify([serialize_stock(stock) for stock in stocks])
 
 @api_bp.route('/stocks', methods=['GET'])
 @token_required
 def get_stocks():
-    """Get stocks with optional filtering."""
+    """Get stocks with optional filtering and sorting."""
     # Get query parameters
     exchange_code = request.args.get('exchange')
     sector = request.args.get('sector')
     ticker_filter = request.args.get('ticker')
-    limit = int(request.args.get('limit', 100))
+    sort = request.args.get('sort', 'id')
+    limit = parse_limit(request.args.get('limit'), 100)
+    cursor = request.args.get('cursor')
     
-    # Build query
-    query = Stock.query
+    if sort not in STOCK_SORT_ORDERS:
+        return jsonify({'error': f"Invalid sort. Use one of: {', '.join(STOCK_SORT_ORDERS)}"}), 400
+    sort_column, descending = STOCK_SORT_ORDERS[sort]
+    
+    # Build query, loading each stock's exchange in the same query for serialization
+    query = Stock.query.options(joinedload(Stock.exchange))
     
     # Apply filters
     if exchange_code:
@@ -93,9 +145,13 @@ def get_stocks():
     if ticker_filter:
         query = query.filter(Stock.ticker.ilike(f'%{ticker_filter}%'))
     
-    # Get results
-    stocks = query.limit(limit).all()
-    return jsonify([serialize_stock(stock) for stock in stocks])
+    # Get one page of results; the body stays a plain list, so the cursor for
+    # the next page is returned in a header
+    stocks, next_cursor = apply_keyset(query, Stock, cursor, limit, sort=sort_column, descending=descending)
+    response = jsonify([serialize_stock(stock) for stock in stocks])
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
 
 @api_bp.route('/stocks/<string:exchange_code>/<string:ticker>', methods=['GET'])
 @token_required
@@ -112,49 +168,268 @@ def get_stock_prices(exchange_code, ticker):
     # Get query parameters
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
-    limit = int(request.args.get('limit', 30))
+    limit = parse_limit(request.args.get('limit'), 30)
+    cursor = request.args.get('cursor')
     
     # Find the stock
     exchange = Exchange.query.filter_by(code=exchange_code).first_or_404()
     stock = Stock.query.filter_by(exchange_id=exchange.id, ticker=ticker).first_or_404()
     
-    # Build query
-    query = StockPrice.query.filter_by(stock_id=stock.id)
-    
-    # Apply date filters
+    # Parse date filters
+    start = end = None
     if start_date:
         try:
             start = datetime.strptime(start_date, '%Y-%m-%d').date()
-            query = query.filter(StockPrice.date >= start)
         except ValueError:
             return jsonify({'error': 'Invalid start_date format. Use YYYY-MM-DD'}), 400
     
     if end_date:
         try:
             end = datetime.strptime(end_date, '%Y-%m-%d').date()
-            query = query.filter(StockPrice.date <= end)
         except ValueError:
             return jsonify({'error': 'Invalid end_date format. Use YYYY-MM-DD'}), 400
     
-    # Get results ordered by date
-    prices = query.order_by(StockPrice.date.desc()).limit(limit).all()
+    mimetype = columnar.negotiate_format(request.accept_mimetypes)
+    
+    # Serve the page from the memory-mapped price store when it holds the stock
+    position = decode_cursor(cursor, 'date', 'id') if cursor else None
+    stored = price_store.history_page(stock.id, limit, start, end, position)
+    if stored is not None:
+        page, next_position = stored
+        next_cursor = encode_cursor(**next_position) if next_position else None
+        if mimetype in columnar.COLUMNAR_MIMETYPES:
+            return columnar_response(price_store.column_values(page), columnar.STOCK_PRICE_COLUMNS, mimetype,
+                                     {'stock': serialize_stock(stock)}, next_cursor)
+        return jsonify({
+            'stock': serialize_stock(stock),
+            'prices': [serialize_stock_price(price) for price in price_store.rows(page)],
+            'next_cursor': next_cursor
+        })
+    
+    # Build query
+    query = StockPrice.query.filter_by(stock_id=stock.id)
+    if start:
+        query = query.filter(StockPrice.date >= start)
+    if end:
+        query = query.filter(StockPrice.date <= end)
+    
+    # Columnar formats read plain column rows instead of model instances
+    if mimetype in columnar.COLUMNAR_MIMETYPES:
+        query = query.with_entities(*[getattr(StockPrice, name) for name, _ in columnar.STOCK_PRICE_COLUMNS])
+        rows, next_cursor = apply_date_keyset(query, StockPrice, cursor, limit)
+        return columnar_response(columnar.transpose_rows(rows, columnar.STOCK_PRICE_COLUMNS), columnar.STOCK_PRICE_COLUMNS,
+                                 mimetype, {'stock': serialize_stock(stock)}, next_cursor)
+    
+    # Get one page of results, newest first
+    prices, next_cursor = apply_date_keyset(query, StockPrice, cursor, limit)
     
     # Return results with stock information
     return jsonify({
         'stock': serialize_stock(stock),
-        'prices': [serialize_stock_price(price) for price in prices]
+        'prices': [serialize_stock_price(price) for price in prices],
+        'next_cursor': next_cursor
     })
 
+@api_bp.route('/stocks/prices', methods=['POST'])
+@token_required
+def get_batch_stock_prices():
+    """
+    Get price histories for many stocks in one request.
+    
+    Expects a JSON body like {"stocks": [{"exchange": "JSE", "ticker": "NPN"}, ...],
+    "start_date": "YYYY-MM-DD", "end_date": "YYYY-MM-DD", "limit": 30}, where
+    limit is the number of most recent prices returned per stock.
+    """
+    data = request.get_json(silent=True) or {}
+    pairs = data.get('stocks')
+    if not isinstance(pairs, list) or not pairs:
+        return jsonify({'error': 'stocks must be a non-empty list of {"exchange", "ticker"} objects'}), 400
+    
+    if len(pairs) > Config.API_MAX_BATCH_STOCKS:
+        return jsonify({'error': f'At most {Config.API_MAX_BATCH_STOCKS} stocks per request'}), 400
+    
+    try:
+        keys = {(str(pair['exchange']), str(pair['ticker'])) for pair in pairs}
+    except (TypeError, KeyError):
+        return jsonify({'error': 'Each stock needs an exchange and a ticker'}), 400
+    
+    limit = parse_limit(str(data['limit']) if data.get('limit') is not None else None, 30)
+    
+    # Parse date filters
+    start = end = None
+    if data.get('start_date'):
+        try:
+            start = datetime.strptime(data['start_date'], '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid start_date format. Use YYYY-MM-DD'}), 400
+    
+    if data.get('end_date'):
+        try:
+            end = datetime.strptime(data['end_date'], '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid end_date format. Use YYYY-MM-DD'}), 400
+    
+    # Resolve all stocks in one query
+    stocks = (
+        Stock.query.join(Stock.exchange)
+        .options(contains_eager(Stock.exchange))
+        .filter(tuple_(Exchange.code, Stock.ticker).in_(keys))
+        .all()
+    )
+    stocks_by_id = {stock.id: stock for stock in stocks}
+    
+    # Take the histories held by the price store from it and query the rest
+    series = {}
+    for stock_id in stocks_by_id:
+        stored = price_store.history_page(stock_id, limit, start, end)
+        if stored is not None:
+            series[stock_id] = [serialize_stock_price(price) for price in price_store.rows(stored[0])]
+    queried_ids = [stock_id for stock_id in stocks_by_id if stock_id not in series]
+    
+    # Rank each stock's prices newest first so one query returns the latest
+    # `limit` rows per stock
+    rank = func.row_number().over(
+        partition_by=StockPrice.stock_id,
+        order_by=(StockPrice.date.desc(), StockPrice.id.desc())
+    ).label('rank')
+    ranked = db.session.query(StockPrice.id, rank).filter(StockPrice.stock_id.in_(queried_ids))
+    if start:
+        ranked = ranked.filter(StockPrice.date >= start)
+    if end:
+        ranked = ranked.filter(StockPrice.date <= end)
+    
+    ranked = ranked.subquery()
+    prices = (
+        StockPrice.query.join(ranked, StockPrice.id == ranked.c.id)
+        .filter(ranked.c.rank <= limit)
+        .order_by(StockPrice.stock_id, StockPrice.date.desc(), StockPrice.id.desc())
+        .all()
+    ) if queried_ids else []
+    
+    # Group prices by stock
+    series.update((stock_id, []) for stock_id in queried_ids)
+    for price in prices:
+        series[price.stock_id].append(serialize_stock_price(price))
+    
+    found = {(stock.exchange.code, stock.ticker) for stock in stocks}
+    return jsonify({
+        'series': [
+            {'stock': serialize_stock(stock), 'prices': series[stock_id]}
+            for stock_id, stock in stocks_by_id.items()
+        ],
+        'missing': [{'exchange': exchange, 'ticker': ticker} for exchange, ticker in sorted(keys - found)]
+    })
+
+@api_bp.route('/quotes', methods=['GET'])
+@token_required
+def get_latest_quotes():
+    """Get the latest price of every stock, optionally for one exchange."""
+    exchange_code = request.args.get('exchange')
+    
+    # One read of the precomputed latest_quote table with stock and exchange joined in
+    query = (
+        LatestQuote.query.join(LatestQuote.stock).join(Stock.exchange)
+        .options(contains_eager(LatestQuote.stock).contains_eager(Stock.exchange))
+    )
+    
+    if exchange_code:
+        query = query.filter(Exchange.code == exchange_code)
+    
+    quotes = query.order_by(Exchange.code, Stock.ticker).all()
+    return jsonify([serialize_latest_quote(quote) for quote in quotes])
+
+@api_bp.route('/movers', methods=['GET'])
+@token_required
+def get_movers():
+    """Get top gainers, losers and most active stocks per exchange for a date, by default each exchange's latest."""
+    # Get query parameters
+    exchange_code = request.args.get('exchange')
+    date_str = request.args.get('date')
+    limit = min(parse_limit(request.args.get('limit'), 5), Config.DAILY_STATS_TOP_MOVERS)
+    
+    exchanges = Exchange.query
+    if exchange_code:
+        exchanges = exchanges.filter_by(code=exchange_code)
+    exchange_codes = {exchange.id: exchange.code for exchange in exchanges.all()}
+    if exchange_code and not exchange_codes:
+        abort(404)
+    
+    # Movers are precomputed in each exchange's daily stats row
+    stats = DailyExchangeStats.query.filter(DailyExchangeStats.exchange_id.in_(exchange_codes))
+    if date_str:
+        try:
+            date = datetime.strptime(date_str, '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+        stats = stats.filter(DailyExchangeStats.date == date).all()
+    else:
+        # Default to each exchange's own most recent trading date with stats, so an
+        # exchange a day behind (e.g. after a local holiday) is still listed
+        latest = (
+            db.session.query(DailyExchangeStats.exchange_id, func.max(DailyExchangeStats.date).label('date'))
+            .filter(DailyExchangeStats.exchange_id.in_(exchange_codes))
+            .group_by(DailyExchangeStats.exchange_id)
+            .subquery()
+        )
+        stats = stats.join(latest, and_(
+            DailyExchangeStats.exchange_id == latest.c.exchange_id,
+            DailyExchangeStats.date == latest.c.date
+        )).all()
+        date = max((row.date for row in stats), default=None)
+    
+    top_movers = expand_mover_entries(db.session, [row.top_movers for row in stats])
+    
+    return jsonify({
+        'date': date.isoformat() if date else None,
+        'exchanges': {
+            exchange_codes[row.exchange_id]: {
+                'date': row.date.isoformat(),
+                **{
+                    mover_type: [serialize_mover(entry, exchange_codes[row.exchange_id]) for entry in entries[:limit]]
+                    for mover_type, entries in movers.items()
+                }
+            }
+            for row, movers in zip(stats, top_movers)
+        }
+    })
+
+@api_bp.route('/exchanges/<string:code>/stats', methods=['GET'])
+@token_required
+def get_exchange_stats(code):
+    """Get an exchange's daily breadth, volume and top movers for a date."""
+    date_str = request.args.get('date')
+    exchange = Exchange.query.filter_by(code=code).first_or_404()
+    
+    if date_str:
+        try:
+            date = datetime.strptime(date_str, '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+        stats = db.session.get(DailyExchangeStats, (exchange.id, date))
+    else:
+        # Latest trading date
+        stats = (
+            DailyExchangeStats.query.filter_by(exchange_id=exchange.id)
+            .order_by(DailyExchangeStats.date.desc())
+            .first()
+        )
+    
+    if not stats:
+        abort(404)
+    top_movers = expand_mover_entries(db.session, [stats.top_movers])[0]
+    return jsonify(serialize_daily_exchange_stats(stats, exchange.code, top_movers))
+
 @api_bp.route('/indices', methods=['GET'])
 @token_required
+@cached_endpoint
 def get_indices():
     """Get indices with optional filtering."""
     # Get query parameters
     exchange_code = request.args.get('exchange')
-    limit = int(request.args.get('limit', 100))
+    limit = parse_limit(request.args.get('limit'), 100)
     
-    # Build query
-    query = Index.query
+    # Build query, loading each index's exchange in the same query for serialization
+    query = Index.query.options(joinedload(Index.exchange))
     
     # Apply filters
     if exchange_code:
@@ -181,7 +456,8 @@ def get_index_values(exchange_code, code):
     # Get query parameters
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
-    limit = int(request.args.get('limit', 30))
+    limit = parse_limit(request.args.get('limit'), 30)
+    cursor = request.args.get('cursor')
     
     # Find the index
     exchange = Exchange.query.filter_by(code=exchange_code).first_or_404()
@@ -205,13 +481,22 @@ def get_index_values(exchange_code, code):
         except ValueError:
             return jsonify({'error': 'Invalid end_date format. Use YYYY-MM-DD'}), 400
     
-    # Get results ordered by date
-    values = query.order_by(IndexValue.date.desc()).limit(limit).all()
+    # Columnar formats read plain column rows instead of model instances
+    mimetype = columnar.negotiate_format(request.accept_mimetypes)
+    if mimetype in columnar.COLUMNAR_MIMETYPES:
+        query = query.with_entities(*[getattr(IndexValue, name) for name, _ in columnar.INDEX_VALUE_COLUMNS])
+        rows, next_cursor = apply_date_keyset(query, IndexValue, cursor, limit)
+        return columnar_response(columnar.transpose_rows(rows, columnar.INDEX_VALUE_COLUMNS), columnar.INDEX_VALUE_COLUMNS,
+                                 mimetype, {'index': serialize_index(index)}, next_cursor)
+    
+    # Get one page of results, newest first
+    values, next_cursor = apply_date_keyset(query, IndexValue, cursor, limit)
     
     # Return results with index information
     return jsonify({
         'index': serialize_index(index),
-        'values': [serialize_index_value(value) for value in values]
+        'values': [serialize_index_value(value) for value in values],
+        'next_cursor': next_cursor
     })
 
 @api_bp.route('/macro-indicators', methods=['GET'])
@@ -221,7 +506,7 @@ def get_macro_indicators():
     # Get query parameters
     country = request.args.get('country')
     category = request.args.get('category')
-    limit = int(request.args.get('limit', 100))
+    limit = parse_limit(request.args.get('limit'), 100)
     
     # Build query
     query = MacroIndicator.query
@@ -239,10 +524,11 @@ def get_macro_indicators():
 
 @api_bp.route('/market-summaries', methods=['GET'])
 @token_required
+@cached_endpoint
 def get_market_summaries():
     """Get recent market summaries."""
     # Get query parameters
-    limit = int(request.args.get('limit', 10))
+    limit = parse_limit(request.args.get('limit'), 10)
     
     # Get results
     summaries = MarketSummary.query.order_by(MarketSummary.date.desc()).limit(limit).all()
@@ -260,6 +546,53 @@ def get_market_summary(date):
     summary = MarketSummary.query.filter_by(date=summary_date).first_or_404()
     return jsonify(serialize_market_summary(summary))
 
+@api_bp.route('/export/<string:dataset>', methods=['GET'])
+@token_required
+def export_history(dataset):
+    """Stream the full history of prices, indices or macro indicators as NDJSON or CSV."""
+    # Get query parameters
+    export_format = request.args.get('format', 'ndjson')
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    start = end = None
+    
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"Invalid format. Use one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    
+    # Apply date filters
+    if start_date:
+        try:
+            start = datetime.strptime(start_date, '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'error': 'Invalid start_date format. Use YYYY-MM-DD'}), 400
+    
+    if end_date:
+        try:
+            end = datetime.strptime(end_date, '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'error': 'Invalid end_date format. Use YYYY-MM-DD'}), 400
+    
+    stmt = build_export_query(
+        dataset,
+        exchange_code=request.args.get('exchange'),
+        country=request.args.get('country'),
+        start=start,
+        end=end
+    )
+    if stmt is None:
+        abort(404)
+    
+    chunks = iter_export_chunks(db.session, stmt, export_format)
+    headers = {'Content-Disposition': f'attachment; filename={dataset}.{export_format}'}
+    
+    # Compress on the fly when the client accepts gzip
+    if 'gzip' in request.accept_encodings:
+        chunks = gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+        headers['Vary'] = 'Accept-Encoding'
+    
+    return Response(stream_with_context(chunks), mimetype=EXPORT_FORMATS[export_format], headers=headers)
+
 @api_bp.route('/token', methods=['POST'])
 @login_required
 def get_token():
@@ -288,6 +621,10 @@ def validate_token():
     })
 
 # Error handlers
+@api_bp.errorhandler(PaginationError)
+def bad_pagination(error):
+    return jsonify({'error': str(error)}), 400
+
 @api_bp.errorhandler(404)
 def not_found(error):
     return jsonify({'error': 'Resource not found'}), 404
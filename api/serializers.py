@@ -41,6 +41,53 @@ def serialize_stock_price(price):
         'change_percent': price.change_percent
     }
 
+def serialize_latest_quote(quote):
+    """Serialize a LatestQuote object, with its stock's identifiers, to a dictionary."""
+    return {
+        'ticker': quote.stock.ticker,
+        'name': quote.stock.name,
+        'exchange': quote.stock.exchange.code,
+        'currency': quote.stock.currency,
+        'date': quote.date.isoformat(),
+        'close_price': quote.close_price,
+        'open_price': quote.open_price,
+        'high_price': quote.high_price,
+        'low_price': quote.low_price,
+        'volume': quote.volume,
+        'change_percent': quote.change_percent
+    }
+
+def serialize_mover(entry, exchange_code):
+    """Serialize a top mover entry from daily_exchange_stats to a dictionary."""
+    return {
+        'ticker': entry['ticker'],
+        'name': entry['name'],
+        'exchange': exchange_code,
+        'currency': entry['currency'],
+        'close_price': entry['close_price'],
+        'change_percent': entry['change_percent'],
+        'volume': entry['volume']
+    }
+
+def serialize_daily_exchange_stats(stats, exchange_code, top_movers):
+    """Serialize a DailyExchangeStats object and its expanded top movers to a dictionary."""
+    return {
+        'exchange': exchange_code,
+        'date': stats.date.isoformat(),
+        'stock_count': stats.stock_count,
+        'advancers': stats.advancers,
+        'decliners': stats.decliners,
+        'unchanged': stats.unchanged,
+        'total_volume': stats.total_volume,
+        'turnover': stats.turnover,
+        'breadth': stats.breadth,
+        'top_movers': {
+            mover_type: [serialize_mover(entry, exchange_code) for entry in entries]
+            for mover_type, entries in top_movers.items()
+        },
+        'updated_at': stats.updated_at.isoformat() if stats.updated_at else None
+    }
+
 def serialize_index(index):
     """Serialize an Index object to a dictionary."""
     return {
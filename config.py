@@ -13,9 +13,41 @@ class Config:
     # Scraping settings
     USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
     REQUEST_TIMEOUT = 30  # seconds
+    HTTP_POOL_CONNECTIONS = 10  # number of hosts with pooled connections
+    HTTP_POOL_MAXSIZE = 10  # connections kept alive per host
+    HTTP_MAX_RETRIES = 3
+    HTTP_BACKOFF_FACTOR = 0.5  # seconds, doubled on each retry
+    HTTP_MAX_CONCURRENCY = 8  # requests in flight across all hosts in fetch_many
+    HTTP_RATE_LIMIT_PER_HOST = 2.0  # requests per second
+    HTTP_RATE_BURST = 4  # requests allowed back to back before the rate limit applies
+    
+    # On-disk response cache for conditional GETs (empty HTTP_CACHE_DIR disables it)
+    HTTP_CACHE_DIR = os.environ.get("HTTP_CACHE_DIR", ".http_cache")
+    HTTP_CACHE_MAX_BYTES = 100 * 1024 * 1024
+    HTTP_CACHE_TTL = 7 * 24 * 3600  # seconds before a page is refetched without validators
+    HTTP_CACHE_URL_TTLS = {}  # TTL overrides keyed by URL prefix
+    
+    # Memory-mapped price histories served by the history endpoints (empty PRICE_STORE_DIR disables it)
+    PRICE_STORE_DIR = os.environ.get("PRICE_STORE_DIR", "")
+    
+    # ETL settings
+    ETL_MAX_WORKERS = int(os.environ.get("ETL_MAX_WORKERS", 3))  # exchanges processed concurrently
+    ETL_PIPELINE_QUEUE_SIZE = 2  # scraped datasets buffered ahead of the loader
+    HISTORY_PARTITIONS_AHEAD = 1  # yearly stock_price/index_value partitions created beyond the current year (PostgreSQL)
     
     # API settings
     API_TOKEN_EXPIRATION = 7 * 24 * 3600  # 7 days in seconds
+    API_TOKEN_CACHE_SIZE = 10000  # validated tokens kept in memory per process
+    API_TOKEN_CACHE_TTL = 300  # seconds before a cached token is checked against the database again
+    API_TOKEN_PURGE_INTERVAL = 60  # minutes between expired token sweeps
+    API_TOKEN_PURGE_BATCH_SIZE = 1000  # expired tokens deleted per transaction
+    API_MAX_PAGE_SIZE = 1000  # upper bound for the limit query parameter
+    API_MAX_BATCH_STOCKS = 200  # stocks accepted by one batch price request
+    DAILY_STATS_TOP_MOVERS = 10  # gainers, losers and most active stocks kept per exchange and date
+    API_EXPORT_CHUNK_SIZE = 5000  # rows fetched from the database per streamed export chunk
+    API_RESPONSE_CACHE_SIZE = 1000  # cached reference endpoint responses per process
+    API_RESPONSE_MAX_AGE = 300  # seconds clients may reuse a cached response before revalidating
+    API_DATA_VERSION_TTL = 30  # seconds before the data version is re-read from the database
     
 class DevelopmentConfig(Config):
     """Development configuration."""
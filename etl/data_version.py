@@ -0,0 +1,76 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from models import DataVersion
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Version name shared by all market data loads
+MARKET_DATA = 'market'
+
+# Last version seen by this process and when it was read
+_current = {'version': None, 'checked_at': 0.0}
+_lock = threading.Lock()
+
+def get_data_version(db_session):
+    """
+    Get the current market data version.
+    
+    The stored version is re-read at most every Config.API_DATA_VERSION_TTL
+    seconds, so most calls return without a query. Bumps made in this process
+    are seen immediately; bumps from other processes within the TTL.
+    
+    Args:
+        db_session: SQLAlchemy database session
+    
+    Returns:
+        int: Data version
+    """
+    now = time.monotonic()
+    with _lock:
+        if _current['version'] is not None and now - _current['checked_at'] < Config.API_DATA_VERSION_TTL:
+            return _current['version']
+    
+    version = db_session.query(DataVersion.version).filter_by(name=MARKET_DATA).scalar() or 0
+    _remember(version)
+    return version
+
+def bump_data_version(db_session):
+    """
+    Increment the market data version after a successful load.
+    
+    Args:
+        db_session: SQLAlchemy database session
+    
+    Returns:
+        int: New data version
+    """
+    now = datetime.utcnow()
+    updated = db_session.query(DataVersion).filter_by(name=MARKET_DATA).update(
+        {'version': DataVersion.version + 1, 'updated_at': now}, synchronize_session=False
+    )
+    
+    if not updated:
+        try:
+            db_session.add(DataVersion(name=MARKET_DATA, version=1, updated_at=now))
+            db_session.commit()
+        except IntegrityError:
+            # Another process created the row first
+            db_session.rollback()
+            return bump_data_version(db_session)
+    else:
+        db_session.commit()
+    
+    version = db_session.query(DataVersion.version).filter_by(name=MARKET_DATA).scalar()
+    _remember(version)
+    logger.debug(f"Market data version is now {version}")
+    return version
+
+def _remember(version):
+    """Store the version seen by this process."""
+    with _lock:
+        _current['version'] = version
+        _current['checked_at'] = time.monotonic()
@@ -1,37 +1,78 @@
 import logging
+import time
 from datetime import datetime
+from sqlalchemy import case, delete, func, insert, literal, select, update
 from sqlalchemy.exc import SQLAlchemyError
-from models import Exchange, Stock, StockPrice, Index, IndexValue
+from models import Exchange, Stock, StockPrice, LatestQuote, DailyExchangeStats, Index, IndexValue, LoadedDataset
+from config import Config
+from etl.data_version import bump_data_version
+from etl.price_store import price_store
+from tasks.market_movers import get_top_movers_by_date, stored_mover_entry, MOVER_TYPES
 
 logger = logging.getLogger(__name__)
 
+# Columns rewritten when a (stock_id, date) price row already exists
+STOCK_PRICE_UPDATE_COLUMNS = (
+    'close_price', 'open_price', 'high_price', 'low_price', 'volume', 'change_percent'
+)
+
+# Stock attributes compared during ticker reconciliation
+STOCK_RECONCILE_COLUMNS = ('name', 'sector', 'currency')
+
+# Columns rewritten when an (index_id, date) value row already exists
+INDEX_VALUE_UPDATE_COLUMNS = ('value', 'change_percent')
+
+# Price columns copied into latest_quote
+LATEST_QUOTE_COLUMNS = ('date',) + STOCK_PRICE_UPDATE_COLUMNS
+
+# Columns rewritten when an (exchange_id, date) daily stats row already exists
+DAILY_STATS_UPDATE_COLUMNS = (
+    'stock_count', 'advancers', 'decliners', 'unchanged', 'total_volume', 'turnover',
+    'breadth', 'top_movers', 'updated_at'
+)
+
 class DataLoader:
     """Loads transformed data into the database."""
     
-    def __init__(self, db_session):
+    def __init__(self, db_session, batch_size=500):
         """
         Initialize the data loader.
         
         Args:
             db_session: SQLAlchemy database session
+            batch_size (int): Number of rows written per bulk upsert statement
         """
         self.db_session = db_session
+        self.batch_size = batch_size
+        # Timing of each bulk upsert batch from the most recent load, including the
+        # daily_exchange_stats refresh that follows a price load
+        self.batch_stats = []
     
-    def load_stocks(self, transformed_stocks, exchange_code):
+    def load_stocks(self, transformed_stocks, exchange_code, bulk=True):
         """
         Load transformed stock data into the database.
         
+        When bulk is enabled the stocks are reconciled against the exchange's
+        existing tickers in memory (see reconcile_stocks). Otherwise each ticker
+        is looked up and rewritten through the ORM.
+        
         Args:
             transformed_stocks (list): List of transformed stock dictionaries
             exchange_code (str): Exchange code
+            bulk (bool): Use the batched reconciliation path
             
         Returns:
             int: Number of stocks processed
         """
+        self.batch_stats = []
         if not transformed_stocks:
             logger.warning(f"No stocks to load for {exchange_code}")
             return 0
         
+        if bulk:
+            counts = self.reconcile_stocks(transformed_stocks, exchange_code)
+            return sum(counts.values())
+        
         processed_count = 0
         
         try:
@@ -75,6 +116,7 @@ class DataLoader:
             
             self.db_session.commit()
             logger.info(f"Loaded {processed_count} stocks for {exchange_code}")
+            bump_data_version(self.db_session)
             
         except SQLAlchemyError as e:
             logger.error(f"Database error loading stocks for {exchange_code}: {str(e)}")
@@ -85,17 +127,104 @@ class DataLoader:
         
         return processed_count
     
-    def load_stock_prices(self, transformed_prices, exchange_code):
+    def reconcile_stocks(self, transformed_stocks, exchange_code):
+        """
+        Reconcile scraped stocks with the exchange's existing tickers.
+        
+        Existing tickers are loaded in one query and diffed in memory. New
+        tickers are inserted in bulk and only rows whose name, sector or
+        currency actually changed are updated, so unchanged stocks are never
+        rewritten.
+        
+        Args:
+            transformed_stocks (list): List of transformed stock dictionaries
+            exchange_code (str): Exchange code
+            
+        Returns:
+            dict: Counts of 'inserted', 'updated' and 'unchanged' stocks
+        """
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        if not transformed_stocks:
+            logger.warning(f"No stocks to load for {exchange_code}")
+            return counts
+        
+        try:
+            exchange = self._get_or_create_exchange(exchange_code)
+            
+            # Later entries for the same ticker win, as they would with row-by-row updates
+            incoming = {}
+            for stock_data in transformed_stocks:
+                ticker = stock_data.get('ticker')
+                if not ticker:
+                    logger.warning(f"Skipping stock without ticker: {stock_data}")
+                    continue
+                incoming[ticker] = {column: stock_data.get(column) for column in STOCK_RECONCILE_COLUMNS}
+            
+            existing = {
+                row.ticker: row
+                for row in self.db_session.query(
+                    Stock.id, Stock.ticker, Stock.name, Stock.sector, Stock.currency
+                ).filter(Stock.exchange_id == exchange.id).all()
+            }
+            
+            now = datetime.now()
+            new_rows = []
+            changed_rows = []
+            
+            for ticker, values in incoming.items():
+                current = existing.get(ticker)
+                if current is None:
+                    new_rows.append(dict(
+                        values, ticker=ticker, exchange_id=exchange.id,
+                        created_at=now, last_updated=now
+                    ))
+                elif any(getattr(current, column) != values[column] for column in STOCK_RECONCILE_COLUMNS):
+                    changed_rows.append(dict(values, id=current.id, last_updated=now))
+                else:
+                    counts['unchanged'] += 1
+            
+            if new_rows:
+                self.db_session.execute(insert(Stock), new_rows)
+            if changed_rows:
+                self.db_session.execute(update(Stock), changed_rows)
+            
+            self.db_session.commit()
+            counts['inserted'] = len(new_rows)
+            counts['updated'] = len(changed_rows)
+            if new_rows or changed_rows:
+                bump_data_version(self.db_session)
+            logger.info(
+                f"Reconciled stocks for {exchange_code}: {counts['inserted']} inserted, "
+                f"{counts['updated']} updated, {counts['unchanged']} unchanged"
+            )
+            
+        except SQLAlchemyError as e:
+            logger.error(f"Database error reconciling stocks for {exchange_code}: {str(e)}")
+            self.db_session.rollback()
+        except Exception as e:
+            logger.error(f"Error reconciling stocks for {exchange_code}: {str(e)}")
+            self.db_session.rollback()
+        
+        return counts
+    
+    def load_stock_prices(self, transformed_prices, exchange_code, bulk=True):
         """
         Load transformed stock price data into the database.
         
+        When bulk is enabled and the database supports it (PostgreSQL, SQLite),
+        prices are written in batches with one INSERT ... ON CONFLICT DO UPDATE
+        statement per batch against the _stock_date_uc constraint. Otherwise
+        each row is looked up and merged through the ORM.
+        
         Args:
             transformed_prices (list): List of transformed price dictionaries
             exchange_code (str): Exchange code
+            bulk (bool): Use the set-based upsert path when available
             
         Returns:
             int: Number of price points processed
         """
+        self.batch_stats = []
         if not transformed_prices:
             logger.warning(f"No stock prices to load for {exchange_code}")
             return 0
@@ -115,6 +244,17 @@ class DataLoader:
                 for stock in self.db_session.query(Stock).filter_by(exchange_id=exchange.id).all()
             }
             
+            dialect_insert = self._get_dialect_insert() if bulk else None
+            if dialect_insert is not None:
+                processed_count = self._bulk_upsert_stock_prices(dialect_insert, transformed_prices, stocks)
+                logger.info(f"Loaded {processed_count} price points for {exchange_code}")
+                loaded_stock_ids = self._loaded_stock_ids(transformed_prices, stocks)
+                self.refresh_latest_quotes(loaded_stock_ids)
+                self.refresh_daily_exchange_stats(exchange.id, self._loaded_dates(transformed_prices))
+                bump_data_version(self.db_session)
+                price_store.refresh(self.db_session, since=self._first_loaded_dates(transformed_prices, stocks))
+                return processed_count
+            
             for price_data in transformed_prices:
                 try:
                     ticker = price_data.get('ticker')
@@ -176,6 +316,11 @@ class DataLoader:
             
             self.db_session.commit()
             logger.info(f"Loaded {processed_count} price points for {exchange_code}")
+            loaded_stock_ids = self._loaded_stock_ids(transformed_prices, stocks)
+            self.refresh_latest_quotes(loaded_stock_ids)
+            self.refresh_daily_exchange_stats(exchange.id, self._loaded_dates(transformed_prices))
+            bump_data_version(self.db_session)
+            price_store.refresh(self.db_session, since=self._first_loaded_dates(transformed_prices, stocks))
             
         except SQLAlchemyError as e:
             logger.error(f"Database error loading prices for {exchange_code}: {str(e)}")
@@ -186,18 +331,181 @@ class DataLoader:
         
         return processed_count
     
-    def load_indices(self, transformed_indices, transformed_values, exchange_code):
+    def refresh_latest_quotes(self, stock_ids=None):
+        """
+        Rebuild latest_quote rows from each stock's newest price.
+        
+        Rows are recomputed from stock_price rather than from the loaded data,
+        so backfilled older prices never replace a newer quote.
+        
+        Args:
+            stock_ids (iterable, optional): Stocks whose prices changed; all stocks if None
+            
+        Returns:
+            int: Number of stocks refreshed
+        """
+        if stock_ids is None:
+            stock_ids = [stock_id for (stock_id,) in self.db_session.query(StockPrice.stock_id).distinct().all()]
+        stock_ids = sorted(set(stock_ids))
+        if not stock_ids:
+            return 0
+        
+        dialect_insert = self._get_dialect_insert()
+        columns = ['stock_id', 'exchange_id', *LATEST_QUOTE_COLUMNS, 'updated_at']
+        
+        try:
+            for start in range(0, len(stock_ids), self.batch_size):
+                batch = stock_ids[start:start + self.batch_size]
+                
+                newest = (
+                    select(StockPrice.stock_id, func.max(StockPrice.date).label('date'))
+                    .where(StockPrice.stock_id.in_(batch))
+                    .group_by(StockPrice.stock_id)
+                    .subquery()
+                )
+                source = (
+                    select(
+                        StockPrice.stock_id, Stock.exchange_id,
+                        *[getattr(StockPrice, column) for column in LATEST_QUOTE_COLUMNS],
+                        literal(datetime.now()).label('updated_at')
+                    )
+                    .join(newest, (StockPrice.stock_id == newest.c.stock_id) & (StockPrice.date == newest.c.date))
+                    .join(Stock, Stock.id == StockPrice.stock_id)
+                    .where(StockPrice.stock_id.in_(batch))
+                )
+                
+                if dialect_insert is not None:
+                    stmt = dialect_insert(LatestQuote).from_select(columns, source)
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=['stock_id'],
+                        set_={column: stmt.excluded[column] for column in columns[1:]}
+                    )
+                    self.db_session.execute(stmt)
+                else:
+                    self.db_session.execute(delete(LatestQuote).where(LatestQuote.stock_id.in_(batch)))
+                    self.db_session.execute(insert(LatestQuote).from_select(columns, source))
+                
+                self.db_session.commit()
+            
+            logger.debug(f"Refreshed latest quotes for {len(stock_ids)} stocks")
+            
+        except SQLAlchemyError as e:
+            logger.error(f"Database error refreshing latest quotes: {str(e)}")
+            self.db_session.rollback()
+            return 0
+        
+        return len(stock_ids)
+    
+    def refresh_daily_exchange_stats(self, exchange_id, dates=None):
+        """
+        Recompute an exchange's daily_exchange_stats rows for the given dates.
+        
+        Breadth and volume figures come from one grouped query and top movers
+        from one windowed query over the range of the dates, and the rows are
+        written in batches.
+        
+        Args:
+            exchange_id (int): Exchange ID
+            dates (iterable, optional): Trading dates whose prices changed; every
+                date with prices if None
+            
+        Returns:
+            int: Number of dates refreshed
+        """
+        start_date = end_date = None
+        if dates is not None:
+            dates = set(dates)
+            if not dates:
+                return 0
+            start_date, end_date = min(dates), max(dates)
+        
+        price_filter = [Stock.exchange_id == exchange_id]
+        if start_date is not None:
+            price_filter.append(StockPrice.date.between(start_date, end_date))
+        
+        try:
+            aggregates = (
+                self.db_session.query(
+                    StockPrice.date,
+                    func.count(StockPrice.id).label('stock_count'),
+                    func.sum(case((StockPrice.change_percent > 0, 1), else_=0)).label('advancers'),
+                    func.sum(case((StockPrice.change_percent < 0, 1), else_=0)).label('decliners'),
+                    func.sum(case((StockPrice.change_percent == 0, 1), else_=0)).label('unchanged'),
+                    func.sum(StockPrice.volume).label('total_volume'),
+                    func.sum(StockPrice.close_price * StockPrice.volume).label('turnover')
+                )
+                .join(Stock, Stock.id == StockPrice.stock_id)
+                .filter(*price_filter)
+                .group_by(StockPrice.date)
+                .all()
+            )
+            movers_by_date = get_top_movers_by_date(
+                self.db_session, start_date, end_date, [exchange_id], limit=Config.DAILY_STATS_TOP_MOVERS
+            )
+            
+            now = datetime.now()
+            rows = []
+            for row in aggregates:
+                # Dates between the loaded ones are unchanged
+                if dates is not None and row.date not in dates:
+                    continue
+                movers = movers_by_date.get(row.date, {}).get(exchange_id, {})
+                
+                rows.append({
+                    'exchange_id': exchange_id,
+                    'date': row.date,
+                    'stock_count': row.stock_count,
+                    'advancers': row.advancers,
+                    'decliners': row.decliners,
+                    'unchanged': row.unchanged,
+                    'total_volume': row.total_volume,
+                    'turnover': row.turnover,
+                    'breadth': (row.advancers - row.decliners) / row.stock_count if row.stock_count else None,
+                    'top_movers': {
+                        mover_type: [stored_mover_entry(stock, price) for stock, price in movers.get(mover_type, [])]
+                        for mover_type in MOVER_TYPES
+                    },
+                    'updated_at': now
+                })
+            
+            dialect_insert = self._get_dialect_insert()
+            if dialect_insert is not None:
+                self._execute_upsert_batches(
+                    dialect_insert, DailyExchangeStats, rows, ['exchange_id', 'date'], DAILY_STATS_UPDATE_COLUMNS
+                )
+            else:
+                for values in rows:
+                    self.db_session.merge(DailyExchangeStats(**values))
+                self.db_session.commit()
+            
+            logger.debug(f"Refreshed daily stats for exchange {exchange_id} on {len(rows)} dates")
+            
+        except SQLAlchemyError as e:
+            logger.error(f"Database error refreshing daily stats for exchange {exchange_id}: {str(e)}")
+            self.db_session.rollback()
+            return 0
+        
+        return len(rows)
+    
+    def load_indices(self, transformed_indices, transformed_values, exchange_code, bulk=True):
         """
         Load transformed index data into the database.
         
+        When bulk is enabled and the database supports it, all index codes for
+        the exchange are resolved in one query, missing indices are inserted in
+        one statement returning their IDs, and values are upserted in batches
+        against the _index_date_uc constraint.
+        
         Args:
             transformed_indices (list): List of transformed index dictionaries
             transformed_values (list): List of transformed index value dictionaries
             exchange_code (str): Exchange code
+            bulk (bool): Use the set-based upsert path when available
             
         Returns:
             int: Number of indices processed
         """
+        self.batch_stats = []
         if not transformed_indices:
             logger.warning(f"No indices to load for {exchange_code}")
             return 0
@@ -211,6 +519,13 @@ class DataLoader:
                 logger.error(f"Exchange {exchange_code} not found in database")
                 return 0
             
+            dialect_insert = self._get_dialect_insert() if bulk else None
+            if dialect_insert is not None:
+                processed_count = self._bulk_upsert_indices(dialect_insert, transformed_indices, transformed_values, exchange)
+                logger.info(f"Loaded {processed_count} indices for {exchange_code}")
+                bump_data_version(self.db_session)
+                return processed_count
+            
             # Process indices
             index_id_map = {}  # To map index codes to their IDs
             
@@ -296,6 +611,7 @@ class DataLoader:
             
             self.db_session.commit()
             logger.info(f"Loaded {processed_count} indices for {exchange_code}")
+            bump_data_version(self.db_session)
             
         except SQLAlchemyError as e:
             logger.error(f"Database error loading indices for {exchange_code}: {str(e)}")
@@ -306,6 +622,286 @@ class DataLoader:
         
         return processed_count
     
+    def _bulk_upsert_stock_prices(self, dialect_insert, transformed_prices, stocks):
+        """
+        Upsert price rows in batches with one statement per batch.
+        
+        Args:
+            dialect_insert: Dialect-specific insert() construct supporting ON CONFLICT
+            transformed_prices (list): List of transformed price dictionaries
+            stocks (dict): Mapping of ticker to stock ID for the exchange
+            
+        Returns:
+            int: Number of price points processed
+        """
+        processed_count = 0
+        rows = {}
+        now = datetime.now()
+        
+        for price_data in transformed_prices:
+            ticker = price_data.get('ticker')
+            date_str = price_data.get('date')
+            
+            try:
+                price_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+            except (TypeError, ValueError):
+                logger.warning(f"Invalid date format {date_str} for {ticker}, skipping")
+                continue
+            
+            stock_id = stocks.get(ticker)
+            if not stock_id:
+                logger.warning(f"Stock {ticker} not found in database, skipping price")
+                continue
+            
+            # Later rows for the same key win, as they would with row-by-row updates;
+            # a single ON CONFLICT statement cannot touch the same row twice
+            rows[(stock_id, price_date)] = {
+                'stock_id': stock_id,
+                'date': price_date,
+                'close_price': price_data.get('close_price'),
+                'open_price': price_data.get('open_price'),
+                'high_price': price_data.get('high_price'),
+                'low_price': price_data.get('low_price'),
+                'volume': price_data.get('volume'),
+                'change_percent': price_data.get('change_percent'),
+                'created_at': now
+            }
+            processed_count += 1
+        
+        self._execute_upsert_batches(
+            dialect_insert, StockPrice, list(rows.values()),
+            index_elements=['stock_id', 'date'],
+            update_columns=STOCK_PRICE_UPDATE_COLUMNS
+        )
+        return processed_count
+    
+    def _bulk_upsert_indices(self, dialect_insert, transformed_indices, transformed_values, exchange):
+        """
+        Upsert indices and their values with a fixed number of statements.
+        
+        Args:
+            dialect_insert: Dialect-specific insert() construct supporting ON CONFLICT
+            transformed_indices (list): List of transformed index dictionaries
+            transformed_values (list): List of transformed index value dictionaries
+            exchange: Exchange model instance the indices belong to
+            
+        Returns:
+            int: Number of indices processed
+        """
+        now = datetime.now()
+        names = {}
+        
+        for index_data in transformed_indices:
+            code = index_data.get('code')
+            if not code:
+                logger.warning(f"Skipping index without code: {index_data}")
+                continue
+            names[code] = index_data.get('name')
+        
+        if not names:
+            return 0
+        
+        # Resolve every known index code for this exchange in one query
+        index_id_map = dict(
+            self.db_session.query(Index.code, Index.id).filter(
+                Index.exchange_id == exchange.id,
+                Index.code.in_(list(names))
+            ).all()
+        )
+        
+        if index_id_map:
+            self.db_session.execute(
+                update(Index),
+                [
+                    {'id': index_id, 'name': names[code], 'last_updated': now}
+                    for code, index_id in index_id_map.items()
+                ]
+            )
+        
+        # Insert missing indices in one statement and collect their IDs
+        missing = [code for code in names if code not in index_id_map]
+        if missing:
+            stmt = dialect_insert(Index).values([
+                {
+                    'code': code,
+                    'name': names[code],
+                    'exchange_id': exchange.id,
+                    'created_at': now,
+                    'last_updated': now
+                }
+                for code in missing
+            ]).on_conflict_do_nothing(index_elements=['code']).returning(Index.code, Index.id)
+            index_id_map.update(dict(self.db_session.execute(stmt).all()))
+            
+            # Index codes are unique across exchanges, so a code skipped by the
+            # insert belongs to another exchange's index
+            collisions = [code for code in missing if code not in index_id_map]
+            if collisions:
+                owners = dict(
+                    self.db_session.query(Index.code, Exchange.code)
+                    .join(Exchange, Exchange.id == Index.exchange_id)
+                    .filter(Index.code.in_(collisions))
+                    .all()
+                )
+                for code in collisions:
+                    logger.error(
+                        f"Error loading index {code} for {exchange.code}: code already used by "
+                        f"an index on {owners.get(code, 'another exchange')}, skipping"
+                    )
+            logger.debug(f"Created {len(missing) - len(collisions)} new indices for {exchange.code}")
+        
+        self.db_session.commit()
+        
+        rows = {}
+        for value_data in transformed_values:
+            index_code = value_data.get('index_code')
+            date_str = value_data.get('date')
+            
+            try:
+                value_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+            except (TypeError, ValueError):
+                logger.warning(f"Invalid date format {date_str} for index {index_code}, skipping")
+                continue
+            
+            index_id = index_id_map.get(index_code)
+            if not index_id:
+                logger.warning(f"Index {index_code} not found in database, skipping value")
+                continue
+            
+            rows[(index_id, value_date)] = {
+                'index_id': index_id,
+                'date': value_date,
+                'value': value_data.get('value'),
+                'change_percent': value_data.get('change_percent'),
+                'created_at': now
+            }
+        
+        self._execute_upsert_batches(
+            dialect_insert, IndexValue, list(rows.values()),
+            index_elements=['index_id', 'date'],
+            update_columns=INDEX_VALUE_UPDATE_COLUMNS
+        )
+        return len(index_id_map)
+    
+    def _execute_upsert_batches(self, dialect_insert, model, rows, index_elements, update_columns):
+        """
+        Write rows with INSERT ... ON CONFLICT DO UPDATE, committing each batch.
+        
+        The timing of each batch is appended to batch_stats, which the public
+        load methods clear when they start.
+        
+        Args:
+            dialect_insert: Dialect-specific insert() construct supporting ON CONFLICT
+            model: SQLAlchemy model class to write to
+            rows (list): List of column dictionaries
+            index_elements (list): Columns of the unique constraint to upsert against
+            update_columns (iterable): Columns to overwrite on conflict
+        """
+        table_name = model.__tablename__
+        
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            started = time.perf_counter()
+            
+            stmt = dialect_insert(model).values(batch)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=index_elements,
+                set_={column: stmt.excluded[column] for column in update_columns}
+            )
+            self.db_session.execute(stmt)
+            self.db_session.commit()
+            
+            elapsed = time.perf_counter() - started
+            self.batch_stats.append({'table': table_name, 'rows': len(batch), 'seconds': elapsed})
+            logger.debug(f"Upserted batch of {len(batch)} rows into {table_name} in {elapsed:.3f}s")
+    
+    def loaded_dataset_hashes(self, exchange_code):
+        """
+        Get the source page hashes an exchange's datasets were last loaded from.
+        
+        Args:
+            exchange_code (str): Exchange code
+            
+        Returns:
+            dict: Content hashes keyed by dataset ('stocks', 'prices', 'indices')
+        """
+        try:
+            return dict(
+                self.db_session.query(LoadedDataset.dataset, LoadedDataset.content_hash)
+                .filter(LoadedDataset.exchange_code == exchange_code).all()
+            )
+        except SQLAlchemyError as e:
+            logger.error(f"Database error reading loaded datasets for {exchange_code}: {str(e)}")
+            self.db_session.rollback()
+            return {}
+    
+    def record_dataset_load(self, exchange_code, dataset, content_hash):
+        """
+        Record the source page hash a dataset was successfully loaded from.
+        
+        Args:
+            exchange_code (str): Exchange code
+            dataset (str): Dataset name ('stocks', 'prices', 'indices')
+            content_hash (str): SHA-256 hash of the source page
+        """
+        try:
+            self.db_session.merge(LoadedDataset(
+                exchange_code=exchange_code, dataset=dataset,
+                content_hash=content_hash, loaded_at=datetime.now()
+            ))
+            self.db_session.commit()
+        except SQLAlchemyError as e:
+            logger.error(f"Database error recording {dataset} load for {exchange_code}: {str(e)}")
+            self.db_session.rollback()
+    
+    def _loaded_stock_ids(self, transformed_prices, stocks):
+        """Get the IDs of the known stocks referenced by a price load."""
+        return {stocks[price['ticker']] for price in transformed_prices if price.get('ticker') in stocks}
+    
+    def _first_loaded_dates(self, transformed_prices, stocks):
+        """Get the earliest valid date of a price load for each known stock."""
+        first_dates = {}
+        for price in transformed_prices:
+            stock_id = stocks.get(price.get('ticker'))
+            if stock_id is None:
+                continue
+            try:
+                price_date = datetime.strptime(price.get('date'), '%Y-%m-%d').date()
+            except (TypeError, ValueError):
+                continue
+            if stock_id not in first_dates or price_date < first_dates[stock_id]:
+                first_dates[stock_id] = price_date
+        return first_dates
+    
+    def _loaded_dates(self, transformed_prices):
+        """Get the valid trading dates referenced by a price load."""
+        dates = set()
+        for price in transformed_prices:
+            try:
+                dates.add(datetime.strptime(price.get('date'), '%Y-%m-%d').date())
+            except (TypeError, ValueError):
+                continue
+        return dates
+    
+    def _get_dialect_insert(self):
+        """
+        Get the insert() construct with ON CONFLICT support for the bound database.
+        
+        Returns:
+            callable: Dialect insert function, or None if upserts are not supported
+        """
+        dialect = self.db_session.get_bind().dialect.name
+        
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+            return insert
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+            return insert
+        
+        logger.debug(f"Bulk upsert not supported on {dialect}, using row-by-row load")
+        return None
+    
     def _get_or_create_exchange(self, exchange_code):
         """Get or create an exchange record."""
         from config import STOCK_EXCHANGES
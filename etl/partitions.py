@@ -0,0 +1,141 @@
+import logging
+from datetime import date
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# History tables range partitioned by date on PostgreSQL
+PARTITIONED_TABLES = ('stock_price', 'index_value')
+
+def partition_name(table_name, year):
+    """Get the name of a table's partition for a year."""
+    return f'{table_name}_y{year}'
+
+def default_partition_name(table_name):
+    """Get the name of a table's default partition."""
+    return f'{table_name}_default'
+
+def is_partitioned(connection, table_name):
+    """
+    Check whether a table is a partitioned table.
+    
+    Args:
+        connection: SQLAlchemy connection or session on PostgreSQL
+        table_name (str): Table name
+    
+    Returns:
+        bool: True if the table is partitioned
+    """
+    return connection.execute(
+        text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table_name)"),
+        {'table_name': table_name}
+    ).first() is not None
+
+def list_partitions(connection, table_name):
+    """
+    Get the names of a partitioned table's partitions.
+    
+    Args:
+        connection: SQLAlchemy connection or session on PostgreSQL
+        table_name (str): Table name
+    
+    Returns:
+        set: Partition names
+    """
+    rows = connection.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(:table_name)"
+        ),
+        {'table_name': table_name}
+    )
+    return {row[0] for row in rows}
+
+def create_year_partition(connection, table_name, year):
+    """
+    Create a table's partition for one year.
+    
+    Rows of that year already stored in the default partition are moved
+    into the new partition before it is attached, as PostgreSQL will not
+    attach a partition whose range overlaps rows in the default partition.
+    
+    Args:
+        connection: SQLAlchemy connection or session on PostgreSQL
+        table_name (str): Partitioned table name
+        year (int): Year covered by the partition
+    """
+    name = partition_name(table_name, year)
+    default_name = default_partition_name(table_name)
+    bounds = {'start': date(year, 1, 1), 'end': date(year + 1, 1, 1)}
+    range_clause = f"FOR VALUES FROM ('{bounds['start'].isoformat()}') TO ('{bounds['end'].isoformat()}')"
+    
+    has_default_rows = default_name in list_partitions(connection, table_name) and connection.execute(
+        text(f"SELECT 1 FROM {default_name} WHERE date >= :start AND date < :end LIMIT 1"), bounds
+    ).first() is not None
+    
+    if not has_default_rows:
+        connection.execute(text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table_name} {range_clause}"))
+    else:
+        connection.execute(text(f"CREATE TABLE {name} (LIKE {table_name} INCLUDING DEFAULTS)"))
+        connection.execute(text(
+            f"WITH moved AS (DELETE FROM {default_name} WHERE date >= :start AND date < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ), bounds)
+        connection.execute(text(f"ALTER TABLE {table_name} ATTACH PARTITION {name} {range_clause}"))
+    
+    logger.info(f"Created partition {name}")
+
+def ensure_partitions(db_session, years=None):
+    """
+    Create the missing yearly partitions of the history tables.
+    
+    Covers the current year, Config.HISTORY_PARTITIONS_AHEAD years ahead,
+    any years whose rows landed in a default partition and any extra
+    years requested. Does nothing on databases other than PostgreSQL or
+    for tables that are not partitioned.
+    
+    Args:
+        db_session: SQLAlchemy database session
+        years (iterable, optional): Further years to create partitions for
+    
+    Returns:
+        int: Number of partitions created
+    """
+    if db_session.get_bind().dialect.name != 'postgresql':
+        return 0
+    
+    current_year = date.today().year
+    wanted_years = set(range(current_year, current_year + Config.HISTORY_PARTITIONS_AHEAD + 1))
+    wanted_years.update(years or ())
+    created = 0
+    
+    try:
+        for table_name in PARTITIONED_TABLES:
+            if not is_partitioned(db_session, table_name):
+                continue
+            
+            partitions = list_partitions(db_session, table_name)
+            table_years = set(wanted_years)
+            default_name = default_partition_name(table_name)
+            if default_name in partitions:
+                table_years.update(
+                    row[0] for row in db_session.execute(
+                        text(f"SELECT DISTINCT CAST(EXTRACT(YEAR FROM date) AS INTEGER) FROM {default_name}")
+                    )
+                )
+            
+            for year in sorted(table_years):
+                if partition_name(table_name, year) not in partitions:
+                    create_year_partition(db_session, table_name, year)
+                    created += 1
+        
+        db_session.commit()
+    except SQLAlchemyError as e:
+        db_session.rollback()
+        logger.error(f"Error creating history partitions: {str(e)}")
+        raise
+    
+    return created
@@ -0,0 +1,280 @@
+import itertools
+import logging
+import os
+from collections import namedtuple
+from datetime import date
+import numpy as np
+from sqlalchemy import and_, or_, select
+from sqlalchemy.exc import SQLAlchemyError
+from models import StockPrice
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Columns of each stored history, in the order of the API's price columns.
+# A stock's history is one float64 array with a contiguous row per column,
+# dates stored as days since 1970-01-01 and NULLs as NaN.
+STORE_COLUMNS = ('id', 'date', 'close_price', 'open_price', 'high_price', 'low_price', 'volume', 'change_percent')
+ID_ROW = STORE_COLUMNS.index('id')
+DATE_ROW = STORE_COLUMNS.index('date')
+VOLUME_ROW = STORE_COLUMNS.index('volume')
+
+# Rows fetched per round trip when histories are refreshed
+REFRESH_FETCH_SIZE = 10000
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Stored price row, with the attribute names of StockPrice
+StoredPrice = namedtuple('StoredPrice', STORE_COLUMNS)
+
+class PriceStore:
+    """Per-stock price histories kept as memory-mapped NumPy arrays for fast reads."""
+    
+    def __init__(self, directory):
+        """
+        Initialize the price store.
+        
+        Args:
+            directory (str): Directory holding one .npy file per stock; empty disables the store
+        """
+        self.directory = directory
+    
+    @property
+    def enabled(self):
+        """Check whether the store is configured."""
+        return bool(self.directory)
+    
+    def path(self, stock_id):
+        """Get the file holding a stock's history."""
+        return os.path.join(self.directory, f'{stock_id}.npy')
+    
+    def refresh(self, db_session, stock_ids=None, since=None):
+        """
+        Update stored histories from the stock_price table.
+        
+        With since, the stored rows of each stock before its first changed
+        date are kept and only the rows from that date on are read back, so a
+        daily load rewrites one file per stock without rereading its history.
+        Stocks without a readable stored history are rewritten in full.
+        
+        Any error removes the affected stocks from the store, so reads fall
+        back to the database instead of serving stale or partial data.
+        
+        Args:
+            db_session: SQLAlchemy database session
+            stock_ids (iterable, optional): Stocks to rewrite in full; all stocks with prices if
+                neither stock_ids nor since is given
+            since (dict, optional): First changed date by stock ID
+        
+        Returns:
+            int: Number of stock histories written
+        """
+        if not self.enabled:
+            return 0
+        
+        since = dict(since or {})
+        rewrite_all = stock_ids is None and not since
+        full_ids = set(stock_ids or ())
+        requested = None if rewrite_all else full_ids | set(since)
+        if requested is not None and not requested:
+            return 0
+        
+        written = set()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            
+            # Stored rows before each stock's first changed date, kept ahead of the rows read back
+            kept = {}
+            for stock_id, first_date in since.items():
+                data = None if stock_id in full_ids else self.read(stock_id)
+                if data is None:
+                    full_ids.add(stock_id)
+                else:
+                    kept[stock_id] = data[:, data[DATE_ROW] < _to_days(first_date)]
+            
+            # One query for all stocks: whole histories, plus the rows from each group of
+            # stocks sharing a first changed date
+            stocks_by_date = {}
+            for stock_id in kept:
+                stocks_by_date.setdefault(since[stock_id], set()).add(stock_id)
+            conditions = [
+                and_(StockPrice.stock_id.in_(date_stock_ids), StockPrice.date >= first_date)
+                for first_date, date_stock_ids in stocks_by_date.items()
+            ]
+            if full_ids:
+                conditions.append(StockPrice.stock_id.in_(full_ids))
+            
+            stmt = (
+                select(StockPrice.stock_id, *[getattr(StockPrice, name) for name in STORE_COLUMNS])
+                .order_by(StockPrice.stock_id, StockPrice.date, StockPrice.id)
+            )
+            if not rewrite_all:
+                stmt = stmt.where(or_(*conditions))
+            
+            result = db_session.execute(stmt.execution_options(yield_per=REFRESH_FETCH_SIZE))
+            for stock_id, rows in itertools.groupby(result, key=lambda row: row[0]):
+                data = _to_array([row[1:] for row in rows])
+                if stock_id in kept:
+                    data = np.concatenate([kept[stock_id], data], axis=1)
+                self.write(stock_id, data)
+                written.add(stock_id)
+        except Exception as e:
+            logger.error(f"Error refreshing price store: {str(e)}")
+            if isinstance(e, SQLAlchemyError):
+                db_session.rollback()
+            self._invalidate(requested)
+            return 0
+        
+        # Stocks asked for that no longer have prices
+        for stock_id in (requested or set()) - written - set(kept):
+            self.remove(stock_id)
+        
+        logger.info(f"Refreshed price store for {len(written)} stocks")
+        return len(written)
+    
+    def _invalidate(self, stock_ids=None):
+        """Remove stored histories after a failed refresh; all of them if stock_ids is None."""
+        if stock_ids is None:
+            try:
+                stock_ids = [int(name[:-len('.npy')]) for name in os.listdir(self.directory) if name.endswith('.npy')]
+            except OSError:
+                stock_ids = []
+        
+        for stock_id in stock_ids:
+            try:
+                self.remove(stock_id)
+            except OSError as e:
+                logger.error(f"Error removing stored history of stock {stock_id}: {str(e)}")
+    
+    def write(self, stock_id, data):
+        """
+        Replace a stock's stored history with an array.
+        
+        The file is written beside the old one and renamed over it, so readers
+        holding the old mapping keep a consistent view.
+        
+        Args:
+            stock_id (int): Stock ID
+            data (numpy.ndarray): Array with one row per STORE_COLUMNS entry, oldest price first
+        """
+        path = self.path(stock_id)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, data)
+        os.replace(tmp_path, path)
+    
+    def remove(self, stock_id):
+        """Remove a stock's stored history, if any."""
+        try:
+            os.remove(self.path(stock_id))
+        except FileNotFoundError:
+            pass
+    
+    def read(self, stock_id):
+        """
+        Map a stock's stored history.
+        
+        Args:
+            stock_id (int): Stock ID
+        
+        Returns:
+            numpy.ndarray: Read-only array with one row per STORE_COLUMNS entry, oldest
+                price first, or None if the store is disabled or does not hold the stock
+        """
+        if not self.enabled:
+            return None
+        try:
+            return np.load(self.path(stock_id), mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+    
+    def history_page(self, stock_id, limit, start=None, end=None, position=None):
+        """
+        Get one page of a stock's history, newest first.
+        
+        Matches api.pagination.apply_date_keyset over (date, id), but selects
+        the page by binary search and returns a view of the mapped file.
+        
+        Args:
+            stock_id (int): Stock ID
+            limit (int): Page size
+            start (date, optional): First date to include
+            end (date, optional): Last date to include
+            position (dict, optional): Decoded cursor with 'date' and 'id' of the previous page's last row
+        
+        Returns:
+            tuple: (page, next_position) where page is an array view with one row per
+                STORE_COLUMNS entry and next_position is None on the last page,
+                or None if the store does not hold the stock
+        """
+        data = self.read(stock_id)
+        if data is None:
+            return None
+        
+        dates = data[DATE_ROW]
+        low = 0 if start is None else int(np.searchsorted(dates, _to_days(start), side='left'))
+        high = len(dates) if end is None else int(np.searchsorted(dates, _to_days(end), side='right'))
+        
+        if position:
+            # Keep rows before the cursor date, and rows on it with a lower id
+            cursor_days = _to_days(position['date'])
+            first = int(np.searchsorted(dates, cursor_days, side='left'))
+            last = int(np.searchsorted(dates, cursor_days, side='right'))
+            high = min(high, first + int(np.count_nonzero(data[ID_ROW, first:last] < position['id'])))
+        
+        high = max(high, low)
+        page = data[:, max(low, high - limit):high][:, ::-1]
+        
+        next_position = None
+        if high - low > limit:
+            next_position = {'date': _to_date(page[DATE_ROW, -1]), 'id': int(page[ID_ROW, -1])}
+        return page, next_position
+    
+    def rows(self, page):
+        """
+        Convert a page into StoredPrice rows.
+        
+        Args:
+            page (numpy.ndarray): Array from history_page
+        
+        Returns:
+            list: StoredPrice rows, usable wherever StockPrice attributes are read
+        """
+        columns = [
+            [None if value != value else value for value in row.tolist()]  # NaN -> None
+            for row in page
+        ]
+        columns[ID_ROW] = [int(value) for value in columns[ID_ROW]]
+        columns[DATE_ROW] = [_to_date(value) for value in columns[DATE_ROW]]
+        columns[VOLUME_ROW] = [None if value is None else int(value) for value in columns[VOLUME_ROW]]
+        return [StoredPrice(*row) for row in zip(*columns)]
+    
+    def column_values(self, page):
+        """
+        Get a page's columns for columnar encoding.
+        
+        Args:
+            page (numpy.ndarray): Array from history_page
+        
+        Returns:
+            list: One array per STORE_COLUMNS entry; views of the page except for dates
+        """
+        values = list(page)
+        values[DATE_ROW] = page[DATE_ROW].astype(np.int64).astype('datetime64[D]')
+        return values
+
+price_store = PriceStore(Config.PRICE_STORE_DIR)
+
+def _to_array(rows):
+    """Convert price rows in STORE_COLUMNS order into a stored history array."""
+    columns = list(zip(*rows))
+    columns[DATE_ROW] = [_to_days(value) for value in columns[DATE_ROW]]
+    return np.array(columns, dtype=np.float64)
+
+def _to_days(value):
+    """Convert a date into days since 1970-01-01."""
+    return value.toordinal() - _EPOCH_ORDINAL
+
+def _to_date(days):
+    """Convert days since 1970-01-01 into a date."""
+    return date.fromordinal(int(days) + _EPOCH_ORDINAL)
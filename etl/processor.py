@@ -1,5 +1,10 @@
 import logging
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from sqlalchemy.orm import sessionmaker
+from config import Config
 from etl.transformer import DataTransformer
 from etl.loader import DataLoader
 from scrapers.jse_scraper import JSEScraper
@@ -9,36 +14,52 @@ from models import Exchange, Stock, StockPrice, Index, IndexValue, DataSource
 
 logger = logging.getLogger(__name__)
 
+# Dataset names as they appear in ETL error messages
+DATASET_LABELS = {
+    'stocks': 'stocks',
+    'prices': 'stock prices',
+    'indices': 'indices'
+}
+
 class ETLProcessor:
     """Main ETL processor that orchestrates the data pipeline."""
     
-    def __init__(self, db_session):
+    def __init__(self, db_session, scrapers=None):
         """
         Initialize the ETL processor.
         
         Args:
             db_session: SQLAlchemy database session
+            scrapers (dict, optional): Scrapers by exchange code, shared with worker processors
         """
         self.db_session = db_session
         self.transformer = DataTransformer()
         self.loader = DataLoader(db_session)
         
         # Initialize scrapers
-        self.scrapers = {
+        self.scrapers = scrapers or {
             'JSE': JSEScraper(),
             'NGX': NGXScraper(),
             'BRVM': BRVMScraper()
         }
     
-    def process_exchange_data(self, exchange_code):
+    def process_exchange_data(self, exchange_code, pipelined=True):
         """
         Process all data for a specific exchange.
         
+        In pipelined mode the stocks, prices and indices pages are fetched
+        concurrently and handed to the transformer and loader through a bounded
+        queue as they arrive. Prices and indices are always loaded after stocks
+        so new tickers can be mapped to stock IDs and the exchange record
+        exists. Datasets whose source page is the one they were last
+        successfully loaded from are not transformed or loaded again.
+        
         Args:
             exchange_code (str): Exchange code (JSE, NGX, BRVM)
+            pipelined (bool): Overlap the fetches instead of running datasets one by one
             
         Returns:
-            dict: Summary of processed data
+            dict: Summary of processed data, including per-stage times in seconds
         """
         logger.info(f"Processing data for exchange: {exchange_code}")
         summary = {
@@ -47,6 +68,8 @@ class ETLProcessor:
             'stocks_processed': 0,
             'prices_processed': 0,
             'indices_processed': 0,
+            'stage_times': {},
+            'unchanged': [],
             'errors': []
         }
         
@@ -59,14 +82,21 @@ class ETLProcessor:
                 summary['errors'].append(error_msg)
                 return summary
             
-            # Process stocks data
-            self._process_stocks(scraper, exchange_code, summary)
-            
-            # Process stock prices
-            self._process_stock_prices(scraper, exchange_code, summary)
-            
-            # Process indices
-            self._process_indices(scraper, exchange_code, summary)
+            scraper.start_run(self.loader.loaded_dataset_hashes(exchange_code))
+            try:
+                if pipelined:
+                    self._run_pipeline(scraper, exchange_code, summary)
+                else:
+                    # Process stocks data
+                    self._process_stocks(scraper, exchange_code, summary)
+                    
+                    # Process stock prices
+                    self._process_stock_prices(scraper, exchange_code, summary)
+                    
+                    # Process indices
+                    self._process_indices(scraper, exchange_code, summary)
+            finally:
+                scraper.end_run()
             
         except Exception as e:
             error_msg = f"Error processing {exchange_code}: {str(e)}"
@@ -81,24 +111,111 @@ class ETLProcessor:
         
         return summary
     
+    def _run_pipeline(self, scraper, exchange_code, summary):
+        """
+        Fetch all datasets concurrently and transform/load them as they arrive.
+        
+        Fetch workers push parsed results onto a bounded queue, so a slow loader
+        applies backpressure instead of piling up pages in memory. The loader
+        runs on the calling thread, which owns the database session.
+        """
+        fetchers = {
+            'stocks': scraper.scrape_stocks,
+            'prices': scraper.scrape_stock_prices,
+            'indices': scraper.scrape_indices
+        }
+        loaders = {
+            'stocks': self._load_stocks,
+            'prices': self._load_stock_prices,
+            'indices': self._load_indices
+        }
+        results = queue.Queue(maxsize=Config.ETL_PIPELINE_QUEUE_SIZE)
+        
+        def fetch(dataset):
+            started = time.perf_counter()
+            try:
+                raw, error = fetchers[dataset](), None
+            except Exception as e:
+                raw, error = None, e
+            results.put((dataset, raw, error, time.perf_counter() - started))
+        
+        with ThreadPoolExecutor(max_workers=len(fetchers), thread_name_prefix=f'fetch-{exchange_code}') as executor:
+            for dataset in fetchers:
+                executor.submit(fetch, dataset)
+            
+            pending = set(fetchers)
+            deferred = []
+            
+            while pending:
+                wait_started = time.perf_counter()
+                dataset, raw, error, fetch_seconds = results.get()
+                self._add_stage_time(summary, 'queue_wait', wait_started)
+                summary['stage_times'][f'fetch_{dataset}'] = fetch_seconds
+                pending.discard(dataset)
+                
+                ready = [(dataset, raw, error)]
+                if dataset != 'stocks' and 'stocks' in pending:
+                    # Prices need the ticker -> stock ID mapping and indices need the
+                    # exchange record, so hold them until stocks are loaded
+                    deferred.append(ready.pop())
+                elif dataset == 'stocks':
+                    ready.extend(deferred)
+                    deferred = []
+                
+                for ready_dataset, ready_raw, ready_error in ready:
+                    try:
+                        if ready_error:
+                            raise ready_error
+                        if self._skip_unchanged(scraper, ready_dataset, exchange_code, summary):
+                            continue
+                        processed = loaders[ready_dataset](ready_raw, exchange_code, summary)
+                        self._record_load(scraper, ready_dataset, exchange_code, processed)
+                    except Exception as e:
+                        error_msg = f"Error processing {DATASET_LABELS[ready_dataset]} for {exchange_code}: {str(e)}"
+                        logger.error(error_msg)
+                        summary['errors'].append(error_msg)
+        
+        stage_times = ", ".join(f"{stage}={seconds:.2f}s" for stage, seconds in summary['stage_times'].items())
+        logger.info(f"Pipeline stage times for {exchange_code}: {stage_times}")
+    
+    def _skip_unchanged(self, scraper, dataset, exchange_code, summary):
+        """Check whether a dataset's page is unchanged since its last load, recording it in the summary."""
+        if not scraper.dataset_unchanged(dataset):
+            return False
+        
+        logger.info(f"Source page for {DATASET_LABELS[dataset]} on {exchange_code} unchanged, skipping transform and load")
+        summary['unchanged'].append(dataset)
+        return True
+    
+    def _record_load(self, scraper, dataset, exchange_code, processed):
+        """
+        Remember the page a dataset was loaded from once the load has succeeded.
+        
+        Loads that processed nothing, including failed loads, are not recorded,
+        so the same page is transformed and loaded again on the next run.
+        """
+        content_hash = scraper.dataset_hash(dataset)
+        if processed and content_hash:
+            self.loader.record_dataset_load(exchange_code, dataset, content_hash)
+    
+    def _add_stage_time(self, summary, stage, started):
+        """Accumulate the time elapsed since started into the summary's stage times."""
+        stage_times = summary['stage_times']
+        stage_times[stage] = stage_times.get(stage, 0.0) + (time.perf_counter() - started)
+    
     def _process_stocks(self, scraper, exchange_code, summary):
         """Process stock listings for an exchange."""
         try:
             # Scrape stocks data
+            started = time.perf_counter()
             raw_stocks = scraper.scrape_stocks()
+            self._add_stage_time(summary, 'fetch_stocks', started)
             
-            if not raw_stocks:
-                logger.warning(f"No stocks data retrieved for {exchange_code}")
+            if self._skip_unchanged(scraper, 'stocks', exchange_code, summary):
                 return
             
-            # Transform the data
-            transformed_stocks = self.transformer.transform_stocks(raw_stocks, exchange_code)
-            
-            # Load the data
-            stocks_processed = self.loader.load_stocks(transformed_stocks, exchange_code)
-            
-            summary['stocks_processed'] = stocks_processed
-            logger.info(f"Processed {stocks_processed} stocks for {exchange_code}")
+            processed = self._load_stocks(raw_stocks, exchange_code, summary)
+            self._record_load(scraper, 'stocks', exchange_code, processed)
             
         except Exception as e:
             error_msg = f"Error processing stocks for {exchange_code}: {str(e)}"
@@ -109,20 +226,15 @@ class ETLProcessor:
         """Process stock prices for an exchange."""
         try:
             # Scrape stock prices data
+            started = time.perf_counter()
             raw_prices = scraper.scrape_stock_prices()
+            self._add_stage_time(summary, 'fetch_prices', started)
             
-            if not raw_prices:
-                logger.warning(f"No stock prices retrieved for {exchange_code}")
+            if self._skip_unchanged(scraper, 'prices', exchange_code, summary):
                 return
             
-            # Transform the data
-            transformed_prices = self.transformer.transform_stock_prices(raw_prices, exchange_code)
-            
-            # Load the data
-            prices_processed = self.loader.load_stock_prices(transformed_prices, exchange_code)
-            
-            summary['prices_processed'] = prices_processed
-            logger.info(f"Processed {prices_processed} price points for {exchange_code}")
+            processed = self._load_stock_prices(raw_prices, exchange_code, summary)
+            self._record_load(scraper, 'prices', exchange_code, processed)
             
         except Exception as e:
             error_msg = f"Error processing stock prices for {exchange_code}: {str(e)}"
@@ -133,26 +245,85 @@ class ETLProcessor:
         """Process indices for an exchange."""
         try:
             # Scrape indices data
+            started = time.perf_counter()
             raw_indices = scraper.scrape_indices()
+            self._add_stage_time(summary, 'fetch_indices', started)
             
-            if not raw_indices:
-                logger.warning(f"No indices retrieved for {exchange_code}")
+            if self._skip_unchanged(scraper, 'indices', exchange_code, summary):
                 return
             
-            # Transform the data
-            transformed_indices, transformed_values = self.transformer.transform_indices(raw_indices, exchange_code)
-            
-            # Load the data
-            indices_processed = self.loader.load_indices(transformed_indices, transformed_values, exchange_code)
-            
-            summary['indices_processed'] = indices_processed
-            logger.info(f"Processed {indices_processed} indices for {exchange_code}")
+            processed = self._load_indices(raw_indices, exchange_code, summary)
+            self._record_load(scraper, 'indices', exchange_code, processed)
             
         except Exception as e:
             error_msg = f"Error processing indices for {exchange_code}: {str(e)}"
             logger.error(error_msg)
             summary['errors'].append(error_msg)
     
+    def _load_stocks(self, raw_stocks, exchange_code, summary):
+        """Transform and load scraped stock listings, returning the number of stocks processed."""
+        if not raw_stocks:
+            logger.warning(f"No stocks data retrieved for {exchange_code}")
+            return 0
+        
+        # Transform the data
+        started = time.perf_counter()
+        transformed_stocks = self.transformer.transform_stocks(raw_stocks, exchange_code)
+        self._add_stage_time(summary, 'transform', started)
+        
+        # Load the data, only writing new or changed tickers
+        started = time.perf_counter()
+        stock_counts = self.loader.reconcile_stocks(transformed_stocks, exchange_code)
+        self._add_stage_time(summary, 'load', started)
+        stocks_processed = sum(stock_counts.values())
+        
+        summary['stocks_processed'] = stocks_processed
+        summary['stocks_inserted'] = stock_counts['inserted']
+        summary['stocks_updated'] = stock_counts['updated']
+        summary['stocks_unchanged'] = stock_counts['unchanged']
+        logger.info(f"Processed {stocks_processed} stocks for {exchange_code}")
+        return stocks_processed
+    
+    def _load_stock_prices(self, raw_prices, exchange_code, summary):
+        """Transform and load scraped stock prices, returning the number of price points processed."""
+        if not raw_prices:
+            logger.warning(f"No stock prices retrieved for {exchange_code}")
+            return 0
+        
+        # Transform the data
+        started = time.perf_counter()
+        transformed_prices = self.transformer.transform_stock_prices(raw_prices, exchange_code)
+        self._add_stage_time(summary, 'transform', started)
+        
+        # Load the data
+        started = time.perf_counter()
+        prices_processed = self.loader.load_stock_prices(transformed_prices, exchange_code)
+        self._add_stage_time(summary, 'load', started)
+        
+        summary['prices_processed'] = prices_processed
+        logger.info(f"Processed {prices_processed} price points for {exchange_code}")
+        return prices_processed
+    
+    def _load_indices(self, raw_indices, exchange_code, summary):
+        """Transform and load scraped indices, returning the number of indices processed."""
+        if not raw_indices:
+            logger.warning(f"No indices retrieved for {exchange_code}")
+            return 0
+        
+        # Transform the data
+        started = time.perf_counter()
+        transformed_indices, transformed_values = self.transformer.transform_indices(raw_indices, exchange_code)
+        self._add_stage_time(summary, 'transform', started)
+        
+        # Load the data
+        started = time.perf_counter()
+        indices_processed = self.loader.load_indices(transformed_indices, transformed_values, exchange_code)
+        self._add_stage_time(summary, 'load', started)
+        
+        summary['indices_processed'] = indices_processed
+        logger.info(f"Processed {indices_processed} indices for {exchange_code}")
+        return indices_processed
+    
     def _update_data_source(self, exchange_code, summary):
         """Update the data source record with the latest run information."""
         try:
@@ -181,17 +352,70 @@ class ETLProcessor:
             logger.error(f"Error updating data source record for {exchange_code}: {str(e)}")
             self.db_session.rollback()
     
-    def process_all_exchanges(self):
+    def process_all_exchanges(self, parallel=True, max_workers=None):
         """
         Process data for all configured exchanges.
         
+        In parallel mode each exchange runs in a worker thread with its own
+        database session, so the run takes about as long as the slowest
+        exchange instead of the sum of all of them.
+        
+        Args:
+            parallel (bool): Process exchanges concurrently
+            max_workers (int, optional): Concurrency limit, defaults to Config.ETL_MAX_WORKERS
+            
         Returns:
             dict: Summary of all processing results
         """
         logger.info("Processing data for all exchanges")
         results = {}
         
-        for exchange_code in self.scrapers.keys():
-            results[exchange_code] = self.process_exchange_data(exchange_code)
+        if not parallel:
+            for exchange_code in self.scrapers.keys():
+                results[exchange_code] = self.process_exchange_data(exchange_code)
+            return results
+        
+        max_workers = max_workers or Config.ETL_MAX_WORKERS
+        session_factory = sessionmaker(bind=self.db_session.get_bind())
+        
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='etl') as executor:
+            futures = {
+                executor.submit(self._process_exchange_in_worker, session_factory, exchange_code): exchange_code
+                for exchange_code in self.scrapers.keys()
+            }
+            
+            for future in as_completed(futures):
+                exchange_code = futures[future]
+                try:
+                    results[exchange_code] = future.result()
+                except Exception as e:
+                    error_msg = f"Error processing {exchange_code}: {str(e)}"
+                    logger.error(error_msg)
+                    results[exchange_code] = {
+                        'exchange': exchange_code,
+                        'stocks_processed': 0,
+                        'prices_processed': 0,
+                        'indices_processed': 0,
+                        'errors': [error_msg]
+                    }
+        
+        # Keep the same key order as the sequential run
+        return {exchange_code: results[exchange_code] for exchange_code in self.scrapers.keys()}
+    
+    def _process_exchange_in_worker(self, session_factory, exchange_code):
+        """
+        Process one exchange on a dedicated database session.
         
-        return results
+        Args:
+            session_factory: Session factory bound to the application's engine
+            exchange_code (str): Exchange code
+            
+        Returns:
+            dict: Summary of processed data
+        """
+        session = session_factory()
+        try:
+            processor = ETLProcessor(session, scrapers=self.scrapers)
+            return processor.process_exchange_data(exchange_code)
+        finally:
+            session.close()
@@ -1,7 +1,8 @@
 from app import db
 from flask_login import UserMixin
 from datetime import datetime
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import DDL, PrimaryKeyConstraint, UniqueConstraint, event
+from sqlalchemy.ext.compiler import compiles
 
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -18,7 +19,7 @@ class User(UserMixin, db.Model):
 class APIToken(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     token = db.Column(db.String(64), unique=True, nullable=False, index=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     expires_at = db.Column(db.DateTime, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -42,6 +43,7 @@ class Exchange(db.Model):
     
     # Relationships
     stocks = db.relationship('Stock', backref='exchange', lazy=True)
+    indices = db.relationship('Index', backref='exchange', lazy=True)
     
     def __repr__(self):
         return f'<Exchange {self.code}>'
@@ -51,7 +53,7 @@ class Stock(db.Model):
     ticker = db.Column(db.String(20), nullable=False)
     name = db.Column(db.String(200), nullable=False)
     sector = db.Column(db.String(100))
-    exchange_id = db.Column(db.Integer, db.ForeignKey('exchange.id'), nullable=False)
+    exchange_id = db.Column(db.Integer, db.ForeignKey('exchange.id'), nullable=False, index=True)
     currency = db.Column(db.String(10))
     description = db.Column(db.Text)
     website = db.Column(db.String(200))
@@ -63,12 +65,25 @@ class Stock(db.Model):
     # Relationships
     prices = db.relationship('StockPrice', backref='stock', lazy=True)
     
-    # Unique constraint for ticker and exchange
-    __table_args__ = (UniqueConstraint('ticker', 'exchange_id', name='_ticker_exchange_uc'),)
+    # Unique constraint for ticker and exchange, and trigram indexes for
+    # substring (ILIKE '%...%') ticker and sector search on PostgreSQL
+    __table_args__ = (
+        UniqueConstraint('ticker', 'exchange_id', name='_ticker_exchange_uc'),
+        db.Index('ix_stock_ticker_trgm', 'ticker', postgresql_using='gin',
+                 postgresql_ops={'ticker': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        db.Index('ix_stock_sector_trgm', 'sector', postgresql_using='gin',
+                 postgresql_ops={'sector': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+    )
     
     def __repr__(self):
         return f'<Stock {self.ticker}>'
 
+# The trigram indexes on stock need the pg_trgm extension
+event.listen(
+    Stock.__table__, 'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql')
+)
+
 class StockPrice(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     stock_id = db.Column(db.Integer, db.ForeignKey('stock.id'), nullable=False)
@@ -81,12 +96,54 @@ class StockPrice(db.Model):
     change_percent = db.Column(db.Float)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    # Unique constraint for stock and date
-    __table_args__ = (UniqueConstraint('stock_id', 'date', name='_stock_date_uc'),)
+    # Unique constraint for stock and date, and per-date indexes for the movers rankings.
+    # Range partitioned by date on PostgreSQL (see etl/partitions.py)
+    __table_args__ = (
+        UniqueConstraint('stock_id', 'date', name='_stock_date_uc'),
+        db.Index('ix_stock_price_date_change', 'date', 'change_percent'),
+        db.Index('ix_stock_price_date_volume', 'date', 'volume'),
+        {'postgresql_partition_by': 'RANGE (date)', 'info': {'partition_key': 'date'}}
+    )
     
     def __repr__(self):
         return f'<StockPrice {self.stock.ticker} {self.date}>'
 
+class LatestQuote(db.Model):
+    """Most recent price of each stock, kept current by DataLoader."""
+    stock_id = db.Column(db.Integer, db.ForeignKey('stock.id'), primary_key=True)
+    exchange_id = db.Column(db.Integer, db.ForeignKey('exchange.id'), nullable=False, index=True)
+    date = db.Column(db.Date, nullable=False)
+    open_price = db.Column(db.Float)
+    close_price = db.Column(db.Float, nullable=False)
+    high_price = db.Column(db.Float)
+    low_price = db.Column(db.Float)
+    volume = db.Column(db.BigInteger)
+    change_percent = db.Column(db.Float)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    stock = db.relationship('Stock', backref=db.backref('latest_quote', uselist=False, lazy=True))
+    
+    def __repr__(self):
+        return f'<LatestQuote {self.stock_id} {self.date}>'
+
+class DailyExchangeStats(db.Model):
+    """Per-exchange daily market breadth, volume and top movers, kept current by DataLoader."""
+    exchange_id = db.Column(db.Integer, db.ForeignKey('exchange.id'), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    stock_count = db.Column(db.Integer, nullable=False, default=0)
+    advancers = db.Column(db.Integer, nullable=False, default=0)
+    decliners = db.Column(db.Integer, nullable=False, default=0)
+    unchanged = db.Column(db.Integer, nullable=False, default=0)
+    total_volume = db.Column(db.BigInteger)
+    turnover = db.Column(db.Float)  # sum of close price x volume
+    breadth = db.Column(db.Float)  # (advancers - decliners) / stock_count
+    top_movers = db.Column(db.JSON)  # {'gainers': [...], 'losers': [...], 'most_active': [...]}
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<DailyExchangeStats {self.exchange_id} {self.date}>'
+
 class Index(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -110,12 +167,38 @@ class IndexValue(db.Model):
     change_percent = db.Column(db.Float)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    # Unique constraint for index and date
-    __table_args__ = (UniqueConstraint('index_id', 'date', name='_index_date_uc'),)
+    # Unique constraint for index and date. Range partitioned by date on PostgreSQL
+    __table_args__ = (
+        UniqueConstraint('index_id', 'date', name='_index_date_uc'),
+        {'postgresql_partition_by': 'RANGE (date)', 'info': {'partition_key': 'date'}}
+    )
     
     def __repr__(self):
         return f'<IndexValue {self.index.code} {self.date}>'
 
+# Partitioned tables start with a default partition holding every date;
+# yearly partitions are split off by etl.partitions.ensure_partitions
+for partitioned_table in (StockPrice.__table__, IndexValue.__table__):
+    event.listen(
+        partitioned_table, 'after_create',
+        DDL('CREATE TABLE IF NOT EXISTS %(table)s_default PARTITION OF %(table)s DEFAULT').execute_if(dialect='postgresql')
+    )
+
+@compiles(PrimaryKeyConstraint, 'postgresql')
+def _compile_primary_key(constraint, compiler, **kw):
+    """
+    Add the partition key to the primary key of partitioned tables.
+    
+    PostgreSQL requires unique constraints on a partitioned table to include
+    its partition key. The ORM keeps identifying rows by id alone.
+    """
+    partition_key = constraint.table.info.get('partition_key')
+    if not partition_key or partition_key in constraint.columns:
+        return compiler.visit_primary_key_constraint(constraint, **kw)
+    
+    columns = [column.name for column in constraint.columns] + [partition_key]
+    return 'PRIMARY KEY (%s)' % ', '.join(compiler.preparer.quote(name) for name in columns)
+
 class MacroIndicator(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -160,6 +243,25 @@ class MarketSummary(db.Model):
     def __repr__(self):
         return f'<MarketSummary {self.date}>'
 
+class DataVersion(db.Model):
+    """Counter bumped whenever loaded market data changes, used to invalidate API caches."""
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<DataVersion {self.name} {self.version}>'
+
+class LoadedDataset(db.Model):
+    """Hash of the source page each exchange dataset was last successfully loaded from."""
+    exchange_code = db.Column(db.String(10), primary_key=True)
+    dataset = db.Column(db.String(20), primary_key=True)  # 'stocks', 'prices', 'indices'
+    content_hash = db.Column(db.String(64), nullable=False)
+    loaded_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<LoadedDataset {self.exchange_code} {self.dataset}>'
+
 class DataSource(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -5,6 +5,7 @@ from models import User, Stock, StockPrice, Exchange, MarketSummary, APIToken
 from app import db
 from datetime import datetime, timedelta
 from api.auth import TokenAuth
+from etl.price_store import price_store
 import logging
 
 logger = logging.getLogger(__name__)
@@ -41,7 +42,11 @@ def configure_routes(app):
     @login_required
     def stock_detail(ticker):
         stock = Stock.query.filter_by(ticker=ticker).first_or_404()
-        prices = StockPrice.query.filter_by(stock_id=stock.id).order_by(StockPrice.date.desc()).limit(30).all()
+        stored = price_store.history_page(stock.id, 30)
+        if stored is not None:
+            prices = price_store.rows(stored[0])
+        else:
+            prices = StockPrice.query.filter_by(stock_id=stock.id).order_by(StockPrice.date.desc()).limit(30).all()
         # Reverse to get chronological order for charts
         prices = prices[::-1]
         return render_template('stock_detail.html', stock=stock, prices=prices)
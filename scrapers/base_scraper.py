@@ -1,15 +1,130 @@
+import asyncio
 import requests
 import logging
+import threading
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from urllib.parse import urlsplit
 import trafilatura
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import MaxRetryError
+from urllib3.util.retry import Retry
 from config import Config
+from scrapers.response_cache import ResponseCache, hash_content
+from scrapers.table_extractor import parse_html
 
 logger = logging.getLogger(__name__)
 
+# Brotli responses can only be decoded when the optional brotli package is installed
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+class TokenBucket:
+    """Token bucket limiting the request rate to a single host, shared by threads and event loops."""
+    
+    def __init__(self, rate, capacity):
+        """
+        Initialize a full bucket.
+        
+        Args:
+            rate (float): Tokens added per second
+            capacity (int): Maximum number of tokens, i.e. the allowed burst
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def reserve(self):
+        """
+        Take a token, borrowing against future refills if the bucket is empty.
+        
+        Returns:
+            float: Seconds to wait before the token may be used
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return max(-self.tokens / self.rate, 0.0)
+    
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+class CountingConnectionMixin:
+    """Counts the requests and new connections of a urllib3 connection in BaseScraper's HTTP counters."""
+    
+    # Requests sent since the socket was opened
+    socket_requests = 0
+    
+    def connect(self):
+        """Open the socket and count a new connection."""
+        super().connect()
+        self.socket_requests = 0
+        BaseScraper.count_http('connections_opened')
+    
+    def request(self, *args, **kwargs):
+        """Send a request and count it, as reused if the socket already carried one."""
+        reused = self.sock is not None and self.socket_requests > 0
+        try:
+            return super().request(*args, **kwargs)
+        finally:
+            self.socket_requests += 1
+            BaseScraper.count_http('requests', 'connections_reused' if reused else None)
+
+class CountingHTTPConnection(CountingConnectionMixin, HTTPConnection):
+    """HTTP connection counted in BaseScraper's HTTP counters."""
+
+class CountingHTTPSConnection(CountingConnectionMixin, HTTPSConnection):
+    """HTTPS connection counted in BaseScraper's HTTP counters."""
+
+class CountingHTTPConnectionPool(HTTPConnectionPool):
+    """HTTP connection pool of counted connections."""
+    ConnectionCls = CountingHTTPConnection
+
+class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    """HTTPS connection pool of counted connections."""
+    ConnectionCls = CountingHTTPSConnection
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """HTTP adapter whose connection pools count requests and connections."""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': CountingHTTPConnectionPool,
+            'https': CountingHTTPSConnectionPool
+        }
+
 class BaseScraper(ABC):
     """Base class for all data scrapers."""
     
+    # Process-wide pooled HTTP session shared by all scrapers
+    _session = None
+    _session_lock = threading.Lock()
+    _http_stats = {
+        'fetches': 0, 'failed': 0, 'retries': 0, 'not_modified': 0,
+        'requests': 0, 'connections_opened': 0, 'connections_reused': 0
+    }
+    
+    # Process-wide on-disk response cache, created on first use
+    _response_cache = None
+    
+    # Process-wide request rate limiters, keyed by host
+    _rate_limiters = {}
+    
     def __init__(self, source_url, exchange_code=None):
         """
         Initialize the scraper with source URL and exchange code.
@@ -24,11 +139,185 @@ class BaseScraper(ABC):
             'User-Agent': Config.USER_AGENT,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
+            'Accept-Encoding': ACCEPT_ENCODING,
             'DNT': '1',
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
         }
+        # Hash of each page's first fetch in the current run, keyed by URL
+        self.page_hashes = {}
+        # Page hashes each dataset was last successfully loaded from, keyed by dataset
+        self.loaded_hashes = {}
+        # URLs fetched since start_run(), None when no ETL run is active
+        self._run_urls = None
+        # Per-run memo of downloaded pages and parsed trees, keyed by URL
+        self._run_pages = {}
+        self._run_trees = {}
+        self._page_locks = {}
+        self._page_locks_lock = threading.Lock()
+    
+    def start_run(self, loaded_hashes=None):
+        """
+        Mark the start of an ETL run.
+        
+        Within a run each URL is downloaded and parsed at most once, and the
+        result is shared by every scrape_* method that reads that page. Whether
+        a page is unchanged is decided by its first fetch.
+        
+        Args:
+            loaded_hashes (dict, optional): Page hashes each dataset was last
+                successfully loaded from; datasets without one are never unchanged
+        """
+        self.page_hashes = {}
+        self.loaded_hashes = dict(loaded_hashes or {})
+        self._run_urls = set()
+        self._run_pages = {}
+        self._run_trees = {}
+    
+    def end_run(self):
+        """Mark the end of an ETL run and release the memoized pages."""
+        self._run_urls = None
+        self._run_pages = {}
+        self._run_trees = {}
+    
+    def get_tree(self, url, html=None):
+        """
+        Get the parsed tree for a page, parsing it at most once per ETL run.
+        
+        Args:
+            url (str): Page URL
+            html (str, optional): Page content already fetched by the caller
+            
+        Returns:
+            lxml.html.HtmlElement: Parsed page or None if the fetch failed
+        """
+        if self._run_urls is None:
+            html = html or self.fetch_html(url)
+            return parse_html(html) if html else None
+        
+        with self._page_lock(url):
+            if url not in self._run_trees:
+                html = html or self.fetch_html(url)
+                if not html:
+                    return None
+                self._run_trees[url] = parse_html(html)
+            return self._run_trees[url]
+    
+    def _page_lock(self, url):
+        """Get the lock serializing downloads and parses of a URL within a run."""
+        with self._page_locks_lock:
+            return self._page_locks.setdefault(url, threading.RLock())
+    
+    @property
+    def dataset_urls(self):
+        """
+        Get the page URL each dataset is scraped from.
+        
+        Returns:
+            dict: URLs keyed by dataset ('stocks', 'prices', 'indices')
+        """
+        return {}
+    
+    def dataset_hash(self, dataset):
+        """Get the hash of the page a dataset was scraped from in the current run, if fetched."""
+        return self.page_hashes.get(self.dataset_urls.get(dataset))
+    
+    def dataset_unchanged(self, dataset):
+        """Check whether a dataset's page is the one it was last successfully loaded from."""
+        page_hash = self.dataset_hash(dataset)
+        return page_hash is not None and self.loaded_hashes.get(dataset) == page_hash
+    
+    @classmethod
+    def get_response_cache(cls):
+        """
+        Get the shared response cache, creating it on first use.
+        
+        Returns:
+            ResponseCache: Cache instance, or None if Config.HTTP_CACHE_DIR is not set
+        """
+        with cls._session_lock:
+            if BaseScraper._response_cache is None and Config.HTTP_CACHE_DIR:
+                # Stored on BaseScraper, so scraper subclasses share one cache
+                BaseScraper._response_cache = ResponseCache(
+                    Config.HTTP_CACHE_DIR,
+                    max_bytes=Config.HTTP_CACHE_MAX_BYTES,
+                    default_ttl=Config.HTTP_CACHE_TTL,
+                    url_ttls=Config.HTTP_CACHE_URL_TTLS
+                )
+            return BaseScraper._response_cache
+    
+    @classmethod
+    def get_rate_limiter(cls, host):
+        """
+        Get the token bucket shared by every fetch_many call to a host.
+        
+        Args:
+            host (str): Host and port, as in the URL
+            
+        Returns:
+            TokenBucket: Bucket refilled at Config.HTTP_RATE_LIMIT_PER_HOST requests per second
+        """
+        with cls._session_lock:
+            if host not in cls._rate_limiters:
+                cls._rate_limiters[host] = TokenBucket(Config.HTTP_RATE_LIMIT_PER_HOST, Config.HTTP_RATE_BURST)
+            return cls._rate_limiters[host]
+    
+    @classmethod
+    def get_session(cls):
+        """
+        Get the shared HTTP session, creating it on first use.
         
+        The session keeps connections alive between fetches and retries
+        transient failures with exponential backoff.
+        
+        Returns:
+            requests.Session: Pooled HTTP session
+        """
+        with cls._session_lock:
+            if cls._session is None:
+                retry = Retry(
+                    total=Config.HTTP_MAX_RETRIES,
+                    backoff_factor=Config.HTTP_BACKOFF_FACTOR,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=('GET', 'HEAD'),
+                    raise_on_status=False
+                )
+                adapter = CountingHTTPAdapter(
+                    pool_connections=Config.HTTP_POOL_CONNECTIONS,
+                    pool_maxsize=Config.HTTP_POOL_MAXSIZE,
+                    max_retries=retry
+                )
+                session = requests.Session()
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                # Stored on BaseScraper, so scraper subclasses share one session
+                BaseScraper._session = session
+            return BaseScraper._session
+    
+    @classmethod
+    def count_http(cls, *names):
+        """Increment HTTP counters by one; None names are ignored."""
+        with cls._session_lock:
+            for name in names:
+                if name is not None:
+                    cls._http_stats[name] += 1
+    
+    @classmethod
+    def http_stats(cls):
+        """
+        Get counters for the shared HTTP session.
+        
+        Requests and connections are counted by the session's connections
+        themselves, so retries and requests that end in an error are included,
+        and a request is reused when its socket already carried one.
+        
+        Returns:
+            dict: Fetches made and failed, HTTP requests sent, retries, 304
+                responses, and connections opened and reused
+        """
+        with cls._session_lock:
+            return dict(cls._http_stats)
+    
     def fetch_html(self, url=None):
         """
         Fetch HTML content from the specified URL.
@@ -40,18 +329,167 @@ class BaseScraper(ABC):
             str: HTML content or None if failed
         """
         target_url = url or self.source_url
+        if self._run_urls is None:
+            return self._fetch(target_url)
+        
+        # During an ETL run, download each page once and share it between scrapes
+        with self._page_lock(target_url):
+            if target_url not in self._run_pages:
+                html = self._fetch(target_url)
+                if not html:
+                    return None
+                self._run_pages[target_url] = html
+            return self._run_pages[target_url]
+    
+    def fetch_many(self, urls, max_concurrency=None):
+        """
+        Fetch several URLs concurrently.
+        
+        Runs the async engine (fetch_many_async) to completion, so it must not
+        be called from inside a running event loop.
+        
+        Args:
+            urls (list): URLs to fetch
+            max_concurrency (int, optional): Global cap on in-flight requests
+            
+        Returns:
+            list: HTML content (or None if failed) for each URL, in order
+        """
+        return asyncio.run(self.fetch_many_async(urls, max_concurrency))
+    
+    async def fetch_many_async(self, urls, max_concurrency=None):
+        """
+        Fetch several URLs concurrently under per-host rate limits.
+        
+        Each host has a process-wide token bucket refilled at
+        Config.HTTP_RATE_LIMIT_PER_HOST requests per second (bursting up to
+        Config.HTTP_RATE_BURST), and no more than max_concurrency requests are
+        in flight at once. Requests go through fetch_html, so during an ETL run
+        pages already downloaded are reused without a request.
+        
+        Args:
+            urls (list): URLs to fetch
+            max_concurrency (int, optional): Global cap on in-flight requests,
+                defaults to Config.HTTP_MAX_CONCURRENCY
+            
+        Returns:
+            list: HTML content (or None if failed) for each URL, in order
+        """
+        if not urls:
+            return []
+        
+        max_concurrency = max_concurrency or Config.HTTP_MAX_CONCURRENCY
+        semaphore = asyncio.Semaphore(max_concurrency)
+        loop = asyncio.get_running_loop()
+        
+        async def fetch_one(url):
+            if self._run_urls is not None and url in self._run_pages:
+                return self._run_pages[url]
+            
+            await self.get_rate_limiter(urlsplit(url).netloc).acquire()
+            async with semaphore:
+                return await loop.run_in_executor(executor, self.fetch_html, url)
+        
+        with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='fetch') as executor:
+            return await asyncio.gather(*(fetch_one(url) for url in urls))
+    
+    def _fetch(self, target_url):
+        """
+        Fetch a URL through the shared session.
+        
+        When the response cache is enabled, the request carries the cached
+        validators and a 304 response is answered from the cache; if the cached
+        body has gone, the page is requested again without validators. The
+        hash of the first fetch of a URL in a run is kept in page_hashes.
+        
+        Args:
+            target_url (str): URL to fetch
+            
+        Returns:
+            str: HTML content or None if failed
+        """
+        cache = self.get_response_cache()
+        entry = cache.get(target_url) if cache else None
+        headers = dict(self.headers, **cache.conditional_headers(entry)) if entry else self.headers
+        
+        # Only the first fetch of a URL in a run decides whether it is unchanged
+        track_changes = self._run_urls is None or target_url not in self._run_urls
+        if self._run_urls is not None:
+            self._run_urls.add(target_url)
+        if track_changes:
+            self.page_hashes.pop(target_url, None)
+        
+        responses = []
+        error = None
         try:
             logger.info(f"Fetching HTML from {target_url}")
-            response = requests.get(
+            response = self.get_session().get(
                 target_url, 
-                headers=self.headers, 
+                headers=headers, 
                 timeout=Config.REQUEST_TIMEOUT
             )
+            responses.append(response)
+            
+            if response.status_code == 304 and entry:
+                html = cache.read_body(target_url)
+                if html is not None:
+                    logger.info(f"{target_url} not modified since last fetch")
+                    with self._session_lock:
+                        self._http_stats['not_modified'] += 1
+                    if track_changes:
+                        self.page_hashes[target_url] = entry['content_hash']
+                    return html
+                
+                logger.warning(f"Cached body missing for {target_url}, refetching")
+                response = self.get_session().get(
+                    target_url, 
+                    headers=self.headers, 
+                    timeout=Config.REQUEST_TIMEOUT
+                )
+                responses.append(response)
+            
             response.raise_for_status()
-            return response.text
+            html = response.text
+            
+            if cache:
+                content_hash = cache.store(
+                    target_url, html,
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified')
+                )
+            else:
+                content_hash = hash_content(html)
+            if track_changes:
+                self.page_hashes[target_url] = content_hash
+            
+            return html
         except requests.RequestException as e:
+            error = e
             logger.error(f"Error fetching {target_url}: {e}")
             return None
+        finally:
+            self._record_fetch(responses, error)
+    
+    def _record_fetch(self, responses, error):
+        """
+        Update the HTTP counters after a fetch, whether or not it succeeded.
+        
+        Args:
+            responses (list): Responses received for the fetch, in order
+            error (requests.RequestException): Error the fetch ended with, if any
+        """
+        retry_count = 0
+        for response in responses:
+            retries = getattr(response.raw, 'retries', None)
+            retry_count += len(retries.history) if retries is not None else 0
+        if error is not None and error.args and isinstance(error.args[0], MaxRetryError):
+            # Connection and read errors are only raised once every retry has been used
+            retry_count += Config.HTTP_MAX_RETRIES
+        
+        with self._session_lock:
+            self._http_stats['fetches'] += 1
+            self._http_stats['failed'] += int(error is not None)
+            self._http_stats['retries'] += retry_count
     
     def extract_text_content(self, html):
         """
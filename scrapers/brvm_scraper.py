@@ -2,12 +2,35 @@ import logging
 import re
 from datetime import datetime
 import pandas as pd
-from bs4 import BeautifulSoup
 import json
 from scrapers.base_scraper import BaseScraper
+from scrapers.table_extractor import extract_table
 
 logger = logging.getLogger(__name__)
 
+# Column keywords and default positions for the BRVM tables
+STOCK_COLUMNS = {
+    'ticker': (('symbol', 'ticker', 'code'), 0),
+    'name': (('name', 'company', 'title'), 1),
+    'sector': (('sector', 'industry'), None)
+}
+
+PRICE_COLUMNS = {
+    'ticker': (('symbol', 'ticker', 'code'), 0),
+    'close': (('close', 'closing', 'price'), 2),
+    'open': (('open', 'opening', 'previous'), 3),
+    'high': (('high',), None),
+    'low': (('low',), None),
+    'volume': (('volume', 'qty'), 4),
+    'change': (('change', 'var', '%'), 5)
+}
+
+INDEX_COLUMNS = {
+    'code': (('code', 'symbol', 'name'), 0),
+    'value': (('value', 'price', 'close', 'points'), 1),
+    'change': (('change', 'var', '%'), 2)
+}
+
 class BRVMScraper(BaseScraper):
     """Scraper for Bourse Régionale des Valeurs Mobilières (BRVM)."""
     
@@ -17,6 +40,15 @@ class BRVMScraper(BaseScraper):
         self.indices_url = 'https://www.brvm.org/en/indices/0'
         self.market_summary_url = 'https://www.brvm.org/en/market-summary'
     
+    @property
+    def dataset_urls(self):
+        """Get the page URL each dataset is scraped from."""
+        return {
+            'stocks': self.equity_url,
+            'prices': self.equity_url,
+            'indices': self.indices_url
+        }
+    
     def scrape_stocks(self):
         """
         Scrape BRVM stocks information.
@@ -30,39 +62,25 @@ class BRVMScraper(BaseScraper):
             logger.error("Failed to fetch BRVM stocks data")
             return []
         
-        soup = BeautifulSoup(html, 'html.parser')
+        if self.dataset_unchanged('stocks'):
+            logger.info("BRVM stocks page unchanged since last load, skipping parse")
+            return []
+        
         stocks = []
         
         try:
             # BRVM stock data is typically in a table with a specific class
-            table = soup.select_one('table.table-striped')
+            rows = extract_table(
+                self.get_tree(self.equity_url, html), 'table.table-striped',
+                STOCK_COLUMNS, min_cells=2, optional=('sector',)  # Need at least ticker and name
+            )
             
-            if not table:
+            if rows is None:
                 logger.warning("No stock table found on BRVM page")
                 return []
             
-            # Extract headers to identify columns
-            headers = [th.get_text(strip=True).lower() for th in table.select('thead th')]
-            
-            # Create column index mapping
-            col_map = {
-                'ticker': next((i for i, h in enumerate(headers) if 'symbol' in h or 'ticker' in h or 'code' in h), 0),
-                'name': next((i for i, h in enumerate(headers) if 'name' in h or 'company' in h or 'title' in h), 1),
-                'sector': next((i for i, h in enumerate(headers) if 'sector' in h or 'industry' in h), None)
-            }
-            
-            rows = table.select('tbody tr')
-            
-            for row in rows:
-                cells = row.select('td')
-                if len(cells) < 2:  # Need at least ticker and name
-                    continue
-                
+            for ticker, name, sector in rows:
                 try:
-                    ticker = cells[col_map['ticker']].get_text(strip=True) if col_map['ticker'] is not None else None
-                    name = cells[col_map['name']].get_text(strip=True) if col_map['name'] is not None else None
-                    sector = cells[col_map['sector']].get_text(strip=True) if col_map['sector'] is not None and col_map['sector'] < len(cells) else None
-                    
                     if not ticker or not name:
                         continue
                     
@@ -104,41 +122,28 @@ class BRVMScraper(BaseScraper):
             logger.error("Failed to fetch BRVM price data")
             return {}
         
-        soup = BeautifulSoup(html, 'html.parser')
+        if self.dataset_unchanged('prices'):
+            logger.info("BRVM price page unchanged since last load, skipping parse")
+            return {}
+        
         price_data = {}
         
         try:
             # BRVM price data is typically in the same table as the equity list
-            table = soup.select_one('table.table-striped')
+            rows = extract_table(
+                self.get_tree(self.equity_url, html), 'table.table-striped',
+                PRICE_COLUMNS, min_cells=6, optional=('high', 'low')  # Need enough cells for the basic data
+            )
             
-            if not table:
+            if rows is None:
                 logger.warning("No price table found on BRVM page")
                 return {}
             
-            # Extract headers to identify columns
-            headers = [th.get_text(strip=True).lower() for th in table.select('thead th')]
-            
-            # Create column index mapping
-            col_map = {
-                'ticker': next((i for i, h in enumerate(headers) if 'symbol' in h or 'ticker' in h or 'code' in h), 0),
-                'close': next((i for i, h in enumerate(headers) if 'close' in h or 'closing' in h or 'price' in h), 2),
-                'open': next((i for i, h in enumerate(headers) if 'open' in h or 'opening' in h or 'previous' in h), 3),
-                'high': next((i for i, h in enumerate(headers) if 'high' in h), None),
-                'low': next((i for i, h in enumerate(headers) if 'low' in h), None),
-                'volume': next((i for i, h in enumerate(headers) if 'volume' in h or 'qty' in h), 4),
-                'change': next((i for i, h in enumerate(headers) if 'change' in h or 'var' in h or '%' in h), 5)
-            }
-            
-            rows = table.select('tbody tr')
             today = datetime.now().strftime('%Y-%m-%d')
             
-            for row in rows:
-                cells = row.select('td')
-                if len(cells) < 6:  # Need enough cells for the basic data
-                    continue
-                
+            for row_ticker, close, open_, high, low, volume, change in rows:
                 try:
-                    row_ticker = cells[col_map['ticker']].get_text(strip=True).upper() if col_map['ticker'] is not None else None
+                    row_ticker = row_ticker.upper() if row_ticker is not None else None
                     
                     # Skip if we're looking for a specific ticker and this isn't it
                     if ticker and row_ticker != ticker.upper():
@@ -147,18 +152,18 @@ class BRVMScraper(BaseScraper):
                     # Extract price data
                     price_info = {
                         'date': today,
-                        'close_price': self._extract_float(cells[col_map['close']].get_text(strip=True)) if col_map['close'] is not None else None,
-                        'open_price': self._extract_float(cells[col_map['open']].get_text(strip=True)) if col_map['open'] is not None else None,
-                        'volume': self._extract_int(cells[col_map['volume']].get_text(strip=True)) if col_map['volume'] is not None else None,
-                        'change_percent': self._extract_float(cells[col_map['change']].get_text(strip=True)) if col_map['change'] is not None else None
+                        'close_price': self._extract_float(close) if close is not None else None,
+                        'open_price': self._extract_float(open_) if open_ is not None else None,
+                        'volume': self._extract_int(volume) if volume is not None else None,
+                        'change_percent': self._extract_float(change) if change is not None else None
                     }
                     
                     # Add high/low if available
-                    if col_map['high'] is not None and col_map['high'] < len(cells):
-                        price_info['high_price'] = self._extract_float(cells[col_map['high']].get_text(strip=True))
+                    if high is not None:
+                        price_info['high_price'] = self._extract_float(high)
                     
-                    if col_map['low'] is not None and col_map['low'] < len(cells):
-                        price_info['low_price'] = self._extract_float(cells[col_map['low']].get_text(strip=True))
+                    if low is not None:
+                        price_info['low_price'] = self._extract_float(low)
                     
                     if row_ticker not in price_data:
                         price_data[row_ticker] = []
@@ -188,39 +193,25 @@ class BRVMScraper(BaseScraper):
             logger.error("Failed to fetch BRVM indices data")
             return []
         
-        soup = BeautifulSoup(html, 'html.parser')
+        if self.dataset_unchanged('indices'):
+            logger.info("BRVM indices page unchanged since last load, skipping parse")
+            return []
+        
         indices = []
         
         try:
             # BRVM indices are typically in a dedicated table
-            table = soup.select_one('table.table-striped')
+            rows = extract_table(
+                self.get_tree(self.indices_url, html), 'table.table-striped',
+                INDEX_COLUMNS, min_cells=3  # Need basic data
+            )
             
-            if not table:
+            if rows is None:
                 logger.warning("No indices table found on BRVM page")
                 return []
             
-            # Extract headers to identify columns
-            headers = [th.get_text(strip=True).lower() for th in table.select('thead th')]
-            
-            # Create column index mapping
-            col_map = {
-                'code': next((i for i, h in enumerate(headers) if 'code' in h or 'symbol' in h or 'name' in h), 0),
-                'value': next((i for i, h in enumerate(headers) if 'value' in h or 'price' in h or 'close' in h or 'points' in h), 1),
-                'change': next((i for i, h in enumerate(headers) if 'change' in h or 'var' in h or '%' in h), 2)
-            }
-            
-            rows = table.select('tbody tr')
-            
-            for row in rows:
-                cells = row.select('td')
-                if len(cells) < 3:  # Need basic data
-                    continue
-                
+            for code, value, change in rows:
                 try:
-                    code = cells[col_map['code']].get_text(strip=True) if col_map['code'] is not None else None
-                    value = self._extract_float(cells[col_map['value']].get_text(strip=True)) if col_map['value'] is not None else None
-                    change = self._extract_float(cells[col_map['change']].get_text(strip=True)) if col_map['change'] is not None else None
-                    
                     if not code:
                         continue
                     
@@ -233,8 +224,8 @@ class BRVMScraper(BaseScraper):
                         'name': code,  # Use full text as name
                         'exchange_code': 'BRVM',
                         'last_updated': datetime.now().strftime('%Y-%m-%d'),
-                        'value': value,
-                        'change_percent': change
+                        'value': self._extract_float(value) if value is not None else None,
+                        'change_percent': self._extract_float(change) if change is not None else None
                     }
                     
                     indices.append(index)
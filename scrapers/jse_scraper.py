@@ -2,12 +2,37 @@ import logging
 import re
 from datetime import datetime
 import pandas as pd
-from bs4 import BeautifulSoup
 import json
 from scrapers.base_scraper import BaseScraper
+from scrapers.table_extractor import extract_table
 
 logger = logging.getLogger(__name__)
 
+# Column keywords and default positions for the JSE tables
+STOCK_COLUMNS = {
+    'ticker': ((), 0),
+    'name': ((), 1),
+    'sector': ((), 4)
+}
+
+PRICE_COLUMNS = {
+    'ticker': (('code', 'ticker'), None),
+    'date': (('date',), None),
+    'close': (('close', 'price'), None),
+    'open': (('open',), None),
+    'high': (('high',), None),
+    'low': (('low',), None),
+    'volume': (('volume',), None),
+    'change': (('change', '%'), None)
+}
+
+INDEX_COLUMNS = {
+    'code': ((), 0),
+    'name': ((), 1),
+    'value': ((), 2),
+    'change': ((), 3)
+}
+
 class JSEScraper(BaseScraper):
     """Scraper for Johannesburg Stock Exchange (JSE)."""
     
@@ -17,6 +42,15 @@ class JSEScraper(BaseScraper):
         self.price_data_url = 'https://www.jse.co.za/market-data/equity-market/price-data'
         self.indices_url = 'https://www.jse.co.za/market-data/indices'
     
+    @property
+    def dataset_urls(self):
+        """Get the page URL each dataset is scraped from."""
+        return {
+            'stocks': self.equity_url,
+            'prices': self.price_data_url,
+            'indices': self.indices_url
+        }
+    
     def scrape_stocks(self):
         """
         Scrape JSE stocks information.
@@ -30,48 +64,41 @@ class JSEScraper(BaseScraper):
             logger.error("Failed to fetch JSE stocks data")
             return []
         
-        soup = BeautifulSoup(html, 'html.parser')
+        if self.dataset_unchanged('stocks'):
+            logger.info("JSE stocks page unchanged since last load, skipping parse")
+            return []
+        
         stocks = []
         
         try:
-            # Look for the table containing stock listings
-            stock_tables = soup.select('table.equity-table')
+            # Look for the tables containing stock listings
+            rows = extract_table(
+                self.get_tree(self.equity_url, html), 'table.equity-table',
+                STOCK_COLUMNS, min_cells=4, all_tables=True, optional=('sector',)
+            )
             
-            if not stock_tables:
+            if rows is None:
                 logger.warning("No stock tables found on JSE page")
                 return []
             
-            for table in stock_tables:
-                rows = table.select('tbody tr')
-                
-                for row in rows:
-                    cells = row.select('td')
-                    if len(cells) >= 4:  # Ensure we have enough cells
-                        try:
-                            ticker = cells[0].get_text(strip=True)
-                            name = cells[1].get_text(strip=True)
-                            
-                            # Some data cleaning
-                            ticker = ticker.upper()
-                            
-                            stock = {
-                                'ticker': ticker,
-                                'name': name,
-                                'exchange_code': 'JSE',
-                                'currency': 'ZAR',
-                                'last_updated': datetime.now().strftime('%Y-%m-%d')
-                            }
-                            
-                            # Try to extract sector if available
-                            if len(cells) > 4:
-                                sector = cells[4].get_text(strip=True)
-                                if sector:
-                                    stock['sector'] = sector
-                            
-                            stocks.append(stock)
-                        except Exception as e:
-                            logger.error(f"Error parsing JSE stock row: {e}")
-                            continue
+            for ticker, name, sector in rows:
+                try:
+                    stock = {
+                        'ticker': ticker.upper(),
+                        'name': name,
+                        'exchange_code': 'JSE',
+                        'currency': 'ZAR',
+                        'last_updated': datetime.now().strftime('%Y-%m-%d')
+                    }
+                    
+                    # Sector is only present in wider tables
+                    if sector:
+                        stock['sector'] = sector
+                    
+                    stocks.append(stock)
+                except Exception as e:
+                    logger.error(f"Error parsing JSE stock row: {e}")
+                    continue
         
         except Exception as e:
             logger.error(f"Error scraping JSE stocks: {e}")
@@ -95,73 +122,58 @@ class JSEScraper(BaseScraper):
             logger.error("Failed to fetch JSE price data")
             return {}
         
-        soup = BeautifulSoup(html, 'html.parser')
+        if self.dataset_unchanged('prices'):
+            logger.info("JSE price page unchanged since last load, skipping parse")
+            return {}
+        
         price_data = {}
         
         try:
-            # Look for price data tables or data in a structured format
-            price_tables = soup.select('table.price-table')
+            # Look for price data tables, mapping each table's columns from its header
+            rows = extract_table(
+                self.get_tree(self.price_data_url, html), 'table.price-table',
+                PRICE_COLUMNS, all_tables=True
+            )
             
-            if not price_tables:
+            if rows is None:
                 logger.warning("No price tables found on JSE page")
                 return {}
             
-            for table in price_tables:
-                # Extract table header to identify columns
-                headers = [th.get_text(strip=True) for th in table.select('thead th')]
-                
-                # Create mappings for the columns we're interested in
-                col_map = {
-                    'ticker': next((i for i, h in enumerate(headers) if 'code' in h.lower() or 'ticker' in h.lower()), None),
-                    'close': next((i for i, h in enumerate(headers) if 'close' in h.lower() or 'price' in h.lower()), None),
-                    'open': next((i for i, h in enumerate(headers) if 'open' in h.lower()), None),
-                    'high': next((i for i, h in enumerate(headers) if 'high' in h.lower()), None),
-                    'low': next((i for i, h in enumerate(headers) if 'low' in h.lower()), None),
-                    'volume': next((i for i, h in enumerate(headers) if 'volume' in h.lower()), None),
-                    'change': next((i for i, h in enumerate(headers) if 'change' in h.lower() or '%' in h), None),
-                    'date': next((i for i, h in enumerate(headers) if 'date' in h.lower()), None),
-                }
-                
-                rows = table.select('tbody tr')
-                today = datetime.now().strftime('%Y-%m-%d')
-                
-                for row in rows:
-                    cells = row.select('td')
-                    if len(cells) < max(filter(None, col_map.values())) + 1:
+            today = datetime.now().strftime('%Y-%m-%d')
+            
+            for row_ticker, date, close, open_, high, low, volume, change in rows:
+                try:
+                    row_ticker = row_ticker.upper() if row_ticker is not None else None
+                    
+                    # Skip if we're looking for a specific ticker and this isn't it
+                    if ticker and row_ticker != ticker.upper():
                         continue
                     
+                    # Extract price data
+                    price_info = {
+                        'date': date if date is not None else today,
+                        'close_price': self._extract_float(close) if close is not None else None,
+                        'open_price': self._extract_float(open_) if open_ is not None else None,
+                        'high_price': self._extract_float(high) if high is not None else None,
+                        'low_price': self._extract_float(low) if low is not None else None,
+                        'volume': self._extract_int(volume) if volume is not None else None,
+                        'change_percent': self._extract_float(change) if change is not None else None
+                    }
+                    
+                    # Standardize date format
                     try:
-                        row_ticker = cells[col_map['ticker']].get_text(strip=True).upper() if col_map['ticker'] is not None else None
-                        
-                        # Skip if we're looking for a specific ticker and this isn't it
-                        if ticker and row_ticker != ticker.upper():
-                            continue
-                        
-                        # Extract price data
-                        price_info = {
-                            'date': cells[col_map['date']].get_text(strip=True) if col_map['date'] is not None else today,
-                            'close_price': self._extract_float(cells[col_map['close']].get_text(strip=True)) if col_map['close'] is not None else None,
-                            'open_price': self._extract_float(cells[col_map['open']].get_text(strip=True)) if col_map['open'] is not None else None,
-                            'high_price': self._extract_float(cells[col_map['high']].get_text(strip=True)) if col_map['high'] is not None else None,
-                            'low_price': self._extract_float(cells[col_map['low']].get_text(strip=True)) if col_map['low'] is not None else None,
-                            'volume': self._extract_int(cells[col_map['volume']].get_text(strip=True)) if col_map['volume'] is not None else None,
-                            'change_percent': self._extract_float(cells[col_map['change']].get_text(strip=True)) if col_map['change'] is not None else None
-                        }
-                        
-                        # Standardize date format
-                        try:
-                            date_obj = datetime.strptime(price_info['date'], '%d %b %Y')
-                            price_info['date'] = date_obj.strftime('%Y-%m-%d')
-                        except:
-                            price_info['date'] = today
-                        
-                        if row_ticker not in price_data:
-                            price_data[row_ticker] = []
-                        
-                        price_data[row_ticker].append(price_info)
-                    except Exception as e:
-                        logger.error(f"Error parsing JSE price row: {e}")
-                        continue
+                        date_obj = datetime.strptime(price_info['date'], '%d %b %Y')
+                        price_info['date'] = date_obj.strftime('%Y-%m-%d')
+                    except:
+                        price_info['date'] = today
+                    
+                    if row_ticker not in price_data:
+                        price_data[row_ticker] = []
+                    
+                    price_data[row_ticker].append(price_info)
+                except Exception as e:
+                    logger.error(f"Error parsing JSE price row: {e}")
+                    continue
         
         except Exception as e:
             logger.error(f"Error scraping JSE stock prices: {e}")
@@ -183,46 +195,43 @@ class JSEScraper(BaseScraper):
             logger.error("Failed to fetch JSE indices data")
             return []
         
-        soup = BeautifulSoup(html, 'html.parser')
+        if self.dataset_unchanged('indices'):
+            logger.info("JSE indices page unchanged since last load, skipping parse")
+            return []
+        
         indices = []
         
         try:
             # Look for indices tables
-            index_tables = soup.select('table.indices-table')
+            rows = extract_table(
+                self.get_tree(self.indices_url, html), 'table.indices-table',
+                INDEX_COLUMNS, min_cells=3, all_tables=True, optional=('change',)
+            )
             
-            if not index_tables:
+            if rows is None:
                 logger.warning("No indices tables found on JSE page")
                 return []
             
-            for table in index_tables:
-                rows = table.select('tbody tr')
-                
-                for row in rows:
-                    cells = row.select('td')
-                    if len(cells) >= 3:  # Ensure we have enough cells
-                        try:
-                            code = cells[0].get_text(strip=True)
-                            name = cells[1].get_text(strip=True)
-                            value = self._extract_float(cells[2].get_text(strip=True))
-                            
-                            index = {
-                                'code': code,
-                                'name': name,
-                                'exchange_code': 'JSE',
-                                'last_updated': datetime.now().strftime('%Y-%m-%d'),
-                                'value': value
-                            }
-                            
-                            # Try to extract change if available
-                            if len(cells) > 3:
-                                change = self._extract_float(cells[3].get_text(strip=True))
-                                if change is not None:
-                                    index['change_percent'] = change
-                            
-                            indices.append(index)
-                        except Exception as e:
-                            logger.error(f"Error parsing JSE index row: {e}")
-                            continue
+            for code, name, value, change in rows:
+                try:
+                    index = {
+                        'code': code,
+                        'name': name,
+                        'exchange_code': 'JSE',
+                        'last_updated': datetime.now().strftime('%Y-%m-%d'),
+                        'value': self._extract_float(value)
+                    }
+                    
+                    # Change is only present in wider tables
+                    if change is not None:
+                        change = self._extract_float(change)
+                        if change is not None:
+                            index['change_percent'] = change
+                    
+                    indices.append(index)
+                except Exception as e:
+                    logger.error(f"Error parsing JSE index row: {e}")
+                    continue
         
         except Exception as e:
             logger.error(f"Error scraping JSE indices: {e}")
@@ -2,12 +2,36 @@ import logging
 import re
 from datetime import datetime
 import pandas as pd
-from bs4 import BeautifulSoup
 import json
 from scrapers.base_scraper import BaseScraper
+from scrapers.table_extractor import extract_table
 
 logger = logging.getLogger(__name__)
 
+# Column keywords and default positions for the NGX price list and indices tables
+STOCK_COLUMNS = {
+    'ticker': (('symbol', 'ticker'), None),
+    'name': (('name', 'company'), None),
+    'sector': (('sector', 'industry'), None)
+}
+
+PRICE_COLUMNS = {
+    'ticker': (('symbol', 'ticker'), None),
+    'close': (('close', 'closing'), None),
+    'open': (('open', 'opening'), None),
+    'high': (('high',), None),
+    'low': (('low',), None),
+    'volume': (('volume',), None),
+    'change': (('change', '%'), None)
+}
+
+INDEX_COLUMNS = {
+    'code': (('code', 'symbol'), None),
+    'name': (('name', 'description'), None),
+    'value': (('value', 'price', 'close'), None),
+    'change': (('change', '%'), None)
+}
+
 class NGXScraper(BaseScraper):
     """Scraper for Nigerian Exchange Group (NGX)."""
     
@@ -17,6 +41,15 @@ class NGXScraper(BaseScraper):
         self.market_summary_url = 'https://ngxgroup.com/exchange/data/market-summary/'
         self.indices_url = 'https://ngxgroup.com/exchange/data/indices/'
     
+    @property
+    def dataset_urls(self):
+        """Get the page URL each dataset is scraped from."""
+        return {
+            'stocks': self.equity_url,
+            'prices': self.equity_url,
+            'indices': self.indices_url
+        }
+    
     def scrape_stocks(self):
         """
         Scrape NGX stocks information.
@@ -30,39 +63,22 @@ class NGXScraper(BaseScraper):
             logger.error("Failed to fetch NGX stocks data")
             return []
         
-        soup = BeautifulSoup(html, 'html.parser')
+        if self.dataset_unchanged('stocks'):
+            logger.info("NGX stocks page unchanged since last load, skipping parse")
+            return []
+        
         stocks = []
         
         try:
             # NGX equity data is typically in a table with price list
-            table = soup.select_one('table.price-list-table')
+            rows = extract_table(self.get_tree(self.equity_url, html), 'table.price-list-table', STOCK_COLUMNS)
             
-            if not table:
+            if rows is None:
                 logger.warning("No stock table found on NGX page")
                 return []
             
-            # Extract headers to identify columns
-            headers = [th.get_text(strip=True).lower() for th in table.select('thead th')]
-            
-            # Create column index mapping
-            col_map = {
-                'ticker': next((i for i, h in enumerate(headers) if 'symbol' in h or 'ticker' in h), None),
-                'name': next((i for i, h in enumerate(headers) if 'name' in h or 'company' in h), None),
-                'sector': next((i for i, h in enumerate(headers) if 'sector' in h or 'industry' in h), None)
-            }
-            
-            rows = table.select('tbody tr')
-            
-            for row in rows:
-                cells = row.select('td')
-                if len(cells) < max(filter(None, col_map.values())) + 1:
-                    continue
-                
+            for ticker, name, sector in rows:
                 try:
-                    ticker = cells[col_map['ticker']].get_text(strip=True) if col_map['ticker'] is not None else None
-                    name = cells[col_map['name']].get_text(strip=True) if col_map['name'] is not None else None
-                    sector = cells[col_map['sector']].get_text(strip=True) if col_map['sector'] is not None else None
-                    
                     if not ticker or not name:
                         continue
                     
@@ -104,41 +120,25 @@ class NGXScraper(BaseScraper):
             logger.error("Failed to fetch NGX price data")
             return {}
         
-        soup = BeautifulSoup(html, 'html.parser')
+        if self.dataset_unchanged('prices'):
+            logger.info("NGX price page unchanged since last load, skipping parse")
+            return {}
+        
         price_data = {}
         
         try:
             # NGX price data is typically in the same table as the equity list
-            table = soup.select_one('table.price-list-table')
+            rows = extract_table(self.get_tree(self.equity_url, html), 'table.price-list-table', PRICE_COLUMNS)
             
-            if not table:
+            if rows is None:
                 logger.warning("No price table found on NGX page")
                 return {}
             
-            # Extract headers to identify columns
-            headers = [th.get_text(strip=True).lower() for th in table.select('thead th')]
-            
-            # Create column index mapping
-            col_map = {
-                'ticker': next((i for i, h in enumerate(headers) if 'symbol' in h or 'ticker' in h), None),
-                'close': next((i for i, h in enumerate(headers) if 'close' in h or 'closing' in h), None),
-                'open': next((i for i, h in enumerate(headers) if 'open' in h or 'opening' in h), None),
-                'high': next((i for i, h in enumerate(headers) if 'high' in h), None),
-                'low': next((i for i, h in enumerate(headers) if 'low' in h), None),
-                'volume': next((i for i, h in enumerate(headers) if 'volume' in h), None),
-                'change': next((i for i, h in enumerate(headers) if 'change' in h or '%' in h), None)
-            }
-            
-            rows = table.select('tbody tr')
             today = datetime.now().strftime('%Y-%m-%d')
             
-            for row in rows:
-                cells = row.select('td')
-                if len(cells) < max(filter(None, col_map.values())) + 1:
-                    continue
-                
+            for row_ticker, close, open_, high, low, volume, change in rows:
                 try:
-                    row_ticker = cells[col_map['ticker']].get_text(strip=True).upper() if col_map['ticker'] is not None else None
+                    row_ticker = row_ticker.upper() if row_ticker is not None else None
                     
                     # Skip if we're looking for a specific ticker and this isn't it
                     if ticker and row_ticker != ticker.upper():
@@ -147,12 +147,12 @@ class NGXScraper(BaseScraper):
                     # Extract price data
                     price_info = {
                         'date': today,
-                        'close_price': self._extract_float(cells[col_map['close']].get_text(strip=True)) if col_map['close'] is not None else None,
-                        'open_price': self._extract_float(cells[col_map['open']].get_text(strip=True)) if col_map['open'] is not None else None,
-                        'high_price': self._extract_float(cells[col_map['high']].get_text(strip=True)) if col_map['high'] is not None else None,
-                        'low_price': self._extract_float(cells[col_map['low']].get_text(strip=True)) if col_map['low'] is not None else None,
-                        'volume': self._extract_int(cells[col_map['volume']].get_text(strip=True)) if col_map['volume'] is not None else None,
-                        'change_percent': self._extract_float(cells[col_map['change']].get_text(strip=True)) if col_map['change'] is not None else None
+                        'close_price': self._extract_float(close) if close is not None else None,
+                        'open_price': self._extract_float(open_) if open_ is not None else None,
+                        'high_price': self._extract_float(high) if high is not None else None,
+                        'low_price': self._extract_float(low) if low is not None else None,
+                        'volume': self._extract_int(volume) if volume is not None else None,
+                        'change_percent': self._extract_float(change) if change is not None else None
                     }
                     
                     if row_ticker not in price_data:
@@ -183,41 +183,22 @@ class NGXScraper(BaseScraper):
             logger.error("Failed to fetch NGX indices data")
             return []
         
-        soup = BeautifulSoup(html, 'html.parser')
+        if self.dataset_unchanged('indices'):
+            logger.info("NGX indices page unchanged since last load, skipping parse")
+            return []
+        
         indices = []
         
         try:
             # NGX indices are typically in a dedicated table
-            table = soup.select_one('table.indices-table')
+            rows = extract_table(self.get_tree(self.indices_url, html), 'table.indices-table', INDEX_COLUMNS)
             
-            if not table:
+            if rows is None:
                 logger.warning("No indices table found on NGX page")
                 return []
             
-            # Extract headers to identify columns
-            headers = [th.get_text(strip=True).lower() for th in table.select('thead th')]
-            
-            # Create column index mapping
-            col_map = {
-                'code': next((i for i, h in enumerate(headers) if 'code' in h or 'symbol' in h), None),
-                'name': next((i for i, h in enumerate(headers) if 'name' in h or 'description' in h), None),
-                'value': next((i for i, h in enumerate(headers) if 'value' in h or 'price' in h or 'close' in h), None),
-                'change': next((i for i, h in enumerate(headers) if 'change' in h or '%' in h), None)
-            }
-            
-            rows = table.select('tbody tr')
-            
-            for row in rows:
-                cells = row.select('td')
-                if len(cells) < max(filter(None, col_map.values())) + 1:
-                    continue
-                
+            for code, name, value, change in rows:
                 try:
-                    code = cells[col_map['code']].get_text(strip=True) if col_map['code'] is not None else None
-                    name = cells[col_map['name']].get_text(strip=True) if col_map['name'] is not None else None
-                    value = self._extract_float(cells[col_map['value']].get_text(strip=True)) if col_map['value'] is not None else None
-                    change = self._extract_float(cells[col_map['change']].get_text(strip=True)) if col_map['change'] is not None else None
-                    
                     if not code or not name:
                         continue
                     
@@ -226,8 +207,8 @@ class NGXScraper(BaseScraper):
                         'name': name,
                         'exchange_code': 'NGX',
                         'last_updated': datetime.now().strftime('%Y-%m-%d'),
-                        'value': value,
-                        'change_percent': change
+                        'value': self._extract_float(value) if value is not None else None,
+                        'change_percent': self._extract_float(change) if change is not None else None
                     }
                     
                     indices.append(index)
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+def hash_content(body):
+    """Get the SHA-256 hash of a page body."""
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+class ResponseCache:
+    """On-disk cache of fetched pages and their HTTP validators."""
+    
+    def __init__(self, directory, max_bytes, default_ttl, url_ttls=None):
+        """
+        Initialize the response cache.
+        
+        Args:
+            directory (str): Directory holding cached bodies and metadata
+            max_bytes (int): Total body size kept before least recently used entries are evicted
+            default_ttl (int): Seconds a downloaded page may be revalidated before it is refetched in full
+            url_ttls (dict, optional): TTL overrides keyed by URL prefix
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.url_ttls = url_ttls or {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+    
+    def get(self, url):
+        """
+        Get the cached entry for a URL.
+        
+        Args:
+            url (str): Page URL
+        
+        Returns:
+            dict: Entry metadata (url, etag, last_modified, content_hash, fetched_at, size),
+                or None if the URL is not cached or its TTL has expired
+        """
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if time.time() - entry.get('fetched_at', 0) > self.ttl_for(url) or not os.path.exists(body_path):
+            self._remove(url)
+            return None
+        
+        # Mark the entry as recently used for eviction
+        os.utime(meta_path)
+        return entry
+    
+    def read_body(self, url):
+        """
+        Read the cached body for a URL.
+        
+        Args:
+            url (str): Page URL
+        
+        Returns:
+            str: Cached page content or None if missing
+        """
+        _, body_path = self._paths(url)
+        try:
+            with open(body_path, encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+    
+    def store(self, url, body, etag=None, last_modified=None):
+        """
+        Store a downloaded page and its validators, evicting old entries if needed.
+        
+        Args:
+            url (str): Page URL
+            body (str): Page content
+            etag (str, optional): ETag response header
+            last_modified (str, optional): Last-Modified response header
+        
+        Returns:
+            str: SHA-256 hash of the body
+        """
+        data = body.encode('utf-8')
+        entry = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_hash': hash_content(body),
+            'fetched_at': time.time(),
+            'size': len(data)
+        }
+        meta_path, body_path = self._paths(url)
+        
+        with self._lock:
+            self._write_atomic(body_path, data)
+            self._write_atomic(meta_path, json.dumps(entry).encode('utf-8'))
+            self._evict()
+        
+        return entry['content_hash']
+    
+    def conditional_headers(self, entry):
+        """Build If-None-Match / If-Modified-Since headers from a cached entry."""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def ttl_for(self, url):
+        """Get the TTL for a URL, using the longest matching prefix override."""
+        matches = [prefix for prefix in self.url_ttls if url.startswith(prefix)]
+        if matches:
+            return self.url_ttls[max(matches, key=len)]
+        return self.default_ttl
+    
+    def _evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            meta_path = os.path.join(self.directory, name)
+            body_path = meta_path[:-len('.json')] + '.body'
+            try:
+                size = os.path.getsize(body_path)
+                entries.append((os.path.getmtime(meta_path), meta_path, body_path, size))
+                total += size
+            except OSError:
+                continue
+        
+        entries.sort()
+        while total > self.max_bytes and entries:
+            _, meta_path, body_path, size = entries.pop(0)
+            for path in (meta_path, body_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+            logger.debug(f"Evicted cached response {meta_path}")
+    
+    def _remove(self, url):
+        """Remove a URL's cached files."""
+        for path in self._paths(url):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    
+    def _paths(self, url):
+        """Get the metadata and body file paths for a URL."""
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + '.json', base + '.body'
+    
+    def _write_atomic(self, path, data):
+        """Write a file via a temporary file so readers never see partial content."""
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
@@ -0,0 +1,134 @@
+import logging
+import lxml.html
+
+logger = logging.getLogger(__name__)
+
+def parse_html(html):
+    """
+    Parse an HTML page with lxml.
+    
+    Args:
+        html (str): HTML content
+    
+    Returns:
+        lxml.html.HtmlElement: Root element of the parsed page
+    """
+    return lxml.html.fromstring(html)
+
+def selector_to_xpath(selector):
+    """
+    Convert a simple 'tag', 'tag.class' or 'tag#id' CSS selector to XPath.
+    
+    Args:
+        selector (str): CSS selector
+    
+    Returns:
+        str: Equivalent XPath expression matching anywhere in the document
+    """
+    if '#' in selector:
+        tag, element_id = selector.split('#', 1)
+        return f"//{tag or '*'}[@id='{element_id}']"
+    
+    tag, *classes = selector.split('.')
+    conditions = ''.join(
+        f"[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')]" for cls in classes
+    )
+    return f"//{tag or '*'}{conditions}"
+
+def cell_text(element):
+    """Get an element's text with each text node stripped, like BeautifulSoup's get_text(strip=True)."""
+    return ''.join(text.strip() for text in element.itertext())
+
+def select_tables(tree, selector):
+    """
+    Find all tables matching a selector.
+    
+    Args:
+        tree: Parsed page from parse_html
+        selector (str): Simple CSS selector, e.g. 'table.price-list-table'
+    
+    Returns:
+        list: Matching table elements
+    """
+    return tree.xpath(selector_to_xpath(selector))
+
+def table_headers(table):
+    """Get a table's lowercased header texts in column order."""
+    return [cell_text(th).lower() for th in table.xpath('.//thead//th')]
+
+def map_columns(headers, columns):
+    """
+    Map column names to header positions.
+    
+    Args:
+        headers (list): Lowercased header texts
+        columns (dict): Column name -> (keywords, default index). A column maps to
+            the first header containing any of its keywords, otherwise to its default.
+    
+    Returns:
+        dict: Column name -> index (or None if not found and no default)
+    """
+    return {
+        name: next((i for i, header in enumerate(headers) if any(keyword in header for keyword in keywords)), default)
+        for name, (keywords, default) in columns.items()
+    }
+
+def iter_rows(table, indices, min_cells=0):
+    """
+    Yield body rows as tuples of cell texts in a single pass.
+    
+    Args:
+        table: Table element
+        indices (list): Cell index for each output position; None or an
+            index past the end of a row yields None in that position
+        min_cells (int): Rows with fewer cells are skipped
+    
+    Yields:
+        tuple: Cell texts in the order of indices
+    """
+    for row in table.xpath('.//tbody//tr'):
+        cells = row.xpath('.//td')
+        count = len(cells)
+        if count < min_cells:
+            continue
+        
+        yield tuple(
+            cell_text(cells[i]) if i is not None and i < count else None
+            for i in indices
+        )
+
+def extract_table(tree, selector, columns, min_cells=None, all_tables=False, optional=()):
+    """
+    Locate tables matching a selector and extract column-mapped rows.
+    
+    Rows too short to hold every mapped column not listed in optional are
+    always skipped, even when min_cells is lower.
+    
+    Args:
+        tree: Parsed page from parse_html
+        selector (str): Simple CSS selector for the table
+        columns (dict): Column name -> (keywords, default index), see map_columns
+        min_cells (int, optional): Rows with fewer cells are also skipped
+        all_tables (bool): Read every matching table, mapping each one's headers
+            separately, instead of only the first
+        optional (iterable): Columns that may be missing from a row, read as None
+    
+    Returns:
+        list: Row tuples in the order of columns, or None if no table matches
+    """
+    tables = select_tables(tree, selector)
+    if not tables:
+        return None
+    
+    rows = []
+    for table in tables if all_tables else tables[:1]:
+        col_map = map_columns(table_headers(table), columns)
+        indices = [col_map[name] for name in columns]
+        
+        required = [col_map[name] for name in columns if name not in optional and col_map[name] is not None]
+        table_min_cells = max(min_cells or 0, max(required) + 1 if required else 0)
+        
+        rows.extend(iter_rows(table, indices, table_min_cells))
+    
+    logger.debug(f"Extracted {len(rows)} rows from {selector}")
+    return rows
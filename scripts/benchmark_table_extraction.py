@@ -0,0 +1,98 @@
+"""
+Benchmark the lxml table extractor against BeautifulSoup cell walking.
+
+Usage:
+    python scripts/benchmark_table_extraction.py [page.html ...] [--selector SEL] [--rows N] [--repeat N]
+
+Saved exchange pages can be passed as fixtures; without any, a synthetic NGX
+price list page with --rows rows is generated. Peak memory is the Python heap
+traced by tracemalloc, which does not include lxml's C-level document tree.
+"""
+import sys
+import os
+import argparse
+import time
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from scrapers.table_extractor import parse_html, extract_table, map_columns
+from scrapers.ngx_scraper import PRICE_COLUMNS
+
+def build_fixture_page(rows):
+    """Build a synthetic NGX-style price list page."""
+    header = ''.join(f'<th>{name}</th>' for name in (
+        'Symbol', 'Company', 'Opening Price', 'High', 'Low', 'Closing Price', 'Volume', 'Change %'
+    ))
+    body = ''.join(
+        f'<tr><td><a href="/q/{i}">TICK{i}</a></td><td>Company {i} Plc</td><td>{i}.10</td>'
+        f'<td>{i}.50</td><td>{i}.00</td><td>₦{i:,}.25</td><td>{i * 1000:,}</td><td>{i % 7 - 3}.25%</td></tr>'
+        for i in range(rows)
+    )
+    return (
+        '<html><head><title>Price List</title></head><body><div class="content">'
+        f'<table class="price-list-table"><thead><tr>{header}</tr></thead><tbody>{body}</tbody></table>'
+        '</div></body></html>'
+    )
+
+def soup_extract(html, selector, columns):
+    """Extract rows the way the scrapers did before the table extractor."""
+    soup = BeautifulSoup(html, 'html.parser')
+    table = soup.select_one(selector)
+    if not table:
+        return None
+    
+    headers = [th.get_text(strip=True).lower() for th in table.select('thead th')]
+    col_map = map_columns(headers, columns)
+    
+    rows = []
+    for row in table.select('tbody tr'):
+        cells = row.select('td')
+        rows.append([
+            cells[i].get_text(strip=True) if i is not None and i < len(cells) else None
+            for i in col_map.values()
+        ])
+    return rows
+
+def lxml_extract(html, selector, columns):
+    """Extract rows with the lxml table extractor."""
+    return extract_table(parse_html(html), selector, columns, min_cells=0)
+
+def measure(func, html, selector, columns, repeat):
+    """Return (best time in seconds, peak traced memory in bytes, row count)."""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = func(html, selector, columns)
+        best = min(best, time.perf_counter() - started)
+    
+    tracemalloc.start()
+    func(html, selector, columns)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    return best, peak, len(rows or [])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('pages', nargs='*', help='Saved HTML fixture pages')
+    parser.add_argument('--selector', default='table.price-list-table', help='Table selector')
+    parser.add_argument('--rows', type=int, default=2000, help='Rows in the synthetic page')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing repetitions')
+    args = parser.parse_args()
+    
+    fixtures = []
+    for path in args.pages:
+        with open(path, encoding='utf-8') as f:
+            fixtures.append((os.path.basename(path), f.read()))
+    if not fixtures:
+        fixtures.append((f'synthetic ({args.rows} rows)', build_fixture_page(args.rows)))
+    
+    print(f"{'page':<32} {'engine':<14} {'rows':>6} {'time (ms)':>10} {'peak (KiB)':>11}")
+    for name, html in fixtures:
+        for engine, func in (('beautifulsoup', soup_extract), ('lxml', lxml_extract)):
+            seconds, peak, count = measure(func, html, args.selector, PRICE_COLUMNS, args.repeat)
+            print(f"{name:<32} {engine:<14} {count:>6} {seconds * 1000:>10.1f} {peak / 1024:>11.0f}")
+
+if __name__ == "__main__":
+    main()
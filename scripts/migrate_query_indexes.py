@@ -0,0 +1,45 @@
+"""
+Script to add the query indexes declared in models.py to an existing database.
+
+db.create_all() only creates indexes together with new tables, so databases
+created before the indexes were declared need this run once. Indexes that
+already exist are skipped, and the trigram indexes are only created on
+PostgreSQL, where the pg_trgm extension is enabled first.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app import app, db
+from models import APIToken, Stock, StockPrice
+
+# Indexes added for the hot API and ETL queries, by table
+QUERY_INDEXES = {
+    APIToken.__table__: ('ix_api_token_user_id',),
+    Stock.__table__: ('ix_stock_exchange_id', 'ix_stock_ticker_trgm', 'ix_stock_sector_trgm'),
+    StockPrice.__table__: ('ix_stock_price_date_change', 'ix_stock_price_date_volume')
+}
+
+def migrate_query_indexes():
+    """Create any missing query indexes."""
+    with app.app_context():
+        is_postgresql = db.engine.dialect.name == 'postgresql'
+        
+        with db.engine.begin() as connection:
+            if is_postgresql:
+                connection.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+            
+            for table, names in QUERY_INDEXES.items():
+                for index in table.indexes:
+                    if index.name not in names:
+                        continue
+                    if index.dialect_options['postgresql']['using'] == 'gin' and not is_postgresql:
+                        print(f"Skipping {index.name} (PostgreSQL only)")
+                        continue
+                    
+                    index.create(connection, checkfirst=True)
+                    print(f"Ensured index {index.name} on {table.name}")
+
+if __name__ == "__main__":
+    migrate_query_indexes()
@@ -0,0 +1,86 @@
+"""
+Script to convert the stock_price and index_value tables of an existing
+PostgreSQL database into tables range partitioned by date.
+
+db.create_all() creates new databases partitioned already. This script
+rebuilds each unpartitioned table in one transaction: the old table is
+renamed aside, the partitioned table is created from models.py with one
+partition per year of data, rows and the id sequence are carried over and
+the old table is dropped. Writers are blocked while it runs.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app import app, db
+from models import StockPrice, IndexValue
+from etl.partitions import create_year_partition, ensure_partitions, is_partitioned
+
+def partition_table(connection, table):
+    """
+    Rebuild one table as a partitioned table.
+    
+    Args:
+        connection: SQLAlchemy connection inside a transaction
+        table: SQLAlchemy Table of the history model
+    
+    Returns:
+        int: Number of rows copied
+    """
+    old_name = f'{table.name}_unpartitioned'
+    connection.execute(text(f'LOCK TABLE {table.name} IN ACCESS EXCLUSIVE MODE'))
+    connection.execute(text(f'ALTER TABLE {table.name} RENAME TO {old_name}'))
+    
+    # Free the index, constraint and sequence names for the new table
+    index_names = [row[0] for row in connection.execute(
+        text('SELECT indexname FROM pg_indexes WHERE tablename = :table_name'), {'table_name': old_name}
+    )]
+    for index_name in index_names:
+        connection.execute(text(f'ALTER INDEX {index_name} RENAME TO {index_name}_old'))
+    
+    sequence = connection.execute(
+        text("SELECT pg_get_serial_sequence(:table_name, 'id')"), {'table_name': old_name}
+    ).scalar()
+    if sequence:
+        connection.execute(text(f'ALTER SEQUENCE {sequence} RENAME TO {old_name}_id_seq'))
+    
+    table.create(connection)
+    
+    years = [row[0] for row in connection.execute(
+        text(f'SELECT DISTINCT CAST(EXTRACT(YEAR FROM date) AS INTEGER) FROM {old_name}')
+    )]
+    for year in sorted(years):
+        create_year_partition(connection, table.name, year)
+    
+    columns = ', '.join(column.name for column in table.columns)
+    copied = connection.execute(
+        text(f'INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {old_name}')
+    ).rowcount
+    connection.execute(text(
+        f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) "
+        f"FROM {table.name}"
+    ))
+    connection.execute(text(f'DROP TABLE {old_name}'))
+    return copied
+
+def partition_history_tables():
+    """Partition the history tables that are not partitioned yet."""
+    with app.app_context():
+        if db.engine.dialect.name != 'postgresql':
+            print("Table partitioning needs PostgreSQL")
+            return
+        
+        for table in (StockPrice.__table__, IndexValue.__table__):
+            with db.engine.begin() as connection:
+                if is_partitioned(connection, table.name):
+                    print(f"{table.name} is already partitioned")
+                    continue
+                copied = partition_table(connection, table)
+                print(f"Partitioned {table.name}: {copied} rows copied")
+        
+        created = ensure_partitions(db.session)
+        print(f"Created {created} partitions for upcoming years")
+
+if __name__ == "__main__":
+    partition_history_tables()
@@ -0,0 +1,24 @@
+"""
+Script to rebuild the memory-mapped price store from stock price history.
+
+Run once after setting PRICE_STORE_DIR; DataLoader keeps the store current
+from then on.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db
+from etl.price_store import price_store
+
+def rebuild_price_store():
+    """Rewrite the stored history of every stock with prices."""
+    with app.app_context():
+        if not price_store.enabled:
+            print("PRICE_STORE_DIR is not set")
+            return
+        count = price_store.refresh(db.session)
+        print(f"Wrote price histories for {count} stocks to {price_store.directory}")
+
+if __name__ == "__main__":
+    rebuild_price_store()
@@ -0,0 +1,24 @@
+"""
+Script to rebuild the daily_exchange_stats rollup from stock price history.
+
+Run once after upgrading an existing database; DataLoader keeps the rollup
+current for the dates touched by each price load from then on.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db
+from models import Exchange
+from etl.loader import DataLoader
+
+def refresh_daily_exchange_stats():
+    """Recompute the daily stats of every exchange for every date with prices."""
+    with app.app_context():
+        loader = DataLoader(db.session)
+        for exchange in Exchange.query.all():
+            count = loader.refresh_daily_exchange_stats(exchange.id)
+            print(f"Refreshed daily stats for {exchange.code} on {count} dates")
+
+if __name__ == "__main__":
+    refresh_daily_exchange_stats()
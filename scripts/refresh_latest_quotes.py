@@ -0,0 +1,21 @@
+"""
+Script to rebuild the latest_quote table from stock price history.
+
+Run once after upgrading an existing database; DataLoader keeps the table
+current from then on.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db
+from etl.loader import DataLoader
+
+def refresh_latest_quotes():
+    """Recompute the latest quote of every stock with prices."""
+    with app.app_context():
+        count = DataLoader(db.session).refresh_latest_quotes()
+        print(f"Refreshed latest quotes for {count} stocks")
+
+if __name__ == "__main__":
+    refresh_latest_quotes()
@@ -64,9 +64,8 @@ function fetchDashboardData() {
  * Fetch top market movers (gainers or losers)
  */
 function fetchTopMovers(type, exchange = 'all') {
-    const endpoint = type === 'gainers' 
-        ? `/api/v1/stocks?sort=change_desc&limit=5${exchange !== 'all' ? `&exchange=${exchange}` : ''}`
-        : `/api/v1/stocks?sort=change_asc&limit=5${exchange !== 'all' ? `&exchange=${exchange}` : ''}`;
+    const endpoint = `/api/v1/movers?limit=5${exchange !== 'all' ? `&exchange=${exchange}` : ''}`;
+    const tableId = type === 'gainers' ? 'top-gainers-table' : 'top-losers-table';
     
     fetch(endpoint, {
         headers: {'X-API-Token': getApiToken()}
@@ -76,17 +75,24 @@ function fetchTopMovers(type, exchange = 'all') {
         return response.json();
     })
     .then(data => {
+        // Combine the per-exchange lists and keep the overall top 5
+        const stocks = Object.values(data.exchanges || {})
+            .flatMap(movers => movers[type] || [])
+            .sort((a, b) => type === 'gainers'
+                ? b.change_percent - a.change_percent
+                : a.change_percent - b.change_percent)
+            .slice(0, 5);
+        
         // Update table with the stock data
-        const tableId = type === 'gainers' ? 'top-gainers-table' : 'top-losers-table';
         const table = document.getElementById(tableId);
         
-        if (!data || data.length === 0) {
+        if (stocks.length === 0) {
             table.innerHTML = `<tr><td colspan="4" class="text-center py-3">No data available</td></tr>`;
             return;
         }
         
         let html = '';
-        data.forEach(stock => {
+        stocks.forEach(stock => {
             const changeClass = stock.change_percent > 0 ? 'text-success' : 'text-danger';
             const changeSign = stock.change_percent > 0 ? '+' : '';
             
@@ -94,7 +100,7 @@ function fetchTopMovers(type, exchange = 'all') {
                 <tr>
                     <td><a href="/stock/${stock.ticker}">${stock.ticker}</a></td>
                     <td>${stock.exchange}</td>
-                    <td>${stock.last_price || 'N/A'} ${stock.currency || ''}</td>
+                    <td>${stock.close_price || 'N/A'} ${stock.currency || ''}</td>
                     <td class="${changeClass}">${changeSign}${stock.change_percent || 0}%</td>
                 </tr>
             `;
@@ -104,7 +110,6 @@ function fetchTopMovers(type, exchange = 'all') {
     })
     .catch(error => {
         console.error(`Error fetching top ${type}:`, error);
-        const tableId = type === 'gainers' ? 'top-gainers-table' : 'top-losers-table';
         document.getElementById(tableId).innerHTML = 
             `<tr><td colspan="4" class="text-center py-3">Error loading data</td></tr>`;
     });
@@ -12,71 +12,94 @@ document.addEventListener('DOMContentLoaded', function() {
  */
 function fetchLatestPrices() {
     const priceElements = document.querySelectorAll('.stock-price');
-    const changeElements = document.querySelectorAll('.stock-change');
     
-    // Group by exchange to minimize API calls
-    const stocksByExchange = {};
+    // Collect every stock in the table so prices can be fetched in batches
+    const stocks = [];
     
     priceElements.forEach(element => {
-        const ticker = element.getAttribute('data-ticker');
-        const exchange = element.getAttribute('data-exchange');
-        
-        if (!stocksByExchange[exchange]) {
-            stocksByExchange[exchange] = [];
-        }
-        
-        stocksByExchange[exchange].push(ticker);
+        stocks.push({
+            exchange: element.getAttribute('data-exchange'),
+            ticker: element.getAttribute('data-ticker')
+        });
     });
     
-    // Fetch prices for each exchange
-    for (const [exchange, tickers] of Object.entries(stocksByExchange)) {
-        tickers.forEach(ticker => {
-            fetch(`/api/v1/stocks/${exchange}/${ticker}/prices?limit=1`, {
-                headers: {'X-API-Token': getApiToken()}
-            })
-            .then(response => {
-                if (!response.ok) throw new Error('Network response was not ok');
-                return response.json();
-            })
-            .then(data => {
-                if (data && data.prices && data.prices.length > 0) {
-                    const price = data.prices[0];
-                    const currency = data.stock.currency || '';
-                    
-                    // Update price cells
-                    const priceElement = document.querySelector(`.stock-price[data-ticker="${ticker}"][data-exchange="${exchange}"]`);
-                    if (priceElement) {
-                        priceElement.textContent = `${price.close_price} ${currency}`;
-                    }
-                    
-                    // Update change cells
-                    const changeElement = document.querySelector(`.stock-change[data-ticker="${ticker}"][data-exchange="${exchange}"]`);
-                    if (changeElement) {
-                        const changePercent = price.change_percent;
-                        const changeClass = changePercent > 0 ? 'text-success' : (changePercent < 0 ? 'text-danger' : '');
-                        const changeSign = changePercent > 0 ? '+' : '';
-                        
-                        changeElement.textContent = `${changeSign}${changePercent}%`;
-                        changeElement.className = `stock-change ${changeClass}`;
-                    }
-                }
-            })
-            .catch(error => {
-                console.error(`Error fetching price for ${ticker} (${exchange}):`, error);
-                const priceElement = document.querySelector(`.stock-price[data-ticker="${ticker}"][data-exchange="${exchange}"]`);
-                if (priceElement) {
-                    priceElement.textContent = 'N/A';
+    // Fetch the latest price of up to BATCH_SIZE stocks per request
+    const BATCH_SIZE = 200;
+    
+    for (let i = 0; i < stocks.length; i += BATCH_SIZE) {
+        const batch = stocks.slice(i, i + BATCH_SIZE);
+        
+        fetch('/api/v1/stocks/prices', {
+            method: 'POST',
+            headers: {
+                'X-API-Token': getApiToken(),
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({stocks: batch, limit: 1})
+        })
+        .then(response => {
+            if (!response.ok) throw new Error('Network response was not ok');
+            return response.json();
+        })
+        .then(data => {
+            const updated = new Set();
+            
+            (data.series || []).forEach(series => {
+                if (series.prices.length > 0) {
+                    updateStockPrice(series.stock.exchange, series.stock.ticker, series.prices[0], series.stock.currency);
+                    updated.add(`${series.stock.exchange}:${series.stock.ticker}`);
                 }
-                
-                const changeElement = document.querySelector(`.stock-change[data-ticker="${ticker}"][data-exchange="${exchange}"]`);
-                if (changeElement) {
-                    changeElement.textContent = '-';
+            });
+            
+            // Replace the loading text of stocks that have no prices yet
+            batch.forEach(stock => {
+                if (!updated.has(`${stock.exchange}:${stock.ticker}`)) {
+                    markPriceUnavailable(stock.exchange, stock.ticker, '-');
                 }
             });
+        })
+        .catch(error => {
+            console.error('Error fetching latest prices:', error);
+            batch.forEach(stock => markPriceUnavailable(stock.exchange, stock.ticker, 'N/A'));
         });
     }
 }
 
+/**
+ * Update the price and change cells of a stock row
+ */
+function updateStockPrice(exchange, ticker, price, currency) {
+    const priceElement = document.querySelector(`.stock-price[data-ticker="${ticker}"][data-exchange="${exchange}"]`);
+    if (priceElement) {
+        priceElement.textContent = `${price.close_price} ${currency || ''}`;
+    }
+    
+    const changeElement = document.querySelector(`.stock-change[data-ticker="${ticker}"][data-exchange="${exchange}"]`);
+    if (changeElement) {
+        const changePercent = price.change_percent;
+        const changeClass = changePercent > 0 ? 'text-success' : (changePercent < 0 ? 'text-danger' : '');
+        const changeSign = changePercent > 0 ? '+' : '';
+        
+        changeElement.textContent = `${changeSign}${changePercent}%`;
+        changeElement.className = `stock-change ${changeClass}`;
+    }
+}
+
+/**
+ * Show a placeholder for a stock whose price could not be loaded
+ */
+function markPriceUnavailable(exchange, ticker, placeholder) {
+    const priceElement = document.querySelector(`.stock-price[data-ticker="${ticker}"][data-exchange="${exchange}"]`);
+    if (priceElement) {
+        priceElement.textContent = placeholder;
+    }
+    
+    const changeElement = document.querySelector(`.stock-change[data-ticker="${ticker}"][data-exchange="${exchange}"]`);
+    if (changeElement) {
+        changeElement.textContent = '-';
+    }
+}
+
 /**
  * Setup search and filter functionality
  */
@@ -0,0 +1,195 @@
+import logging
+from sqlalchemy import func, and_, or_
+from models import Stock, StockPrice
+
+logger = logging.getLogger(__name__)
+
+# Mover lists returned for each exchange
+MOVER_TYPES = ('gainers', 'losers', 'most_active')
+
+def get_top_movers(db_session, date, exchange_ids=None, limit=5):
+    """
+    Get the top gainers, losers and most active stocks per exchange for a date.
+    
+    All three rankings for every exchange come from one query: each price row
+    is ranked within its exchange by change (both directions) and by volume,
+    and only rows inside one of the top `limit` positions are returned.
+    
+    Args:
+        db_session: SQLAlchemy database session
+        date (date): Trading date
+        exchange_ids (list, optional): Restrict to these exchanges
+        limit (int): Number of stocks in each list
+    
+    Returns:
+        dict: Exchange ID -> {'gainers', 'losers', 'most_active'} lists of
+            (Stock, StockPrice) tuples, best first
+    """
+    return get_top_movers_by_date(db_session, date, date, exchange_ids, limit).get(date, {})
+
+def get_top_movers_by_date(db_session, start_date=None, end_date=None, exchange_ids=None, limit=5):
+    """
+    Get the top movers per exchange for every trading date in a range.
+    
+    Like get_top_movers, but price rows are ranked within their exchange and
+    date, so one query covers the whole range.
+    
+    Args:
+        db_session: SQLAlchemy database session
+        start_date (date, optional): First trading date, unbounded if None
+        end_date (date, optional): Last trading date, unbounded if None
+        exchange_ids (list, optional): Restrict to these exchanges
+        limit (int): Number of stocks in each list
+    
+    Returns:
+        dict: Date -> exchange ID -> {'gainers', 'losers', 'most_active'} lists of
+            (Stock, StockPrice) tuples, best first
+    """
+    partition_by = (Stock.exchange_id, StockPrice.date)
+    ranks = {
+        'gainers': func.row_number().over(
+            partition_by=partition_by,
+            order_by=(StockPrice.change_percent.desc().nulls_last(), Stock.ticker)
+        ),
+        'losers': func.row_number().over(
+            partition_by=partition_by,
+            order_by=(StockPrice.change_percent.asc().nulls_last(), Stock.ticker)
+        ),
+        'most_active': func.row_number().over(
+            partition_by=partition_by,
+            order_by=(StockPrice.volume.desc().nulls_last(), Stock.ticker)
+        )
+    }
+    
+    ranked = (
+        db_session.query(StockPrice.id.label('price_id'), *[rank.label(name) for name, rank in ranks.items()])
+        .join(Stock, Stock.id == StockPrice.stock_id)
+    )
+    if start_date is not None:
+        ranked = ranked.filter(StockPrice.date >= start_date)
+    if end_date is not None:
+        ranked = ranked.filter(StockPrice.date <= end_date)
+    if exchange_ids is not None:
+        ranked = ranked.filter(Stock.exchange_id.in_(exchange_ids))
+    ranked = ranked.subquery()
+    
+    rows = (
+        db_session.query(Stock, StockPrice, ranked.c.gainers, ranked.c.losers, ranked.c.most_active)
+        .join(StockPrice, StockPrice.stock_id == Stock.id)
+        .join(ranked, ranked.c.price_id == StockPrice.id)
+        .filter(or_(
+            and_(ranked.c.gainers <= limit, StockPrice.change_percent > 0),
+            and_(ranked.c.losers <= limit, StockPrice.change_percent < 0),
+            and_(ranked.c.most_active <= limit, StockPrice.volume > 0)
+        ))
+        .all()
+    )
+    
+    # Bucket the rows into each date and exchange's lists, ordered by rank
+    ranked_lists = {}
+    for stock, price, gainer_rank, loser_rank, active_rank in rows:
+        movers = ranked_lists.setdefault((price.date, stock.exchange_id), {mover_type: [] for mover_type in MOVER_TYPES})
+        
+        if gainer_rank <= limit and price.change_percent is not None and price.change_percent > 0:
+            movers['gainers'].append((gainer_rank, stock, price))
+        if loser_rank <= limit and price.change_percent is not None and price.change_percent < 0:
+            movers['losers'].append((loser_rank, stock, price))
+        if active_rank <= limit and price.volume is not None and price.volume > 0:
+            movers['most_active'].append((active_rank, stock, price))
+    
+    top_movers = {}
+    for (date, exchange_id), movers in ranked_lists.items():
+        top_movers.setdefault(date, {})[exchange_id] = {
+            mover_type: [(stock, price) for _, stock, price in sorted(entries, key=lambda entry: entry[0])]
+            for mover_type, entries in movers.items()
+        }
+    
+    logger.debug(f"Computed top movers for {len(ranked_lists)} exchange trading days")
+    return top_movers
+
+def mover_entry(stock, price):
+    """
+    Describe a top mover as a plain dictionary, as the movers readers return it.
+    
+    Args:
+        stock: Stock instance
+        price: StockPrice instance for the trading date
+        
+    Returns:
+        dict: Ticker, name, currency and the day's price figures
+    """
+    return {
+        'ticker': stock.ticker,
+        'name': stock.name,
+        'currency': stock.currency,
+        'close_price': price.close_price,
+        'change_percent': price.change_percent,
+        'volume': price.volume
+    }
+
+def stored_mover_entry(stock, price):
+    """
+    Describe a top mover for daily_exchange_stats.
+    
+    The stock is stored by ID so renames show up when the entry is read back
+    through expand_mover_entries.
+    
+    Args:
+        stock: Stock instance
+        price: StockPrice instance for the trading date
+        
+    Returns:
+        dict: Stock ID and the day's price figures
+    """
+    return {
+        'stock_id': stock.id,
+        'close_price': price.close_price,
+        'change_percent': price.change_percent,
+        'volume': price.volume
+    }
+
+def expand_mover_entries(db_session, top_movers_list):
+    """
+    Add the current ticker, name and currency to stored top mover entries.
+    
+    Args:
+        db_session: SQLAlchemy database session
+        top_movers_list (list): Stored top_movers values of daily_exchange_stats rows
+        
+    Returns:
+        list: Matching {'gainers', 'losers', 'most_active'} dicts with entries
+            shaped like mover_entry; entries of deleted stocks are dropped
+    """
+    stock_ids = {
+        entry['stock_id']
+        for top_movers in top_movers_list
+        for entries in (top_movers or {}).values()
+        for entry in entries
+    }
+    stocks = {
+        stock.id: stock
+        for stock in db_session.query(Stock.id, Stock.ticker, Stock.name, Stock.currency).filter(Stock.id.in_(stock_ids))
+    } if stock_ids else {}
+    
+    expanded = []
+    for top_movers in top_movers_list:
+        lists = {}
+        for mover_type, entries in (top_movers or {}).items():
+            expanded_entries = (_expand_entry(entry, stocks) for entry in entries)
+            lists[mover_type] = [entry for entry in expanded_entries if entry is not None]
+        expanded.append(lists)
+    return expanded
+
+def _expand_entry(entry, stocks):
+    """Expand one stored entry, or None if its stock no longer exists."""
+    stock = stocks.get(entry['stock_id'])
+    if stock is None:
+        return None
+    return {
+        'ticker': stock.ticker,
+        'name': stock.name,
+        'currency': stock.currency,
+        'close_price': entry['close_price'],
+        'change_percent': entry['change_percent'],
+        'volume': entry['volume']
+    }
@@ -1,10 +1,67 @@
 import logging
 from datetime import datetime, timedelta
 from sqlalchemy import func, desc
-from models import MarketSummary, Exchange, Stock, StockPrice, Index, IndexValue
+from models import MarketSummary, Exchange, Stock, StockPrice, Index, IndexValue, DailyExchangeStats
+from tasks.market_movers import get_top_movers, mover_entry, expand_mover_entries
+from etl.data_version import bump_data_version
 
 logger = logging.getLogger(__name__)
 
+def get_latest_index_values(db_session):
+    """
+    Get the most recent value of every index in one query.
+    
+    Args:
+        db_session: SQLAlchemy database session
+        
+    Returns:
+        dict: Index ID -> latest IndexValue
+    """
+    ranked = db_session.query(
+        IndexValue.id,
+        func.row_number().over(partition_by=IndexValue.index_id, order_by=desc(IndexValue.date)).label('rank')
+    ).subquery()
+    
+    latest = (
+        db_session.query(IndexValue)
+        .join(ranked, ranked.c.id == IndexValue.id)
+        .filter(ranked.c.rank == 1)
+        .all()
+    )
+    return {value.index_id: value for value in latest}
+
+def get_daily_movers(db_session, date, limit=5):
+    """
+    Get every exchange's top movers for a date from daily_exchange_stats.
+    
+    Exchanges without a stats row for the date (e.g. prices loaded before the
+    table existed) are ranked from their price rows instead.
+    
+    Args:
+        db_session: SQLAlchemy database session
+        date (date): Trading date
+        limit (int): Number of stocks in each list
+        
+    Returns:
+        dict: Exchange ID -> {'gainers', 'losers', 'most_active'} lists of mover entries
+    """
+    stats_rows = db_session.query(DailyExchangeStats).filter_by(date=date).all()
+    stored_movers = expand_mover_entries(db_session, [stats.top_movers for stats in stats_rows])
+    movers = {
+        stats.exchange_id: {mover_type: entries[:limit] for mover_type, entries in top_movers.items()}
+        for stats, top_movers in zip(stats_rows, stored_movers)
+    }
+    
+    missing = [exchange_id for (exchange_id,) in db_session.query(Exchange.id).all() if exchange_id not in movers]
+    if missing:
+        for exchange_id, ranked in get_top_movers(db_session, date, missing, limit).items():
+            movers[exchange_id] = {
+                mover_type: [mover_entry(stock, price) for stock, price in entries]
+                for mover_type, entries in ranked.items()
+            }
+    
+    return movers
+
 def generate_market_summary(db_session):
     """
     Generate a daily market summary.
@@ -45,6 +102,15 @@ def generate_market_summary(db_session):
         # Get exchanges
         exchanges = db_session.query(Exchange).all()
         
+        # Read each exchange's precomputed top movers for today
+        top_movers = get_daily_movers(db_session, today, limit=5)
+        
+        # Get every index with its latest value in two queries
+        indices_by_exchange = {}
+        for index in db_session.query(Index).order_by(Index.id).all():
+            indices_by_exchange.setdefault(index.exchange_id, []).append(index)
+        latest_values = get_latest_index_values(db_session)
+        
         for exchange in exchanges:
             exchange_content = []
             
@@ -52,13 +118,13 @@ def generate_market_summary(db_session):
             exchange_content.append(f"## {exchange.name} ({exchange.code})")
             
             # Get index performance
-            indices = db_session.query(Index).filter_by(exchange_id=exchange.id).all()
+            indices = indices_by_exchange.get(exchange.id, [])
             if indices:
                 exchange_content.append("\n### Key Indices")
                 index_details = []
                 
                 for index in indices:
-                    latest_value = db_session.query(IndexValue).filter_by(index_id=index.id).order_by(desc(IndexValue.date)).first()
+                    latest_value = latest_values.get(index.id)
                     if latest_value:
                         change_text = ""
                         if latest_value.change_percent is not None:
@@ -76,82 +142,59 @@ def generate_market_summary(db_session):
                 exchange_content.extend(index_details)
             
             # Get top gainers for this exchange
-            top_gainers = (
-                db_session.query(Stock, StockPrice)
-                .join(StockPrice, Stock.id == StockPrice.stock_id)
-                .filter(Stock.exchange_id == exchange.id, StockPrice.date == today)
-                .filter(StockPrice.change_percent > 0)
-                .order_by(desc(StockPrice.change_percent))
-                .limit(5)
-                .all()
-            )
+            exchange_movers = top_movers.get(exchange.id, {})
+            top_gainers = exchange_movers.get('gainers', [])
             
             if top_gainers:
                 exchange_content.append("\n### Top Gainers")
                 gainers_details = []
                 
-                for stock, price in top_gainers:
+                for mover in top_gainers:
                     gainers_details.append(
-                        f"- **{stock.ticker}** ({stock.name}): {price.close_price:.2f} {exchange.currency} "
-                        f"↑ {price.change_percent:.2f}%"
+                        f"- **{mover['ticker']}** ({mover['name']}): {mover['close_price']:.2f} {exchange.currency} "
+                        f"↑ {mover['change_percent']:.2f}%"
                     )
                     
                     # Add significant gainers to highlights
-                    if price.change_percent > 5:
+                    if mover['change_percent'] > 5:
                         highlights.append(
-                            f"{stock.ticker} ({exchange.code}) gained {price.change_percent:.2f}%"
+                            f"{mover['ticker']} ({exchange.code}) gained {mover['change_percent']:.2f}%"
                         )
                 
                 exchange_content.extend(gainers_details)
             
             # Get top losers for this exchange
-            top_losers = (
-                db_session.query(Stock, StockPrice)
-                .join(StockPrice, Stock.id == StockPrice.stock_id)
-                .filter(Stock.exchange_id == exchange.id, StockPrice.date == today)
-                .filter(StockPrice.change_percent < 0)
-                .order_by(StockPrice.change_percent)
-                .limit(5)
-                .all()
-            )
+            top_losers = exchange_movers.get('losers', [])
             
             if top_losers:
                 exchange_content.append("\n### Top Losers")
                 losers_details = []
                 
-                for stock, price in top_losers:
+                for mover in top_losers:
                     losers_details.append(
-                        f"- **{stock.ticker}** ({stock.name}): {price.close_price:.2f} {exchange.currency} "
-                        f"↓ {abs(price.change_percent):.2f}%"
+                        f"- **{mover['ticker']}** ({mover['name']}): {mover['close_price']:.2f} {exchange.currency} "
+                        f"↓ {abs(mover['change_percent']):.2f}%"
                     )
                     
                     # Add significant losers to highlights
-                    if price.change_percent < -5:
+                    if mover['change_percent'] < -5:
                         highlights.append(
-                            f"{stock.ticker} ({exchange.code}) lost {abs(price.change_percent):.2f}%"
+                            f"{mover['ticker']} ({exchange.code}) lost {abs(mover['change_percent']):.2f}%"
                         )
                 
                 exchange_content.extend(losers_details)
             
             # Get most active stocks by volume
-            most_active = (
-                db_session.query(Stock, StockPrice)
-                .join(StockPrice, Stock.id == StockPrice.stock_id)
-                .filter(Stock.exchange_id == exchange.id, StockPrice.date == today)
-                .filter(StockPrice.volume > 0)
-                .order_by(desc(StockPrice.volume))
-                .limit(5)
-                .all()
-            )
+            most_active = exchange_movers.get('most_active', [])
             
             if most_active:
                 exchange_content.append("\n### Most Active")
                 active_details = []
                 
-                for stock, price in most_active:
+                for mover in most_active:
                     active_details.append(
-                        f"- **{stock.ticker}** ({stock.name}): {price.volume:,} shares, "
-                        f"{price.close_price:.2f} {exchange.currency}"
+                        f"- **{mover['ticker']}** ({mover['name']}): {mover['volume']:,} shares, "
+                        f"{mover['close_price']:.2f} {exchange.currency}"
                     )
                 
                 exchange_content.extend(active_details)
@@ -169,6 +212,9 @@ def generate_market_summary(db_session):
         db_session.commit()
         logger.info(f"Market summary for {today} generated successfully")
         
+        # Invalidate cached API responses that include summaries
+        bump_data_version(db_session)
+        
         return summary
         
     except Exception as e:
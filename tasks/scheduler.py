@@ -4,6 +4,7 @@ from datetime import datetime
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from flask import current_app
+from config import Config
 
 logger = logging.getLogger(__name__)
 
@@ -15,38 +16,23 @@ def setup_data_collection_tasks():
     from app import app, db
     from etl.processor import ETLProcessor
     from tasks.market_summary import generate_market_summary
+    from api.auth import TokenAuth
+    from etl.partitions import ensure_partitions
     
     with app.app_context():
-        # Setup ETL processor task for each exchange
-        def collect_jse_data():
-            """Task to collect JSE data."""
+        def collect_exchange_data():
+            """Task to collect data for every exchange."""
             try:
-                logger.info("Starting JSE data collection task")
-                processor = ETLProcessor(db.session)
-                results = processor.process_exchange_data('JSE')
-                logger.info(f"JSE data collection completed: {results['stocks_processed']} stocks, {results['prices_processed']} prices")
+                logger.info("Starting exchange data collection task")
+                with app.app_context():
+                    # SQLite allows a single writer, so exchanges are loaded one at a time there
+                    max_workers = 1 if db.engine.dialect.name == 'sqlite' else None
+                    processor = ETLProcessor(db.session)
+                    results = processor.process_all_exchanges(max_workers=max_workers)
+                for exchange_code, result in results.items():
+                    logger.info(f"{exchange_code} data collection completed: {result['stocks_processed']} stocks, {result['prices_processed']} prices")
             except Exception as e:
-                logger.error(f"Error in JSE data collection task: {str(e)}")
-        
-        def collect_ngx_data():
-            """Task to collect NGX data."""
-            try:
-                logger.info("Starting NGX data collection task")
-                processor = ETLProcessor(db.session)
-                results = processor.process_exchange_data('NGX')
-                logger.info(f"NGX data collection completed: {results['stocks_processed']} stocks, {results['prices_processed']} prices")
-            except Exception as e:
-                logger.error(f"Error in NGX data collection task: {str(e)}")
-        
-        def collect_brvm_data():
-            """Task to collect BRVM data."""
-            try:
-                logger.info("Starting BRVM data collection task")
-                processor = ETLProcessor(db.session)
-                results = processor.process_exchange_data('BRVM')
-                logger.info(f"BRVM data collection completed: {results['stocks_processed']} stocks, {results['prices_processed']} prices")
-            except Exception as e:
-                logger.error(f"Error in BRVM data collection task: {str(e)}")
+                logger.error(f"Error in exchange data collection task: {str(e)}")
         
         def generate_daily_market_summary():
             """Task to generate daily market summary."""
@@ -57,36 +43,56 @@ def setup_data_collection_tasks():
             except Exception as e:
                 logger.error(f"Error in daily market summary generation: {str(e)}")
         
+        def purge_expired_tokens():
+            """Task to remove expired API tokens."""
+            try:
+                with app.app_context():
+                    purged = TokenAuth(db.session).purge_expired_tokens()
+                    logger.info(f"Expired token sweep completed: {purged} tokens removed")
+            except Exception as e:
+                logger.error(f"Error in expired token sweep: {str(e)}")
+        
+        def create_history_partitions():
+            """Task to create upcoming stock price and index value partitions."""
+            try:
+                with app.app_context():
+                    created = ensure_partitions(db.session)
+                    logger.info(f"History partition check completed: {created} partitions created")
+            except Exception as e:
+                logger.error(f"Error in history partition check: {str(e)}")
+        
         # Schedule tasks - run at different times to avoid overloading resources
-        # JSE data - Run every weekday at 16:30 (after close)
+        # Exchange data - Run every weekday at 17:30 (after the last close), exchanges in parallel
         scheduler.add_job(
-            collect_jse_data,
-            CronTrigger(day_of_week='mon-fri', hour=16, minute=30),
-            id='collect_jse_data',
+            collect_exchange_data,
+            CronTrigger(day_of_week='mon-fri', hour=17, minute=30),
+            id='collect_exchange_data',
             replace_existing=True
         )
         
-        # NGX data - Run every weekday at 17:00 (after close)
+        # Market summary - Run every weekday at 18:00 (after all data collection)
         scheduler.add_job(
-            collect_ngx_data,
-            CronTrigger(day_of_week='mon-fri', hour=17, minute=0),
-            id='collect_ngx_data',
+            generate_daily_market_summary,
+            CronTrigger(day_of_week='mon-fri', hour=18, minute=0),
+            id='generate_market_summary',
             replace_existing=True
         )
         
-        # BRVM data - Run every weekday at 17:30 (after close)
+        # Expired API tokens - swept in the background so token validation stays read-only
         scheduler.add_job(
-            collect_brvm_data,
-            CronTrigger(day_of_week='mon-fri', hour=17, minute=30),
-            id='collect_brvm_data',
+            purge_expired_tokens,
+            'interval',
+            minutes=Config.API_TOKEN_PURGE_INTERVAL,
+            id='purge_expired_tokens',
             replace_existing=True
         )
         
-        # Market summary - Run every weekday at 18:00 (after all data collection)
+        # History partitions - checked at startup and daily, well before a new year's data arrives
         scheduler.add_job(
-            generate_daily_market_summary,
-            CronTrigger(day_of_week='mon-fri', hour=18, minute=0),
-            id='generate_market_summary',
+            create_history_partitions,
+            CronTrigger(hour=1, minute=0),
+            id='create_history_partitions',
+            next_run_time=datetime.now(),
             replace_existing=True
         )
         
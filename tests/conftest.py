@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Configure the test database before the app is imported: in-memory SQLite
+# unless TEST_DATABASE_URL points at a disposable database such as PostgreSQL
+os.environ['DATABASE_URL'] = os.environ.get('TEST_DATABASE_URL', 'sqlite://')
+
+import pytest
+from sqlalchemy import event
+from app import app as flask_app, db
+from api.routes import register_api_routes
+from api.auth import TokenAuth, token_cache
+from api.cache import endpoint_cache
+from etl import data_version
+from models import User
+
+register_api_routes(flask_app)
+
+def reset_app_state():
+    """Recreate empty tables and clear the process-wide caches, inside an app context."""
+    db.drop_all()
+    db.create_all()
+    token_cache.clear()
+    endpoint_cache.clear()
+    data_version._current.update(version=None, checked_at=0.0)
+
+@pytest.fixture
+def app():
+    """Flask app with empty tables and cleared process-wide caches."""
+    with flask_app.app_context():
+        reset_app_state()
+        yield flask_app
+        db.session.remove()
+
+@pytest.fixture
+def client(app):
+    """Test client for the app."""
+    return app.test_client()
+
+@pytest.fixture
+def api_headers(app):
+    """Request headers carrying a valid API token."""
+    user = User(username='tester', email='tester@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    return {'X-API-Token': TokenAuth().generate_token(user)}
+
+class QueryCounter:
+    """Counts the SQL statements executed on an engine."""
+    
+    def __init__(self):
+        self.statements = []
+        self.parameters = []
+    
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        self.parameters.append(parameters)
+    
+    @property
+    def count(self):
+        return len(self.statements)
+    
+    def reset(self):
+        self.statements.clear()
+        self.parameters.clear()
+
+@pytest.fixture
+def query_counter(app):
+    """Record every statement executed while the test runs."""
+    counter = QueryCounter()
+    event.listen(db.engine, 'before_cursor_execute', counter)
+    yield counter
+    event.remove(db.engine, 'before_cursor_execute', counter)
+
+class PageServer:
+    """Local HTTP server standing in for the exchange websites."""
+    
+    def __init__(self):
+        self.pages = {}
+        self.etags = {}  # ETag by path; a matching If-None-Match is answered with 304
+        self.delay = 0.0
+        self.requests = []  # (path, start, end) of each request, in monotonic seconds
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self.base_url = f'http://127.0.0.1:{self._server.server_port}'
+    
+    def url(self, path):
+        return self.base_url + path
+    
+    def _handler(self):
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def do_GET(self):
+                started = time.monotonic()
+                time.sleep(server.delay)
+                body = server.pages.get(self.path)
+                etag = server.etags.get(self.path)
+                if etag is not None and self.headers.get('If-None-Match') == etag:
+                    body, status = '', 304
+                else:
+                    status = 200 if body is not None else 404
+                data = (body or '').encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                if etag is not None:
+                    self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                with server._lock:
+                    server.requests.append((self.path, started, time.monotonic()))
+            
+            def log_message(self, format, *args):
+                pass
+        
+        return Handler
+    
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+    
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+@pytest.fixture
+def page_server():
+    """Running local page server."""
+    server = PageServer()
+    server.start()
+    yield server
+    server.stop()
@@ -0,0 +1,59 @@
+"""Query counts of the API list endpoints must not grow with the result size."""
+from datetime import date, timedelta
+import pytest
+from sqlalchemy import insert
+from app import db
+from models import Exchange, Stock, StockPrice, Index, IndexValue
+
+def seed_market(stock_count, price_days=5):
+    """Create two exchanges with stock_count stocks and indices each, with prices and values."""
+    for code in ('JSE', 'NGX'):
+        exchange = Exchange(code=code, name=f'{code} Exchange', country='ZA', currency='ZAR')
+        db.session.add(exchange)
+        db.session.flush()
+        
+        stocks = [
+            Stock(ticker=f'{code}{number:03d}', name=f'Stock {number}', sector='Banks', exchange_id=exchange.id)
+            for number in range(stock_count)
+        ]
+        indices = [
+            Index(code=f'{code}I{number:03d}', name=f'Index {number}', exchange_id=exchange.id)
+            for number in range(stock_count)
+        ]
+        db.session.add_all(stocks + indices)
+        db.session.flush()
+        
+        db.session.execute(insert(StockPrice), [
+            {'stock_id': stock.id, 'date': date(2024, 1, 1) + timedelta(days=day), 'close_price': 10.0 + day}
+            for stock in stocks for day in range(price_days)
+        ])
+        db.session.execute(insert(IndexValue), [
+            {'index_id': index.id, 'date': date(2024, 1, 1) + timedelta(days=day), 'value': 100.0 + day}
+            for index in indices for day in range(price_days)
+        ])
+    db.session.commit()
+
+def count_queries(client, query_counter, headers, url):
+    """Count the queries of one request, after a first request has cached the token."""
+    client.get('/api/v1/exchanges', headers=headers)
+    query_counter.reset()
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    return query_counter.count
+
+# Queries each endpoint may run, whatever the number of rows returned
+EXPECTED_QUERIES = {
+    '/api/v1/stocks?limit=1000': 1,
+    '/api/v1/stocks?exchange=JSE&limit=1000': 2,
+    '/api/v1/exchanges/JSE/stocks': 2,
+    '/api/v1/stocks/JSE/JSE000/prices?limit=1000': 3,
+    '/api/v1/indices/JSE/JSEI000/values?limit=1000': 3,
+    '/api/v1/indices?limit=1000': 1,
+}
+
+@pytest.mark.parametrize('url', sorted(EXPECTED_QUERIES))
+@pytest.mark.parametrize('stock_count,price_days', [(3, 2), (40, 30)])
+def test_list_endpoint_query_count_is_constant(app, client, api_headers, query_counter, url, stock_count, price_days):
+    seed_market(stock_count, price_days)
+    
+    assert count_queries(client, query_counter, api_headers, url) == EXPECTED_QUERIES[url], query_counter.statements
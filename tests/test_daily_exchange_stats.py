@@ -0,0 +1,84 @@
+from datetime import date, timedelta
+from sqlalchemy import update
+from app import db
+from etl.loader import DataLoader
+from models import DailyExchangeStats, Exchange, Stock
+
+FIRST_DATE = date(2015, 1, 1)
+
+def seed_stocks(count):
+    exchange = Exchange(code='JSE', name='JSE Exchange', country='ZA', currency='ZAR')
+    db.session.add(exchange)
+    db.session.flush()
+    db.session.add_all(
+        Stock(ticker=f'S{number}', name=f'Stock {number}', currency='ZAR', exchange_id=exchange.id)
+        for number in range(count)
+    )
+    db.session.commit()
+    return exchange
+
+def prices(tickers, days):
+    return [
+        {'ticker': ticker, 'date': (FIRST_DATE + timedelta(days=day)).isoformat(),
+         'close_price': 10.0 + number, 'volume': 100 * (number + 1), 'change_percent': number - 1.0}
+        for day in range(days) for number, ticker in enumerate(tickers)
+    ]
+
+def test_backfill_ranks_movers_in_one_query_and_writes_in_batches(app, query_counter):
+    exchange = seed_stocks(3)
+    days = 3000  # more stats rows than fit in one statement's bind parameters
+    
+    query_counter.reset()
+    DataLoader(db.session).load_stock_prices(prices(['S0', 'S1', 'S2'], days), 'JSE')
+    
+    assert sum('row_number()' in statement for statement in query_counter.statements) == 1
+    assert db.session.query(DailyExchangeStats).filter_by(exchange_id=exchange.id).count() == days
+    
+    stats = db.session.get(DailyExchangeStats, (exchange.id, FIRST_DATE + timedelta(days=days - 1)))
+    assert (stats.stock_count, stats.advancers, stats.decliners, stats.unchanged) == (3, 1, 1, 1)
+
+def test_movers_show_the_current_stock_name(app, client, api_headers):
+    exchange = seed_stocks(3)
+    DataLoader(db.session).load_stock_prices(prices(['S0', 'S1', 'S2'], 1), 'JSE')
+    db.session.execute(update(Stock).where(Stock.ticker == 'S2').values(name='Renamed Holdings'))
+    db.session.commit()
+    
+    movers = client.get('/api/v1/movers?exchange=JSE', headers=api_headers).get_json()['exchanges']['JSE']
+    assert [(entry['ticker'], entry['name']) for entry in movers['gainers']] == [('S2', 'Renamed Holdings')]
+    
+    stats = client.get('/api/v1/exchanges/JSE/stats', headers=api_headers).get_json()
+    assert stats['top_movers']['most_active'][0]['name'] == 'Renamed Holdings'
+    assert stats['top_movers']['losers'][0] == {
+        'ticker': 'S0', 'name': 'Stock 0', 'exchange': 'JSE', 'currency': 'ZAR',
+        'close_price': 10.0, 'change_percent': -1.0, 'volume': 100
+    }
+    stored = db.session.get(DailyExchangeStats, (exchange.id, FIRST_DATE)).top_movers
+    assert stored['losers'][0]['stock_id'] == db.session.query(Stock.id).filter_by(ticker='S0').scalar()
+
+def test_price_load_keeps_its_batch_timings(app):
+    seed_stocks(3)
+    loader = DataLoader(db.session, batch_size=2)
+    loader.load_stock_prices(prices(['S0', 'S1', 'S2'], 2), 'JSE')
+    
+    tables = [entry['table'] for entry in loader.batch_stats]
+    assert tables.count('stock_price') == 3
+    assert 'daily_exchange_stats' in tables
+    assert sum(entry['rows'] for entry in loader.batch_stats if entry['table'] == 'stock_price') == 6
+
+def test_movers_default_to_each_exchanges_latest_date(app, client, api_headers):
+    seed_stocks(3)
+    brvm = Exchange(code='BRVM', name='BRVM Exchange', country='CI', currency='XOF')
+    db.session.add(brvm)
+    db.session.flush()
+    db.session.add(Stock(ticker='B0', name='Bourse 0', currency='XOF', exchange_id=brvm.id))
+    db.session.commit()
+    
+    loader = DataLoader(db.session)
+    loader.load_stock_prices(prices(['S0', 'S1', 'S2'], 2), 'JSE')
+    loader.load_stock_prices(prices(['B0'], 1), 'BRVM')  # a day behind JSE
+    
+    movers = client.get('/api/v1/movers', headers=api_headers).get_json()
+    assert movers['date'] == (FIRST_DATE + timedelta(days=1)).isoformat()
+    assert movers['exchanges']['JSE']['date'] == (FIRST_DATE + timedelta(days=1)).isoformat()
+    assert movers['exchanges']['BRVM']['date'] == FIRST_DATE.isoformat()
+    assert movers['exchanges']['BRVM']['most_active'][0]['ticker'] == 'B0'
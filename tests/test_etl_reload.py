@@ -0,0 +1,89 @@
+import json
+import pytest
+from sqlalchemy.exc import OperationalError
+from app import db
+from config import Config
+from etl.loader import DataLoader
+from etl.processor import ETLProcessor
+from models import LoadedDataset, StockPrice
+from scrapers.base_scraper import BaseScraper
+
+STOCKS = [
+    {'ticker': 'AAA', 'name': 'Alpha Holdings', 'sector': 'Banks'},
+    {'ticker': 'BBB', 'name': 'Beta Mining', 'sector': 'Mining'}
+]
+
+PRICES = {
+    'AAA': [{'date': '2024-05-02', 'close_price': 10.5, 'volume': 1000, 'change_percent': 1.2}],
+    'BBB': [{'date': '2024-05-02', 'close_price': 22.0, 'volume': 500, 'change_percent': -0.4}]
+}
+
+class JSONScraper(BaseScraper):
+    """Scraper reading stocks and prices as JSON pages from the local page server."""
+    
+    def __init__(self, server):
+        super().__init__(server.base_url, 'JSE')
+        self.stocks_url = server.url('/stocks')
+        self.prices_url = server.url('/prices')
+    
+    @property
+    def dataset_urls(self):
+        return {'stocks': self.stocks_url, 'prices': self.prices_url}
+    
+    def scrape_stocks(self):
+        html = self.fetch_html(self.stocks_url)
+        if not html or self.dataset_unchanged('stocks'):
+            return []
+        return json.loads(html)
+    
+    def scrape_stock_prices(self, ticker=None):
+        html = self.fetch_html(self.prices_url)
+        if not html or self.dataset_unchanged('prices'):
+            return {}
+        return json.loads(html)
+    
+    def scrape_indices(self):
+        return []
+
+@pytest.fixture
+def processor(app, page_server, tmp_path, monkeypatch):
+    """ETL processor for JSE reading from the page server through a fresh response cache."""
+    monkeypatch.setattr(Config, 'HTTP_CACHE_DIR', str(tmp_path / 'http_cache'))
+    monkeypatch.setattr(BaseScraper, '_response_cache', None)
+    page_server.pages['/stocks'] = json.dumps(STOCKS)
+    page_server.pages['/prices'] = json.dumps(PRICES)
+    return ETLProcessor(db.session, scrapers={'JSE': JSONScraper(page_server)})
+
+def fail_price_upsert(self, *args, **kwargs):
+    raise OperationalError('INSERT INTO stock_price', {}, Exception('database is locked'))
+
+@pytest.mark.parametrize('pipelined', [True, False])
+def test_failed_load_is_retried_on_unchanged_page(processor, monkeypatch, pipelined):
+    with monkeypatch.context() as patch:
+        patch.setattr(DataLoader, '_bulk_upsert_stock_prices', fail_price_upsert)
+        summary = processor.process_exchange_data('JSE', pipelined=pipelined)
+    
+    assert summary['prices_processed'] == 0
+    assert db.session.query(StockPrice).count() == 0
+    
+    # Same page content: the prices were never loaded, so they must not be skipped
+    summary = processor.process_exchange_data('JSE', pipelined=pipelined)
+    assert summary['unchanged'] == ['stocks']
+    assert summary['prices_processed'] == 2
+    assert db.session.query(StockPrice).count() == 2
+    
+    summary = processor.process_exchange_data('JSE', pipelined=pipelined)
+    assert sorted(summary['unchanged']) == ['prices', 'stocks']
+
+def test_reset_database_reloads_cached_pages(processor):
+    processor.process_exchange_data('JSE')
+    assert db.session.query(LoadedDataset).count() == 2
+    
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+    
+    summary = processor.process_exchange_data('JSE')
+    assert summary['unchanged'] == []
+    assert summary['stocks_processed'] == 2
+    assert db.session.query(StockPrice).count() == 2
@@ -0,0 +1,88 @@
+import pytest
+from config import Config
+from scrapers.base_scraper import BaseScraper
+from tests.conftest import PageServer
+
+class PageScraper(BaseScraper):
+    """Scraper without datasets, used to drive the fetch methods."""
+    
+    def scrape_stocks(self):
+        return []
+    
+    def scrape_stock_prices(self, ticker=None):
+        return {}
+    
+    def scrape_indices(self):
+        return []
+
+@pytest.fixture
+def scraper(page_server, monkeypatch):
+    """Scraper with fresh rate limiters and no response cache."""
+    monkeypatch.setattr(BaseScraper, '_rate_limiters', {})
+    monkeypatch.setattr(Config, 'HTTP_CACHE_DIR', '')
+    monkeypatch.setattr(BaseScraper, '_response_cache', None)
+    for number in range(8):
+        page_server.pages[f'/page{number}'] = f'<html>page {number}</html>'
+    return PageScraper(page_server.base_url)
+
+def max_in_flight(requests):
+    """Get the largest number of requests the server was handling at once."""
+    events = sorted([(start, 1) for _, start, _ in requests] + [(end, -1) for _, _, end in requests])
+    in_flight = peak = 0
+    for _, change in events:
+        in_flight += change
+        peak = max(peak, in_flight)
+    return peak
+
+def test_requests_in_flight_are_capped(scraper, page_server, monkeypatch):
+    monkeypatch.setattr(Config, 'HTTP_RATE_LIMIT_PER_HOST', 1000.0)
+    monkeypatch.setattr(Config, 'HTTP_RATE_BURST', 100)
+    page_server.delay = 0.2
+    urls = [page_server.url(f'/page{number}') for number in range(8)]
+    
+    pages = scraper.fetch_many(urls, max_concurrency=3)
+    
+    assert pages == [f'<html>page {number}</html>' for number in range(8)]
+    assert max_in_flight(page_server.requests) == 3
+
+def test_requests_to_a_host_are_spaced_across_calls(scraper, page_server, monkeypatch):
+    monkeypatch.setattr(Config, 'HTTP_RATE_LIMIT_PER_HOST', 10.0)
+    monkeypatch.setattr(Config, 'HTTP_RATE_BURST', 1)
+    
+    scraper.fetch_many([page_server.url(f'/page{number}') for number in range(4)])
+    scraper.fetch_many([page_server.url('/page4')])
+    PageScraper(page_server.base_url).fetch_many([page_server.url('/page5')])
+    
+    starts = sorted(start for _, start, _ in page_server.requests)
+    assert len(starts) == 6
+    # 10 requests per second with no burst: one every 0.1s, less slack for request jitter
+    assert starts[-1] - starts[0] >= 0.45
+    assert min(later - earlier for earlier, later in zip(starts, starts[1:])) >= 0.05
+
+def test_hosts_are_limited_separately(scraper, page_server, monkeypatch):
+    monkeypatch.setattr(Config, 'HTTP_RATE_LIMIT_PER_HOST', 1.0)
+    monkeypatch.setattr(Config, 'HTTP_RATE_BURST', 1)
+    other_server = PageServer()
+    other_server.pages['/page1'] = '<html>other</html>'
+    other_server.start()
+    try:
+        scraper.fetch_many([page_server.url('/page0'), other_server.url('/page1')])
+    finally:
+        other_server.stop()
+    
+    starts = [start for _, start, _ in page_server.requests + other_server.requests]
+    assert len(starts) == 2
+    assert abs(starts[1] - starts[0]) < 0.5
+
+def test_pages_fetched_in_the_run_are_not_requested_again(scraper, page_server):
+    scraper.start_run()
+    try:
+        scraper.fetch_html(page_server.url('/page0'))
+        pages = scraper.fetch_many([page_server.url('/page0'), page_server.url('/page1')])
+        again = scraper.fetch_many([page_server.url('/page1')])
+    finally:
+        scraper.end_run()
+    
+    assert pages == ['<html>page 0</html>', '<html>page 1</html>']
+    assert again == ['<html>page 1</html>']
+    assert [path for path, _, _ in page_server.requests] == ['/page0', '/page1']
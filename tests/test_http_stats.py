@@ -0,0 +1,79 @@
+import socket
+import pytest
+from config import Config
+from scrapers.base_scraper import BaseScraper
+from scrapers.response_cache import hash_content
+from tests.test_fetch_many import PageScraper
+
+@pytest.fixture
+def scraper(page_server, monkeypatch):
+    """Scraper on a fresh shared session with zeroed counters and one quick retry."""
+    monkeypatch.setattr(Config, 'HTTP_MAX_RETRIES', 1)
+    monkeypatch.setattr(Config, 'HTTP_BACKOFF_FACTOR', 0)
+    monkeypatch.setattr(Config, 'HTTP_CACHE_DIR', '')
+    monkeypatch.setattr(BaseScraper, '_response_cache', None)
+    monkeypatch.setattr(BaseScraper, '_session', None)
+    monkeypatch.setattr(BaseScraper, '_http_stats', dict.fromkeys(BaseScraper._http_stats, 0))
+    for number in range(3):
+        page_server.pages[f'/page{number}'] = f'<html>page {number}</html>'
+    return PageScraper(page_server.base_url)
+
+def closed_port_url():
+    """Get a URL on a local port nothing listens on."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    return f'http://127.0.0.1:{port}/'
+
+def test_keep_alive_requests_reuse_one_connection(scraper, page_server):
+    for number in range(3):
+        assert scraper.fetch_html(page_server.url(f'/page{number}')) == f'<html>page {number}</html>'
+    
+    stats = BaseScraper.http_stats()
+    assert stats['fetches'] == 3
+    assert stats['requests'] == 3
+    assert stats['connections_opened'] == 1
+    assert stats['connections_reused'] == 2
+
+def test_fetches_that_fail_after_retries_are_counted(scraper):
+    assert scraper.fetch_html(closed_port_url()) is None
+    
+    stats = BaseScraper.http_stats()
+    assert stats['fetches'] == 1
+    assert stats['failed'] == 1
+    assert stats['retries'] == 1
+    assert stats['requests'] == 2
+    assert stats['connections_opened'] == 0
+    assert stats['connections_reused'] == 0
+
+def test_counts_survive_discarded_pools(scraper, page_server, monkeypatch):
+    monkeypatch.setattr(Config, 'HTTP_POOL_CONNECTIONS', 1)
+    scraper.fetch_html(page_server.url('/page0'))
+    scraper.fetch_html(closed_port_url())
+    scraper.fetch_html(page_server.url('/page1'))
+    
+    stats = BaseScraper.http_stats()
+    assert stats['fetches'] == 3
+    assert stats['requests'] == 4
+    assert stats['connections_opened'] == 2
+    assert stats['connections_reused'] == 0
+
+def test_refetch_after_a_304_without_cached_body_is_one_fetch(scraper, page_server, monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, 'HTTP_CACHE_DIR', str(tmp_path))
+    page_server.etags['/page0'] = '"v1"'
+    url = page_server.url('/page0')
+    scraper.fetch_html(url)
+    
+    # The body goes missing between the cache lookup and the 304
+    monkeypatch.setattr(BaseScraper.get_response_cache(), 'read_body', lambda url: None)
+    scraper.start_run()
+    try:
+        assert scraper.fetch_html(url) == '<html>page 0</html>'
+        assert scraper.page_hashes[url] == hash_content('<html>page 0</html>')
+    finally:
+        scraper.end_run()
+    
+    stats = BaseScraper.http_stats()
+    assert stats['fetches'] == 2
+    assert stats['requests'] == 3
+    assert stats['not_modified'] == 0
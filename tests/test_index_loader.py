@@ -0,0 +1,30 @@
+import logging
+from app import db
+from etl.loader import DataLoader
+from models import Exchange, Index, IndexValue
+
+def index_data(code, value):
+    index = {'code': code, 'name': f'{code} Index', 'exchange_code': None}
+    values = {'index_code': code, 'date': '2024-05-02', 'value': value, 'change_percent': 0.5}
+    return index, values
+
+def test_index_code_used_by_another_exchange_is_reported(app, caplog):
+    for code in ('JSE', 'NGX'):
+        db.session.add(Exchange(code=code, name=f'{code} Exchange', country='Africa', currency='USD'))
+    db.session.commit()
+    
+    loader = DataLoader(db.session)
+    jse_index, jse_value = index_data('ASI', 78000.0)
+    assert loader.load_indices([jse_index], [jse_value], 'JSE') == 1
+    
+    ngx_indices = [index_data('ASI', 98000.0), index_data('NGX30', 3500.0)]
+    with caplog.at_level(logging.ERROR, logger='etl.loader'):
+        processed = loader.load_indices([index for index, _ in ngx_indices], [value for _, value in ngx_indices], 'NGX')
+    
+    assert processed == 1
+    assert 'Error loading index ASI for NGX: code already used by an index on JSE' in caplog.text
+    
+    asi = db.session.query(Index).filter_by(code='ASI').one()
+    assert asi.exchange.code == 'JSE'
+    assert [value.value for value in db.session.query(IndexValue).filter_by(index_id=asi.id)] == [78000.0]
+    assert db.session.query(Index).filter_by(code='NGX30').one().exchange.code == 'NGX'
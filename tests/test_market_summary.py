@@ -0,0 +1,95 @@
+"""Golden-output test for the generated market summary markdown."""
+import os
+from datetime import date
+import pytest
+from sqlalchemy import insert
+from app import db
+from etl.loader import DataLoader
+from models import Exchange, Stock, StockPrice, Index, IndexValue
+from tasks.market_summary import generate_market_summary
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), 'golden', 'market_summary.md')
+
+# (exchange, ticker, name, close, change %, volume) traded on the summary date
+PRICES = [
+    ('JSE', 'NPN', 'Naspers', 3150.25, 7.5, 120000),
+    ('JSE', 'SBK', 'Standard Bank', 182.4, 3.2, 950000),
+    ('JSE', 'MTN', 'MTN Group', 121.05, 0.1, 2400000),
+    ('JSE', 'AGL', 'Anglo American', 540.0, 0.0, 310000),
+    ('JSE', 'FSR', 'FirstRand', 71.3, -1.2, 1800000),
+    ('JSE', 'SOL', 'Sasol', 155.9, -6.3, 640000),
+    ('JSE', 'BTI', 'British American Tobacco', 560.75, None, None),
+    ('JSE', 'SHP', 'Shoprite', 270.1, -0.5, 0),
+    ('NGX', 'DANGCEM', 'Dangote Cement', 610.0, 9.8, 45000),
+    ('NGX', 'ZENITHBANK', 'Zenith Bank', 36.55, -2.75, 15000000),
+    ('NGX', 'MTNN', 'MTN Nigeria', 230.0, 1.05, 700000),
+]
+
+# (exchange, code, name, value, change %); None value means no history
+INDICES = [
+    ('JSE', 'J203', 'FTSE/JSE All Share', 78450.12, 2.1),
+    ('JSE', 'J200', 'FTSE/JSE Top 40', 71200.5, -0.4),
+    ('JSE', 'J210', 'FTSE/JSE Resource 10', None, None),
+    ('NGX', 'NGXASI', 'NGX All Share', 98750.33, None),
+]
+
+def seed_summary_data(load_prices):
+    """Create the fixed dataset, loading prices with load_prices(exchange_code, rows)."""
+    today = date.today()
+    exchanges = {}
+    for code, name, currency in (('JSE', 'Johannesburg Stock Exchange', 'ZAR'),
+                                 ('NGX', 'Nigerian Exchange', 'NGN'),
+                                 ('BRVM', 'Bourse Régionale des Valeurs Mobilières', 'XOF')):
+        exchanges[code] = Exchange(code=code, name=name, country='XX', currency=currency)
+    db.session.add_all(exchanges.values())
+    db.session.flush()
+    
+    stocks = {}
+    for exchange_code, ticker, name, *_ in PRICES:
+        stocks[ticker] = Stock(ticker=ticker, name=name, exchange_id=exchanges[exchange_code].id)
+    db.session.add_all(stocks.values())
+    
+    for exchange_code, code, name, value, change in INDICES:
+        index = Index(code=code, name=name, exchange_id=exchanges[exchange_code].id)
+        db.session.add(index)
+        db.session.flush()
+        if value is not None:
+            db.session.add(IndexValue(index_id=index.id, date=today, value=value, change_percent=change))
+    db.session.commit()
+    
+    for exchange_code in exchanges:
+        rows = [
+            {'ticker': ticker, 'date': today.isoformat(), 'close_price': close,
+             'change_percent': change, 'volume': volume}
+            for code, ticker, _, close, change, volume in PRICES if code == exchange_code
+        ]
+        if rows:
+            load_prices(exchange_code, rows)
+
+def load_with_data_loader(exchange_code, rows):
+    """Load prices through DataLoader, which also fills daily_exchange_stats."""
+    DataLoader(db.session).load_stock_prices(rows, exchange_code)
+
+def insert_raw_prices(exchange_code, rows):
+    """Insert price rows directly, leaving daily_exchange_stats empty."""
+    stock_ids = {stock.ticker: stock.id for stock in Stock.query.all()}
+    db.session.execute(insert(StockPrice), [
+        {'stock_id': stock_ids[row['ticker']], 'date': date.fromisoformat(row['date']),
+         'close_price': row['close_price'], 'change_percent': row['change_percent'], 'volume': row['volume']}
+        for row in rows
+    ])
+    db.session.commit()
+
+def render(summary):
+    """Render a summary as compared against the golden file."""
+    return f"{summary.content}\n\n<!-- highlights -->\n{summary.highlights}\n"
+
+@pytest.mark.parametrize('load_prices', [load_with_data_loader, insert_raw_prices], ids=['rollup', 'price-rows'])
+def test_market_summary_matches_golden_file(app, load_prices):
+    seed_summary_data(load_prices)
+    
+    summary = generate_market_summary(db.session)
+    
+    with open(GOLDEN_PATH, encoding='utf-8') as f:
+        expected = f.read()
+    assert render(summary) == expected
@@ -0,0 +1,73 @@
+from datetime import date, timedelta
+import numpy as np
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+from app import db
+from etl.loader import DataLoader
+from etl.price_store import PriceStore, price_store
+from models import Exchange, Stock, StockPrice
+
+FIRST_DATE = date(2024, 1, 1)
+
+@pytest.fixture
+def store(app, tmp_path, monkeypatch):
+    """The shared price store, writing to a temporary directory."""
+    monkeypatch.setattr(price_store, 'directory', str(tmp_path / 'prices'))
+    return price_store
+
+@pytest.fixture
+def stocks(app):
+    """Three JSE stocks with 20 days of prices each, by ticker."""
+    exchange = Exchange(code='JSE', name='JSE Exchange', country='ZA', currency='ZAR')
+    db.session.add(exchange)
+    db.session.flush()
+    stocks = [Stock(ticker=f'S{number}', name=f'Stock {number}', exchange_id=exchange.id) for number in range(3)]
+    db.session.add_all(stocks)
+    db.session.flush()
+    db.session.execute(insert(StockPrice), [
+        {'stock_id': stock.id, 'date': FIRST_DATE + timedelta(days=day), 'close_price': 10.0 + day, 'volume': day}
+        for stock in stocks for day in range(20)
+    ])
+    db.session.commit()
+    return {stock.ticker: stock.id for stock in stocks}
+
+def price(ticker, day, close_price):
+    return {'ticker': ticker, 'date': (FIRST_DATE + timedelta(days=day)).isoformat(), 'close_price': close_price}
+
+def test_load_rewrites_only_from_first_changed_date(store, stocks, query_counter, tmp_path):
+    store.refresh(db.session)
+    
+    query_counter.reset()
+    DataLoader(db.session).load_stock_prices([price('S0', 18, 99.0), price('S0', 20, 31.0), price('S1', 20, 32.0)], 'JSE')
+    
+    refresh_queries = [statement for statement in query_counter.statements if 'ORDER BY stock_price.stock_id' in statement]
+    assert len(refresh_queries) == 1
+    assert 'stock_price.date >=' in refresh_queries[0]
+    
+    rebuilt = PriceStore(str(tmp_path / 'rebuilt'))
+    rebuilt.refresh(db.session)
+    for stock_id in stocks.values():
+        np.testing.assert_array_equal(store.read(stock_id), rebuilt.read(stock_id))
+    assert store.read(stocks['S0']).shape[1] == 21
+    assert store.history_page(stocks['S0'], 3)[0][2].tolist() == [31.0, 29.0, 99.0]
+
+def test_missing_files_are_rewritten_in_full(store, stocks):
+    DataLoader(db.session).load_stock_prices([price('S2', 20, 33.0)], 'JSE')
+    
+    assert store.read(stocks['S2']).shape[1] == 21
+    assert store.read(stocks['S0']) is None
+
+def test_database_error_removes_affected_histories(store, stocks, monkeypatch):
+    store.refresh(db.session)
+    
+    def fail(*args, **kwargs):
+        raise OperationalError('SELECT stock_price', {}, Exception('server closed the connection'))
+    
+    with monkeypatch.context() as patch:
+        patch.setattr(db.session, 'execute', fail)
+        assert store.refresh(db.session, since={stocks['S0']: FIRST_DATE, stocks['S1']: FIRST_DATE}) == 0
+    
+    assert store.read(stocks['S0']) is None
+    assert store.read(stocks['S1']) is None
+    assert store.read(stocks['S2']) is not None
@@ -0,0 +1,187 @@
+"""
+The hot API and ETL queries must be served by indexes.
+
+Each query is built by the code that serves it, captured while it runs
+against a generated market large enough for the planner to prefer the
+indexes, and run again through EXPLAIN. The ticker and sector searches and
+the partition pruning of dated history queries are only checked when the
+suite runs on PostgreSQL (see TEST_DATABASE_URL in conftest.py).
+"""
+import random
+import re
+from datetime import date, datetime, timedelta
+import pytest
+from sqlalchemy import event, insert, text
+from app import app as flask_app, db
+from api.auth import TokenAuth
+from etl.partitions import ensure_partitions, is_partitioned, partition_name
+from models import APIToken, Exchange, Stock, StockPrice, User
+from tasks.market_movers import get_top_movers
+from tests.conftest import QueryCounter, reset_app_state
+
+EXCHANGE_CODES = ('JSE', 'NGX', 'BRVM')
+STOCKS_PER_EXCHANGE = 2000
+HISTORY_STOCKS_PER_EXCHANGE = 40  # stocks with a long price history, the rest only have recent days
+HISTORY_DAYS = 400
+RECENT_DAYS = 10
+USERS = 1000
+LAST_DATE = date(2024, 3, 28)
+SECTORS = ('Banks', 'Mining', 'Telecoms', 'Retail', 'Insurance', 'Energy')
+
+def seed_market():
+    """
+    Create exchanges, stocks with prices, and users with API tokens.
+    
+    Returns:
+        list: User IDs
+    """
+    rng = random.Random(42)
+    price_rows = []
+    for code in EXCHANGE_CODES:
+        exchange = Exchange(code=code, name=f'{code} Exchange', country='Africa', currency='USD')
+        db.session.add(exchange)
+        db.session.flush()
+        
+        stock_ids = db.session.execute(insert(Stock).returning(Stock.id), [
+            {'ticker': f'{code}{number:04d}', 'name': f'{code} Company {number}',
+             'sector': f'{SECTORS[number % len(SECTORS)]} {number // len(SECTORS)}', 'exchange_id': exchange.id}
+            for number in range(STOCKS_PER_EXCHANGE)
+        ]).scalars().all()
+        
+        for number, stock_id in enumerate(stock_ids):
+            days = HISTORY_DAYS if number < HISTORY_STOCKS_PER_EXCHANGE else RECENT_DAYS
+            price_rows.extend(
+                {'stock_id': stock_id, 'date': LAST_DATE - timedelta(days=day),
+                 'close_price': rng.uniform(1, 500), 'volume': rng.randint(0, 10 ** 6),
+                 'change_percent': rng.uniform(-8, 8)}
+                for day in range(days)
+            )
+    db.session.execute(insert(StockPrice), price_rows)
+    
+    user_ids = db.session.execute(insert(User).returning(User.id), [
+        {'username': f'user{number}', 'email': f'user{number}@example.com', 'password_hash': 'x'}
+        for number in range(USERS)
+    ]).scalars().all()
+    expires_at = datetime.utcnow() + timedelta(days=7)
+    db.session.execute(insert(APIToken), [
+        {'token': f'token-{user_id}-{number}', 'user_id': user_id, 'expires_at': expires_at}
+        for user_id in user_ids for number in range(3)
+    ])
+    db.session.commit()
+    
+    # Give the planner the statistics a production database would have
+    db.session.execute(text('ANALYZE'))
+    db.session.commit()
+    return user_ids
+
+@pytest.fixture(scope='module')
+def market():
+    """Generated market shared by the module's tests, with a client and API token headers."""
+    with flask_app.app_context():
+        reset_app_state()
+        first_year = (LAST_DATE - timedelta(days=HISTORY_DAYS)).year
+        ensure_partitions(db.session, years=range(first_year, LAST_DATE.year + 1))
+        user_ids = seed_market()
+        headers = {'X-API-Token': TokenAuth().generate_token(db.session.get(User, user_ids[0]))}
+        yield {'client': flask_app.test_client(), 'headers': headers, 'user_ids': user_ids}
+        db.session.remove()
+
+def run_top_movers(market):
+    get_top_movers(db.session, LAST_DATE)
+
+def run_price_history(market):
+    url = '/api/v1/stocks/NGX/NGX0007/prices?start_date=2023-11-01&end_date=2024-02-15&limit=30'
+    response = market['client'].get(url, headers=market['headers'])
+    cursor = response.get_json()['next_cursor']
+    market['client'].get(f'{url}&cursor={cursor}', headers=market['headers'])
+
+def run_batch_prices(market):
+    market['client'].post('/api/v1/stocks/prices', headers=market['headers'], json={
+        'stocks': [{'exchange': 'JSE', 'ticker': 'JSE0003'}, {'exchange': 'BRVM', 'ticker': 'BRVM0011'}],
+        'start_date': '2023-06-01', 'end_date': '2024-01-31', 'limit': 20
+    })
+
+def run_exchange_stocks(market):
+    market['client'].get('/api/v1/exchanges/BRVM/stocks', headers=market['headers'])
+
+def run_user_tokens(market):
+    TokenAuth().revoke_user_tokens(market['user_ids'][-1])
+
+def run_ticker_search(market):
+    market['client'].get('/api/v1/stocks?ticker=E1234', headers=market['headers'])
+
+def run_sector_search(market):
+    market['client'].get('/api/v1/stocks?sector=ning 17', headers=market['headers'])
+
+# (name, table that must not be scanned, code issuing the queries, PostgreSQL only)
+HOT_QUERIES = [
+    ('top movers', 'stock_price', run_top_movers, False),
+    ('price history', 'stock_price', run_price_history, False),
+    ('batch prices', 'stock_price', run_batch_prices, False),
+    ('exchange stocks', 'stock', run_exchange_stocks, False),
+    ('user tokens', 'api_token', run_user_tokens, False),
+    ('ticker search', 'stock', run_ticker_search, True),
+    ('sector search', 'stock', run_sector_search, True)
+]
+
+def capture_queries(run, market):
+    """Run code against the market and record the statements it executes."""
+    counter = QueryCounter()
+    event.listen(db.engine, 'before_cursor_execute', counter)
+    try:
+        run(market)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', counter)
+    return counter
+
+def explain(statement, parameters):
+    """Get the plan lines of an executed statement."""
+    connection = db.session.connection()
+    if connection.dialect.name == 'postgresql':
+        return [row[0] for row in connection.exec_driver_sql(f'EXPLAIN {statement}', parameters)]
+    return [row[-1] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)]
+
+def reading_plans(counter, table):
+    """Explain the captured SELECT statements that read a table."""
+    reads_table = re.compile(rf'\b(FROM|JOIN) {table}\b', re.IGNORECASE)
+    return [
+        (statement, explain(statement, parameters))
+        for statement, parameters in zip(counter.statements, counter.parameters)
+        if statement.lstrip().upper().startswith('SELECT') and reads_table.search(statement)
+    ]
+
+def is_sequential_scan(plan, table, dialect_name):
+    """Check whether a plan reads a whole table without an index."""
+    for line in plan:
+        if dialect_name == 'postgresql':
+            # The default partition of a partitioned table is normally empty
+            match = re.search(rf'Seq Scan on ({table}\w*)', line)
+            if match and match.group(1) != f'{table}_default':
+                return True
+        elif re.match(rf'\s*SCAN {table}\b', line) and 'INDEX' not in line:
+            return True
+    return False
+
+@pytest.mark.parametrize('name, table, run, postgresql_only', HOT_QUERIES, ids=[query[0] for query in HOT_QUERIES])
+def test_hot_query_uses_indexes(market, name, table, run, postgresql_only):
+    dialect_name = db.engine.dialect.name
+    if postgresql_only and dialect_name != 'postgresql':
+        pytest.skip('PostgreSQL only')
+    
+    plans = reading_plans(capture_queries(run, market), table)
+    assert plans, f'{name} ran no query on {table}'
+    
+    scans = [(statement, plan) for statement, plan in plans if is_sequential_scan(plan, table, dialect_name)]
+    assert not scans, f'{name} scans {table}:\n' + '\n\n'.join(
+        statement + '\n' + '\n'.join(plan) for statement, plan in scans
+    )
+
+def test_dated_price_history_reads_only_its_partitions(market):
+    if db.engine.dialect.name != 'postgresql' or not is_partitioned(db.session, 'stock_price'):
+        pytest.skip('Needs partitioned PostgreSQL tables')
+    
+    plans = reading_plans(capture_queries(run_price_history, market), 'stock_price')
+    expected = {partition_name('stock_price', year) for year in (2023, 2024)}
+    for statement, plan in plans:
+        scanned = set(re.findall(r'on (stock_price_\w+)', ' '.join(plan)))
+        assert scanned <= expected, f'{statement} scans {sorted(scanned)}'
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from etl.processor import ETLProcessor
+from models import APIToken, User
+from tasks.scheduler import scheduler, setup_data_collection_tasks
+
+@pytest.fixture
+def jobs(app):
+    """Data collection jobs added to the (not started) scheduler."""
+    setup_data_collection_tasks()
+    yield scheduler
+    scheduler.remove_all_jobs()
+
+def test_collection_job_processes_all_exchanges_one_at_a_time_on_sqlite(jobs, monkeypatch):
+    calls = []
+    
+    def process_all_exchanges(self, parallel=True, max_workers=None):
+        calls.append((parallel, max_workers))
+        return {'JSE': {'stocks_processed': 2, 'prices_processed': 4}}
+    
+    monkeypatch.setattr(ETLProcessor, 'process_all_exchanges', process_all_exchanges)
+    
+    jobs.get_job('collect_exchange_data').func()
+    
+    assert calls == [(True, 1)]
+    assert jobs.get_job('collect_jse_data') is None
+
+def test_token_purge_job_removes_expired_tokens(jobs):
+    user = User(username='tester', email='tester@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    db.session.add_all([
+        APIToken(token='expired', user_id=user.id, expires_at=datetime.utcnow() - timedelta(days=1)),
+        APIToken(token='live', user_id=user.id, expires_at=datetime.utcnow() + timedelta(days=1))
+    ])
+    db.session.commit()
+    
+    jobs.get_job('purge_expired_tokens').func()
+    
+    assert [token for (token,) in db.session.query(APIToken.token)] == ['live']
@@ -0,0 +1,49 @@
+from app import db
+from models import Exchange, Stock
+
+NAMES = ['Delta', 'Alpha', 'Echo', 'Bravo', 'Alpha']
+
+def seed_stocks():
+    exchange = Exchange(code='JSE', name='JSE Exchange', country='ZA', currency='ZAR')
+    db.session.add(exchange)
+    db.session.flush()
+    db.session.add_all(
+        Stock(ticker=f'T{number}', name=name, currency='ZAR', exchange_id=exchange.id)
+        for number, name in enumerate(NAMES)
+    )
+    db.session.commit()
+
+def fetch_all_pages(client, api_headers, url):
+    """Follow X-Next-Cursor through every page, returning (ticker, name) pairs."""
+    rows, cursor = [], None
+    while True:
+        response = client.get(url + (f'&cursor={cursor}' if cursor else ''), headers=api_headers)
+        assert response.status_code == 200
+        rows.extend((stock['ticker'], stock['name']) for stock in response.get_json())
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            return rows
+
+def test_stocks_are_paged_in_the_requested_order(app, client, api_headers):
+    seed_stocks()
+    
+    by_name = fetch_all_pages(client, api_headers, '/api/v1/stocks?sort=name&limit=2')
+    assert by_name == [('T1', 'Alpha'), ('T4', 'Alpha'), ('T3', 'Bravo'), ('T0', 'Delta'), ('T2', 'Echo')]
+    
+    by_ticker_desc = fetch_all_pages(client, api_headers, '/api/v1/stocks?sort=ticker_desc&limit=2')
+    assert [ticker for ticker, _ in by_ticker_desc] == ['T4', 'T3', 'T2', 'T1', 'T0']
+    
+    by_id = fetch_all_pages(client, api_headers, '/api/v1/stocks?limit=2')
+    assert [ticker for ticker, _ in by_id] == ['T0', 'T1', 'T2', 'T3', 'T4']
+
+def test_unsupported_sort_is_rejected(app, client, api_headers):
+    response = client.get('/api/v1/stocks?sort=change_desc', headers=api_headers)
+    assert response.status_code == 400
+    assert 'Invalid sort' in response.get_json()['error']
+
+def test_cursor_from_another_sort_order_is_rejected(app, client, api_headers):
+    seed_stocks()
+    cursor = client.get('/api/v1/stocks?sort=name&limit=2', headers=api_headers).headers['X-Next-Cursor']
+    
+    response = client.get(f'/api/v1/stocks?sort=name_desc&limit=2&cursor={cursor}', headers=api_headers)
+    assert response.status_code == 400
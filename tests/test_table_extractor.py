@@ -0,0 +1,74 @@
+import pytest
+from scrapers.brvm_scraper import BRVMScraper
+from scrapers.jse_scraper import JSEScraper
+from scrapers.table_extractor import extract_table, parse_html
+
+def table_html(css_class, headers, rows):
+    head = ''.join(f'<th>{header}</th>' for header in headers)
+    body = ''.join('<tr>' + ''.join(f'<td>{cell}</td>' for cell in row) + '</tr>' for row in rows)
+    return f'<html><body><table class="{css_class}"><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table></body></html>'
+
+def scraper_for(scraper_class, html):
+    scraper = scraper_class()
+    scraper.fetch_html = lambda url=None: html
+    return scraper
+
+COLUMNS = {'ticker': ((), 0), 'name': ((), 1), 'sector': ((), 3)}
+
+@pytest.mark.parametrize('min_cells, optional, expected', [
+    (None, (), [('AAA', 'Alpha', 'Banks')]),
+    (2, (), [('AAA', 'Alpha', 'Banks')]),
+    (2, ('sector',), [('AAA', 'Alpha', 'Banks'), ('BBB', 'Beta', None)]),
+    (5, ('sector',), [])
+])
+def test_rows_shorter_than_required_columns_are_skipped(min_cells, optional, expected):
+    tree = parse_html(table_html('t', [], [['AAA', 'Alpha', '1', 'Banks'], ['BBB', 'Beta', '2'], ['CCC']]))
+    assert extract_table(tree, 'table.t', COLUMNS, min_cells=min_cells, optional=optional) == expected
+
+def test_brvm_price_rows_missing_a_mapped_column_are_skipped():
+    html = table_html(
+        'table-striped',
+        ['Symbol', 'Name', 'Close', 'Open', 'Volume', 'High', 'Variation %'],
+        [
+            ['SNTS', 'Sonatel', '15000', '14900', '1200', '15100', '0.67'],
+            ['ORAC', 'Orange CI', '13000', '12950', '800', '13050']  # no change cell
+        ]
+    )
+    prices = scraper_for(BRVMScraper, html).scrape_stock_prices()
+    
+    assert list(prices) == ['SNTS']
+    assert prices['SNTS'][0]['change_percent'] == 0.67
+
+def test_brvm_price_rows_keep_missing_high_and_low():
+    html = table_html(
+        'table-striped',
+        ['Symbol', 'Name', 'Close', 'Open', 'Volume', 'Var %', 'High', 'Low'],
+        [
+            ['SNTS', 'Sonatel', '15000', '14900', '1200', '0.67', '15100', '14800'],
+            ['ORAC', 'Orange CI', '13000', '12950', '800', '-0.38'],
+            ['SGBC', 'SGB CI', '9000', '8950', '300']  # fewer than six cells
+        ]
+    )
+    prices = scraper_for(BRVMScraper, html).scrape_stock_prices()
+    
+    assert list(prices) == ['SNTS', 'ORAC']
+    assert prices['SNTS'][0]['high_price'] == 15100
+    assert 'high_price' not in prices['ORAC'][0]
+    assert 'low_price' not in prices['ORAC'][0]
+
+def test_brvm_index_rows_missing_the_change_column_are_skipped():
+    html = table_html(
+        'table-striped',
+        ['Index', 'Points', 'Previous', 'Change %'],
+        [['BRVM-C 10', '210.5', '209.1', '0.67'], ['BRVM-30', '105.2', '104.8']]
+    )
+    indices = scraper_for(BRVMScraper, html).scrape_indices()
+    
+    assert [index['name'] for index in indices] == ['BRVM-C 10']
+
+def test_jse_index_rows_without_change_are_kept():
+    html = table_html('indices-table', [], [['J203', 'All Share', '78000.5', '0.4'], ['J200', 'Top 40', '71000.1']])
+    indices = scraper_for(JSEScraper, html).scrape_indices()
+    
+    assert [index['code'] for index in indices] == ['J203', 'J200']
+    assert 'change_percent' not in indices[1]
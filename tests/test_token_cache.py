@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+from app import db
+from api.auth import TokenAuth, TokenCache, UserSnapshot, token_cache
+from models import User
+
+def make_user(name='tester'):
+    user = User(username=name, email=f'{name}@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+def snapshot(user_id):
+    return UserSnapshot(user_id, f'user{user_id}', f'user{user_id}@example.com', False)
+
+def test_cached_token_is_validated_without_queries(app, query_counter):
+    user = make_user()
+    auth = TokenAuth()
+    token = auth.generate_token(user)
+    before = token_cache.stats()
+    
+    assert auth.validate_token(token).id == user.id
+    query_counter.reset()
+    assert auth.validate_token(token).id == user.id
+    
+    assert query_counter.count == 0
+    after = token_cache.stats()
+    assert (after['hits'] - before['hits'], after['misses'] - before['misses'], after['size']) == (1, 1, 1)
+
+def test_revoked_token_is_rejected_while_cached(app, client):
+    user = make_user()
+    auth = TokenAuth()
+    token = auth.generate_token(user)
+    assert client.get('/api/v1/token/validate', headers={'X-API-Token': token}).status_code == 200
+    
+    assert TokenAuth().revoke_token(token)
+    
+    assert client.get('/api/v1/token/validate', headers={'X-API-Token': token}).status_code == 401
+
+def test_users_revoked_tokens_are_rejected_while_cached(app):
+    user = make_user()
+    other = make_user('other')
+    auth = TokenAuth()
+    tokens = [auth.generate_token(user), auth.generate_token(user)]
+    other_token = auth.generate_token(other)
+    for token in tokens + [other_token]:
+        assert auth.validate_token(token)
+    
+    assert TokenAuth().revoke_user_tokens(user.id) == 2
+    
+    assert [auth.validate_token(token) for token in tokens] == [None, None]
+    assert auth.validate_token(other_token).id == other.id
+
+def test_entries_expire_after_the_ttl(app, query_counter):
+    user = make_user()
+    auth = TokenAuth(cache=TokenCache(max_size=10, ttl=0))
+    token = auth.generate_token(user)
+    auth.validate_token(token)
+    
+    query_counter.reset()
+    assert auth.validate_token(token).id == user.id
+    assert query_counter.count == 1
+    assert auth.cache.stats()['hits'] == 0
+
+def test_entries_do_not_outlive_their_token():
+    cache = TokenCache(max_size=10, ttl=3600)
+    cache.put('expiring', snapshot(1), datetime.utcnow() - timedelta(seconds=1))
+    
+    assert cache.get('expiring') is None
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TokenCache(max_size=2, ttl=3600)
+    expires_at = datetime.utcnow() + timedelta(days=1)
+    cache.put('a', snapshot(1), expires_at)
+    cache.put('b', snapshot(2), expires_at)
+    cache.get('a')
+    cache.put('c', snapshot(3), expires_at)
+    
+    assert cache.get('b') is None
+    assert cache.get('a') == snapshot(1)
+    assert cache.get('c') == snapshot(3)
+    assert cache.stats()['size'] == 2
@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta
+from app import db
+from api.auth import TokenAuth
+from models import APIToken, User
+
+def add_tokens(user_id, count, expires_at, prefix):
+    db.session.add_all(
+        APIToken(token=f'{prefix}{number}', user_id=user_id, expires_at=expires_at)
+        for number in range(count)
+    )
+
+def test_purge_deletes_only_stale_tokens_in_batches(app, query_counter):
+    user = User(username='tester', email='tester@example.com', password_hash='x')
+    gone = User(username='gone', email='gone@example.com', password_hash='x')
+    db.session.add_all([user, gone])
+    db.session.commit()
+    now = datetime.utcnow()
+    add_tokens(user.id, 5, now - timedelta(days=1), 'expired')
+    add_tokens(user.id, 3, now + timedelta(days=1), 'live')
+    add_tokens(gone.id, 2, now + timedelta(days=1), 'orphan')
+    db.session.commit()
+    db.session.query(User).filter_by(id=gone.id).delete()
+    db.session.commit()
+    
+    query_counter.reset()
+    purged = TokenAuth().purge_expired_tokens(batch_size=3)
+    
+    assert purged == 7
+    assert sorted(token for (token,) in db.session.query(APIToken.token)) == ['live0', 'live1', 'live2']
+    # Three batches of at most three tokens each, then an empty batch ends the sweep
+    assert sum(statement.lstrip().upper().startswith('DELETE') for statement in query_counter.statements) == 3